@@ -0,0 +1,377 @@
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from datetime import datetime, timedelta
+from decimal import Decimal
+import numpy as np
+import time
+from property.models import Rooms, Areas
+from booking.models import Bookings, Transactions
+from user_roles.replica import read_after
+from .daily_stats import daily_stats_series
+from .models import MetricsSubscriber
+from .occupancy import day_index, occupied_range
+
+DASHBOARD_CACHE_TIMEOUT = 60
+STATUS_COUNTS_CACHE_TIMEOUT = 60 * 10
+
+MAX_RANGE_DAYS = 731
+OCCUPYING_STATUSES = ['reserved', 'confirmed', 'checked_in']
+
+# 'no_show' is not a model choice but update_booking_status still writes it.
+BOOKING_STATUSES = [value for value, _ in Bookings.BOOKING_STATUS_CHOICES] + ['no_show']
+
+def month_bounds(year, month):
+    """First moment and last second of the month, matching the dashboard's month filters."""
+    start_date = datetime(year, month, 1)
+    if month == 12:
+        end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        end_date = datetime(year, month + 1, 1) - timedelta(days=1)
+    end_date = end_date.replace(hour=23, minute=59, second=59)
+    return timezone.make_aware(start_date), timezone.make_aware(end_date)
+
+def parse_date_range(params):
+    """
+    Optional `start_date`/`end_date` (YYYY-MM-DD) query params, inclusive.
+    Returns None when absent so callers fall back to the month/year window.
+    """
+    start_param = params.get('start_date')
+    end_param = params.get('end_date')
+    if not start_param and not end_param:
+        return None
+    if not start_param or not end_param:
+        raise ValueError("Both start_date and end_date are required")
+
+    start = datetime.strptime(start_param, "%Y-%m-%d").date()
+    end = datetime.strptime(end_param, "%Y-%m-%d").date()
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f"Date range cannot exceed {MAX_RANGE_DAYS} days")
+    return start, end
+
+def request_window(params):
+    """
+    Aware (start, end) datetimes for an analytics request plus the echo fields
+    for the response: an explicit start_date/end_date range, else month/year.
+    """
+    date_range = parse_date_range(params)
+    if date_range:
+        start, end = date_range
+        start_date = timezone.make_aware(datetime.combine(start, datetime.min.time()))
+        end_date = timezone.make_aware(datetime.combine(end, datetime.max.time()).replace(microsecond=0))
+        return start_date, end_date, {"start_date": start, "end_date": end}
+
+    now = timezone.now()
+    month = int(params.get('month', now.month))
+    year = int(params.get('year', now.year))
+    start_date, end_date = month_bounds(year, month)
+    return start_date, end_date, {"month": month, "year": year}
+
+def parse_top(params):
+    top = params.get('top')
+    if top in (None, ''):
+        return None
+    top = int(top)
+    if top <= 0:
+        raise ValueError("top must be a positive integer")
+    return top
+
+# Cache versioning: every cached figure embeds a version number in its key,
+# so invalidating is a single counter bump instead of a key scan. Versions
+# start from a timestamp so an evicted counter never revives stale entries.
+def _version_key(scope):
+    return f"analytics:version:{scope}"
+
+def get_version(scope):
+    return cache.get_or_set(_version_key(scope), time.time_ns, None)
+
+def bump_version(scope):
+    try:
+        cache.incr(_version_key(scope))
+    except ValueError:
+        cache.set(_version_key(scope), time.time_ns(), None)
+    cache.set(_bumped_at_key(scope), time.time(), None)
+
+def _bumped_at_key(scope):
+    return f"analytics:version:{scope}:bumped_at"
+
+def read_after_bump(scope):
+    """
+    A figure cached under the current version must not be computed from a
+    read replica that has not yet applied the change behind the last bump.
+    """
+    return read_after(cache.get(_bumped_at_key(scope)))
+
+def cached_figure(name, scope, year, month, compute, timeout=DASHBOARD_CACHE_TIMEOUT):
+    key = f"analytics:{name}:{year}-{month:02d}:v{get_version(scope)}"
+    value = cache.get(key)
+    if value is None:
+        with read_after_bump(scope):
+            value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+def invalidate_dashboard_stats():
+    bump_version('dashboard_stats')
+
+def _status_counts_scope(year, month):
+    return f"booking_status_counts:{year}-{month:02d}"
+
+def invalidate_booking_month(booking):
+    if booking.created_at is None:
+        return
+    created_at = timezone.localtime(booking.created_at)
+    bump_version(_status_counts_scope(created_at.year, created_at.month))
+
+def compute_dashboard_stats(year, month):
+    start_date, end_date = month_bounds(year, month)
+    month_start, month_end = start_date.date(), end_date.date()
+
+    checked_in_overlap = (
+        Q(status='checked_in') &
+        Q(is_venue_booking=False) &
+        Q(check_in_date__lte=month_end) &
+        Q(check_out_date__gte=month_start)
+    )
+    created_this_month = Q(created_at__range=(start_date, end_date))
+    checked_in_this_month = Q(status='checked_in') & Q(check_in_date__range=(month_start, month_end))
+    upcoming_venue = (
+        Q(is_venue_booking=True) &
+        Q(status__in=['confirmed', 'reserved']) &
+        Q(check_in_date__gte=month_start)
+    )
+
+    checked_in_room_ids = Bookings.objects.filter(
+        checked_in_overlap, room__isnull=False
+    ).values('room_id')
+
+    room_counts = Rooms.objects.aggregate(
+        total_rooms=Count('id'),
+        maintenance_rooms=Count('id', filter=Q(status='maintenance')),
+        available_rooms=Count('id', filter=Q(status='available') & ~Q(id__in=checked_in_room_ids)),
+    )
+
+    booking_counts = Bookings.objects.filter(
+        created_this_month | checked_in_overlap | checked_in_this_month | upcoming_venue
+    ).aggregate(
+        occupied_rooms=Count('id', filter=checked_in_overlap),
+        active_bookings=Count('id', filter=created_this_month & Q(status__in=['confirmed', 'reserved', 'checked_in'])),
+        pending_bookings=Count('id', filter=created_this_month & Q(status='pending')),
+        unpaid_bookings=Count('id', filter=created_this_month & Q(payment_status='unpaid')),
+        checked_in_count=Count('id', filter=checked_in_this_month),
+        total_bookings=Count('id', filter=created_this_month),
+        upcoming_reservations=Count('id', filter=upcoming_venue),
+    )
+
+    revenue = Transactions.objects.filter(
+        transaction_date__range=(start_date, end_date),
+        status='completed'
+    ).aggregate(
+        revenue=Sum('amount'),
+        room_revenue=Sum('amount', filter=Q(booking__isnull=False) & Q(booking__is_venue_booking=False)),
+        venue_revenue=Sum('amount', filter=Q(booking__isnull=False) & Q(booking__is_venue_booking=True)),
+    )
+    revenue = {name: amount or 0 for name, amount in revenue.items()}
+
+    return {
+        **room_counts,
+        **booking_counts,
+        **revenue,
+        'formatted_revenue': f"₱{revenue['revenue']:,.2f}",
+        'formatted_room_revenue': f"₱{revenue['room_revenue']:,.2f}",
+        'formatted_venue_revenue': f"₱{revenue['venue_revenue']:,.2f}",
+        'month': month,
+        'year': year,
+    }
+
+def dashboard_stats_for_month(year, month):
+    return cached_figure(
+        'dashboard_stats', 'dashboard_stats', year, month,
+        lambda: compute_dashboard_stats(year, month)
+    )
+
+def compute_booking_status_counts(year, month):
+    start_date, end_date = month_bounds(year, month)
+    counts = dict.fromkeys(BOOKING_STATUSES, 0)
+
+    rows = Bookings.objects.filter(
+        created_at__range=(start_date, end_date)
+    ).values('status').annotate(count=Count('id')).order_by()
+
+    for row in rows:
+        counts[row['status']] = row['count']
+    return counts
+
+def booking_status_counts_for_month(year, month):
+    return cached_figure(
+        'booking_status_counts', _status_counts_scope(year, month), year, month,
+        lambda: compute_booking_status_counts(year, month),
+        timeout=STATUS_COUNTS_CACHE_TIMEOUT
+    )
+
+def daily_occupied_rooms(start, end):
+    """
+    Occupied room count for each day in [start, end], from a single query.
+    Each stay adds +1 on its first day in range and -1 after its last, and
+    a prefix sum over that difference array yields the per-day totals.
+    """
+    days = (end - start).days + 1
+    stays = Bookings.objects.filter(
+        status__in=OCCUPYING_STATUSES,
+        is_venue_booking=False,
+        check_in_date__lte=end,
+        check_out_date__gte=start
+    ).values_list('check_in_date', 'check_out_date')
+
+    diff = np.zeros(days + 1, dtype=np.int64)
+    stays = list(stays)
+    if stays:
+        check_ins, check_outs = (day_index(column, start).astype(np.int64) for column in zip(*stays))
+        first_day, last_day = occupied_range(check_ins, check_outs, days)
+        np.add.at(diff, first_day, 1)
+        np.add.at(diff, last_day + 1, -1)
+    return np.cumsum(diff[:-1])
+
+def daily_occupancy_rates(start, end):
+    total_rooms = Rooms.objects.count()
+    if total_rooms == 0:
+        return [0] * ((end - start).days + 1)
+    rates = daily_occupied_rooms(start, end) * 100 / total_rooms
+    return [round(float(rate), 2) for rate in rates]
+
+def property_breakdown(model, metric, start_date, end_date, top=None):
+    """
+    (name, value) per room or area for `metric` ('revenue' or 'bookings'),
+    computed in one grouped query. With `top`, only the N highest values.
+    """
+    if model is Rooms:
+        name_field, bookings, is_venue = 'room_name', 'bookings', False
+    else:
+        name_field, bookings, is_venue = 'area_name', 'area_bookings', True
+
+    if metric == 'revenue':
+        value = Coalesce(
+            Sum(f'{bookings}__transactions__amount', filter=Q(**{
+                f'{bookings}__is_venue_booking': is_venue,
+                f'{bookings}__transactions__status': 'completed',
+                f'{bookings}__transactions__transaction_date__range': (start_date, end_date),
+            })),
+            Value(0),
+            output_field=DecimalField(max_digits=12, decimal_places=2)
+        )
+    else:
+        value = Count(bookings, filter=Q(**{
+            f'{bookings}__is_venue_booking': is_venue,
+            f'{bookings}__created_at__range': (start_date, end_date),
+        }))
+
+    rows = model.objects.annotate(value=value).values_list(name_field, 'value')
+    if top:
+        rows = rows.order_by('-value', 'id')[:top]
+    else:
+        rows = rows.order_by('id')
+
+    if metric == 'revenue':
+        return [(name, float(amount)) for name, amount in rows]
+    return list(rows)
+
+# Batched analytics: each series mirrors the payload of its standalone endpoint.
+FACT_SERIES = {
+    'daily_revenue': {'data': 'revenue'},
+    'daily_bookings': {'data': 'bookings_created'},
+    'daily_checkins_checkouts': {'checkins': 'check_ins', 'checkouts': 'check_outs'},
+    'daily_cancellations': {'data': 'cancellations'},
+    'daily_no_shows_rejected': {'no_shows': 'no_shows', 'rejected': 'rejections'},
+}
+BREAKDOWN_SERIES = {
+    'room_revenue': (Rooms, 'revenue', 'room_names', 'revenue_data'),
+    'room_bookings': (Rooms, 'bookings', 'room_names', 'booking_counts'),
+    'area_revenue': (Areas, 'revenue', 'area_names', 'revenue_data'),
+    'area_bookings': (Areas, 'bookings', 'area_names', 'booking_counts'),
+}
+MONTH_ONLY_SERIES = ['stats', 'booking_status_counts']
+ANALYTICS_SERIES = MONTH_ONLY_SERIES + list(FACT_SERIES) + ['daily_occupancy'] + list(BREAKDOWN_SERIES)
+
+def parse_series(params, window):
+    requested = [name for name in params.get('series', '').split(',') if name]
+    is_month = 'month' in window
+    if not requested:
+        return [name for name in ANALYTICS_SERIES if is_month or name not in MONTH_ONLY_SERIES]
+
+    unknown = [name for name in requested if name not in ANALYTICS_SERIES]
+    if unknown:
+        raise ValueError(f"Unknown series: {', '.join(unknown)}. Valid series are: {', '.join(ANALYTICS_SERIES)}")
+    if not is_month:
+        month_only = [name for name in requested if name in MONTH_ONLY_SERIES]
+        if month_only:
+            raise ValueError(f"{', '.join(month_only)} can only be requested for a month/year period")
+    return list(dict.fromkeys(requested))
+
+def analytics_batch(series, start_date, end_date, window, top=None):
+    """Compute several dashboard series for one window, sharing the daily rollup read."""
+    start, end = start_date.date(), end_date.date()
+    fact_fields = sorted({
+        field for name in series if name in FACT_SERIES for field in FACT_SERIES[name].values()
+    })
+    facts = daily_stats_series(start, end, fact_fields) if fact_fields else {}
+
+    results = {}
+    for name in series:
+        if name == 'stats':
+            results[name] = dashboard_stats_for_month(window['year'], window['month'])
+        elif name == 'booking_status_counts':
+            results[name] = booking_status_counts_for_month(window['year'], window['month'])
+        elif name in FACT_SERIES:
+            results[name] = {key: facts[field] for key, field in FACT_SERIES[name].items()}
+        elif name == 'daily_occupancy':
+            results[name] = {'data': daily_occupancy_rates(start, end)}
+        else:
+            model, metric, names_key, values_key = BREAKDOWN_SERIES[name]
+            rows = property_breakdown(model, metric, start_date, end_date, top)
+            results[name] = {
+                names_key: [row[0] for row in rows],
+                values_key: [row[1] for row in rows],
+            }
+    return results
+
+# Live metrics: the counters and today's chart points pushed to subscribed admins.
+METRICS_GROUP = 'dashboard_metrics'
+METRICS_PUSH_KEY = 'dashboard_metrics:push'
+METRICS_PUSH_INTERVAL = 2
+# Subscribed consumers re-announce themselves every METRICS_SUBSCRIBER_REFRESH
+# seconds; one that has not for METRICS_SUBSCRIBER_TTL is no longer counted.
+METRICS_SUBSCRIBER_TTL = 60
+METRICS_SUBSCRIBER_REFRESH = 20
+
+def _plain(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+def live_metrics_snapshot():
+    today = timezone.localdate()
+    stats = dashboard_stats_for_month(today.year, today.month)
+    facts = daily_stats_series(today, today)
+    points = {field: values[0] for field, values in facts.items()}
+    points['occupancy'] = daily_occupancy_rates(today, today)[0]
+    return {
+        'date': today.isoformat(),
+        'day_index': today.day - 1,
+        'stats': {name: _plain(value) for name, value in stats.items()},
+        'today': points,
+    }
+
+def metrics_subscriber_count():
+    return MetricsSubscriber.objects.filter(expires_at__gt=timezone.now()).count()
+
+def add_metrics_subscriber(channel_name):
+    """Count `channel_name` as subscribed for the next METRICS_SUBSCRIBER_TTL seconds."""
+    now = timezone.now()
+    MetricsSubscriber.objects.filter(expires_at__lte=now).delete()
+    MetricsSubscriber.objects.update_or_create(
+        channel_name=channel_name, defaults={'expires_at': now + timedelta(seconds=METRICS_SUBSCRIBER_TTL)}
+    )
+
+def remove_metrics_subscriber(channel_name):
+    MetricsSubscriber.objects.filter(channel_name=channel_name).delete()
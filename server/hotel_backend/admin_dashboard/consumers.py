@@ -2,11 +2,26 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from booking.models import Bookings
 from booking.serializers import BookingSerializer
+from .analytics import (
+    METRICS_GROUP,
+    METRICS_SUBSCRIBER_REFRESH,
+    add_metrics_subscriber,
+    live_metrics_snapshot,
+    remove_metrics_subscriber,
+)
+import asyncio
 import json
 
 class PendingBookingConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.group_name = 'admin_notifications'
+        self.metrics_subscribed = False
+        self.metrics_refresh = None
+        
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated or user.role != 'admin':
+            await self.close(code=4003)
+            return
         
         await self.channel_layer.group_add(
             self.group_name,
@@ -36,11 +51,49 @@ class PendingBookingConsumer(AsyncWebsocketConsumer):
             'count': count
         }))
     
+    async def metrics_update(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'metrics_update',
+            'metrics': event['metrics']
+        }))
+    
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard(
             self.group_name,
             self.channel_name
         )
+        await self.unsubscribe_metrics()
+    
+    async def subscribe_metrics(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated or user.role != 'admin':
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'Only admins can subscribe to dashboard metrics'
+            }))
+            return
+        if not self.metrics_subscribed:
+            self.metrics_subscribed = True
+            await self.channel_layer.group_add(METRICS_GROUP, self.channel_name)
+            await database_sync_to_async(add_metrics_subscriber)(self.channel_name)
+            self.metrics_refresh = asyncio.create_task(self.refresh_metrics_subscription())
+        metrics = await database_sync_to_async(live_metrics_snapshot)()
+        await self.send(text_data=json.dumps({
+            'type': 'metrics_snapshot',
+            'metrics': metrics
+        }))
+    
+    async def refresh_metrics_subscription(self):
+        while True:
+            await asyncio.sleep(METRICS_SUBSCRIBER_REFRESH)
+            await database_sync_to_async(add_metrics_subscriber)(self.channel_name)
+    
+    async def unsubscribe_metrics(self):
+        if self.metrics_subscribed:
+            self.metrics_subscribed = False
+            self.metrics_refresh.cancel()
+            await self.channel_layer.group_discard(METRICS_GROUP, self.channel_name)
+            await database_sync_to_async(remove_metrics_subscriber)(self.channel_name)
     
     async def receive(self, text_data):
         try:
@@ -59,6 +112,10 @@ class PendingBookingConsumer(AsyncWebsocketConsumer):
                     'count': count,
                     'bookings': bookings
                 }))
+            if text_data_json.get('type') == 'subscribe_metrics':
+                await self.subscribe_metrics()
+            if text_data_json.get('type') == 'unsubscribe_metrics':
+                await self.unsubscribe_metrics()
         except json.JSONDecodeError:
             return f"Error decoding JSON: {text_data}"
     
@@ -70,7 +127,7 @@ class PendingBookingConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def get_active_bookings(self):
-        bookings = Bookings.objects.exclude(
+        bookings = BookingSerializer.with_related(Bookings.objects.exclude(
             status__in=['rejected', 'cancelled', 'no_show', 'checked_out']
-        ).order_by('-created_at')
+        )).order_by('-created_at')
         return BookingSerializer(bookings, many=True).data
\ No newline at end of file
@@ -0,0 +1,170 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from booking.models import Bookings, Transactions
+from .models import DailyBookingStats
+
+FACT_FIELDS = [
+    'bookings_created',
+    'check_ins',
+    'check_outs',
+    'cancellations',
+    'no_shows',
+    'rejections',
+    'revenue',
+]
+
+def as_date(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+def booking_property(booking):
+    if booking is None:
+        return ('none', 0)
+    if booking.is_venue_booking and booking.area_id:
+        return ('area', booking.area_id)
+    if booking.room_id:
+        return ('room', booking.room_id)
+    return ('none', 0)
+
+# A contribution maps (date, property_type, property_id, field) to the amount a
+# single row adds to the rollup. The dates mirror the filters the daily charts use.
+def booking_contributions(booking):
+    contributions = Counter()
+    prop = booking_property(booking)
+
+    created = as_date(booking.created_at)
+    if created:
+        contributions[(created, *prop, 'bookings_created')] += 1
+
+    check_in = as_date(booking.check_in_date)
+    if check_in and booking.status in ('checked_in', 'checked_out'):
+        contributions[(check_in, *prop, 'check_ins')] += 1
+
+    check_out = as_date(booking.check_out_date)
+    if check_out and booking.status == 'checked_out':
+        contributions[(check_out, *prop, 'check_outs')] += 1
+
+    cancelled = as_date(booking.cancellation_date)
+    if cancelled and booking.status == 'cancelled':
+        contributions[(cancelled, *prop, 'cancellations')] += 1
+
+    updated = as_date(booking.updated_at)
+    if updated and booking.status == 'missed_reservation':
+        contributions[(updated, *prop, 'no_shows')] += 1
+    if updated and booking.status == 'rejected':
+        contributions[(updated, *prop, 'rejections')] += 1
+
+    return contributions
+
+def transaction_contributions(txn):
+    contributions = Counter()
+    paid_on = as_date(txn.transaction_date)
+    if txn.status != 'completed' or not paid_on:
+        return contributions
+
+    booking = txn.booking if txn.booking_id else None
+    contributions[(paid_on, *booking_property(booking), 'revenue')] += Decimal(str(txn.amount))
+    return contributions
+
+def moved_revenue_delta(booking, previous_property):
+    """
+    Revenue is keyed by the booking's room or area, so when a booking moves its
+    completed transactions' revenue moves with it.
+    """
+    delta = Counter()
+    current_property = booking_property(booking)
+    if previous_property is None or previous_property == current_property:
+        return delta
+
+    transactions = Transactions.objects.filter(booking=booking, status='completed').only('amount', 'transaction_date')
+    for txn in transactions:
+        paid_on = as_date(txn.transaction_date)
+        if paid_on:
+            amount = Decimal(str(txn.amount))
+            delta[(paid_on, *previous_property, 'revenue')] -= amount
+            delta[(paid_on, *current_property, 'revenue')] += amount
+    return delta
+
+def _group_by_row(contributions):
+    rows = defaultdict(dict)
+    for (day, property_type, property_id, field), amount in contributions.items():
+        if amount:
+            rows[(day, property_type, property_id)][field] = amount
+    return rows
+
+def apply_contributions(delta):
+    """Add a contribution delta (new minus old) to the stored rollup rows."""
+    with transaction.atomic():
+        for (day, property_type, property_id), changes in _group_by_row(delta).items():
+            row, _ = DailyBookingStats.objects.get_or_create(
+                date=day, property_type=property_type, property_id=property_id
+            )
+            DailyBookingStats.objects.filter(pk=row.pk).update(
+                **{field: F(field) + amount for field, amount in changes.items()}
+            )
+
+def contribution_delta(old, new):
+    delta = Counter(new)
+    delta.subtract(old)
+    return delta
+
+def rebuild_daily_stats(stats_model=DailyBookingStats, booking_model=Bookings, transaction_model=Transactions,
+                        chunk_size=2000):
+    """Recompute the whole rollup from raw rows. Returns the number of rows written."""
+    totals = Counter()
+
+    bookings = booking_model.objects.only(
+        'room_id', 'area_id', 'is_venue_booking', 'status', 'created_at', 'updated_at',
+        'check_in_date', 'check_out_date', 'cancellation_date'
+    )
+    for booking in bookings.iterator(chunk_size=chunk_size):
+        totals.update(booking_contributions(booking))
+
+    transactions = transaction_model.objects.filter(status='completed').select_related('booking').only(
+        'amount', 'status', 'transaction_date', 'booking_id',
+        'booking__room_id', 'booking__area_id', 'booking__is_venue_booking'
+    )
+    for txn in transactions.iterator(chunk_size=chunk_size):
+        totals.update(transaction_contributions(txn))
+
+    rows = [
+        stats_model(date=day, property_type=property_type, property_id=property_id, **changes)
+        for (day, property_type, property_id), changes in _group_by_row(totals).items()
+    ]
+    with transaction.atomic():
+        stats_model.objects.all().delete()
+        stats_model.objects.bulk_create(rows, batch_size=chunk_size)
+    return len(rows)
+
+def daily_stats_series(start, end, fields=FACT_FIELDS):
+    """One list per field with a value for each day in [start, end], from a single indexed read."""
+    days = (end - start).days + 1
+    series = {field: [0] * days for field in fields}
+
+    rows = DailyBookingStats.objects.filter(
+        date__range=(start, end)
+    ).values('date').annotate(**{f"total_{field}": Sum(field) for field in fields}).order_by()
+
+    for row in rows:
+        idx = (row['date'] - start).days
+        for field in fields:
+            value = row[f"total_{field}"] or 0
+            series[field][idx] = float(value) if field == 'revenue' else value
+    return series
+
+def previous_year(day):
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        return day.replace(year=day.year - 1, day=28)
@@ -0,0 +1,197 @@
+import csv
+import io
+import pandas as pd
+from contextlib import nullcontext
+from datetime import date, datetime, time, timedelta
+from channels.db import database_sync_to_async
+from django.db import models
+from django.utils import timezone
+from booking.models import Bookings, Transactions, Reviews
+from user_roles.models import CustomUsers
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ['csv', 'parquet']
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# dataset -> (model, date field used by the start/end filters, exported columns).
+# The primary key comes first; the exporter pages on it.
+# Passwords and uploaded ID/proof images are deliberately left out.
+EXPORTS = {
+    'bookings': (Bookings, 'created_at', [
+        'id', 'user_id', 'room_id', 'area_id', 'is_venue_booking', 'status',
+        'check_in_date', 'check_out_date', 'time_of_arrival', 'start_time', 'end_time',
+        'number_of_guests', 'phone_number', 'special_request', 'total_price', 'down_payment',
+        'payment_status', 'payment_method', 'payment_date', 'cancellation_date',
+        'cancellation_reason', 'created_at', 'updated_at',
+    ]),
+    'transactions': (Transactions, 'transaction_date', [
+        'id', 'booking_id', 'user_id', 'transaction_type', 'amount', 'status', 'transaction_date',
+    ]),
+    'reviews': (Reviews, 'created_at', [
+        'id', 'user_id', 'booking_id', 'room_id', 'area_id', 'rating', 'review_text', 'created_at',
+    ]),
+    'users': (CustomUsers, 'date_joined', [
+        'id', 'username', 'email', 'first_name', 'last_name', 'role', 'is_archived',
+        'is_verified', 'valid_id_type', 'last_booking_date', 'date_joined', 'last_login',
+    ]),
+}
+
+def parse_export_dates(start_param=None, end_param=None):
+    """Optional inclusive YYYY-MM-DD bounds; either side may be left open."""
+    start = datetime.strptime(start_param, "%Y-%m-%d").date() if start_param else None
+    end = datetime.strptime(end_param, "%Y-%m-%d").date() if end_param else None
+    if start and end and end < start:
+        raise ValueError("end_date must not be before start_date")
+    return start, end
+
+def export_queryset(dataset, start=None, end=None):
+    """Rows of `dataset` as value tuples, filtered on its date field by inclusive dates."""
+    if dataset not in EXPORTS:
+        raise ValueError(f"Unknown dataset. Use one of: {', '.join(EXPORTS)}")
+
+    model, date_field, columns = EXPORTS[dataset]
+    queryset = model.objects.all()
+    tz = timezone.get_current_timezone()
+    if start:
+        queryset = queryset.filter(**{
+            f"{date_field}__gte": timezone.make_aware(datetime.combine(start, time.min), tz)
+        })
+    if end:
+        queryset = queryset.filter(**{
+            f"{date_field}__lt": timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+        })
+    return queryset.order_by('pk').values_list(*columns), columns
+
+def _chunks(queryset, chunk_size):
+    """
+    Pages of rows keyed on the primary key (the first column). Each page is its
+    own bounded query, so no database driver ever holds the whole result set.
+    """
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if chunk:
+            yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1][0]
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+class _Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller."""
+    def write(self, value):
+        return value
+
+def iter_csv(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for chunk in _chunks(queryset, chunk_size):
+        yield ''.join(writer.writerow([_csv_value(value) for value in row]) for row in chunk)
+
+def _arrow_type(pa, field):
+    if isinstance(field, models.ForeignKey):
+        field = field.target_field
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.TimeField):
+        return pa.time64('us')
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, (models.AutoField, models.IntegerField)):
+        return pa.int64()
+    return pa.string()
+
+def _arrow_schema(pa, model, columns):
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    return pa.schema([(column, _arrow_type(pa, fields[column])) for column in columns])
+
+def _load_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow to be installed")
+    return pa, pq
+
+def iter_parquet(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Parquet output, one row group per chunk. The file is only ever appended to
+    (the footer comes last), so each row group's bytes can be sent as soon as
+    they are written instead of building the whole file in memory.
+    """
+    pa, pq = _load_pyarrow()
+    schema = _arrow_schema(pa, queryset.model, columns)
+    buffer = io.BytesIO()
+
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer = pq.ParquetWriter(buffer, schema)
+    try:
+        for chunk in _chunks(queryset, chunk_size):
+            frame = pd.DataFrame.from_records(chunk, columns=columns)
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            yield drain()
+    finally:
+        writer.close()
+    yield drain()
+
+def iter_export(dataset, export_format, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+    queryset, columns = export_queryset(dataset, start, end)
+    if export_format == 'parquet':
+        # Fail before the response starts rather than halfway through the stream.
+        _load_pyarrow()
+        return iter_parquet(queryset, columns, chunk_size)
+    return iter_csv(queryset, columns, chunk_size)
+
+_DONE = object()
+
+async def aiter_export(chunks, context=nullcontext):
+    """
+    Async iterator over an iter_export() generator for ASGI streaming responses.
+    Each chunk is read and encoded in the database thread as it is needed, so the
+    response streams instead of the server collecting every chunk first.
+    `context` wraps each step, e.g. replica_reads.
+    """
+    def next_chunk():
+        with context():
+            return next(chunks, _DONE)
+
+    try:
+        while True:
+            chunk = await database_sync_to_async(next_chunk)()
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        await database_sync_to_async(chunks.close)()
+
+def export_filename(dataset, export_format, start=None, end=None):
+    parts = [dataset]
+    if start:
+        parts.append(start.isoformat())
+    if end:
+        parts.append(end.isoformat())
+    return f"{'_'.join(parts)}.{export_format}"
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from django.utils import timezone
+import numpy as np
+from property.models import Rooms
+from booking.models import Bookings
+from .models import OccupancyForecast
+from .occupancy import day_index, night_range, stay_nights
+
+FORECAST_DAYS = 90
+FORECAST_DEFAULT_DAYS = 30
+HISTORY_DAYS = 365
+
+# Statuses that hold a room for a future date, and those that ended in a stay.
+ON_THE_BOOKS_STATUSES = ['pending', 'reserved', 'confirmed', 'checked_in']
+REALIZED_STATUSES = ['checked_in', 'checked_out']
+# A booking in one of these left the books on its cancellation date, or when it
+# was last updated if that is missing.
+REMOVED_STATUSES = ['cancelled', 'rejected', 'missed_reservation', 'no_show']
+NEVER = np.iinfo(np.int64).max // 2
+
+def _booking_arrays(origin, last_day):
+    rows = list(Bookings.objects.filter(
+        is_venue_booking=False,
+        check_in_date__lte=last_day,
+        check_out_date__gte=origin,
+    ).values_list(
+        'check_in_date', 'check_out_date', 'created_at', 'status',
+        'cancellation_date', 'updated_at', 'total_price'
+    ))
+    if not rows:
+        return None
+
+    check_in, check_out, created, status, cancelled, updated, price = zip(*rows)
+    status = np.array(status)
+    cancelled = day_index(cancelled, origin)
+    removed = np.where(np.isnan(cancelled), day_index(updated, origin), cancelled)
+    removed = np.where(np.isin(status, REMOVED_STATUSES), removed, np.nan)
+    return {
+        'check_in': day_index(check_in, origin).astype(np.int64),
+        'check_out': day_index(check_out, origin).astype(np.int64),
+        'created': day_index(created, origin).astype(np.int64),
+        'removed': np.nan_to_num(removed, nan=NEVER).astype(np.int64),
+        'status': status,
+        'price': np.array([float(p or 0) for p in price]),
+    }
+
+def _expand_stays(bookings, days):
+    """One entry per (booking, night) within [0, days), as parallel index arrays."""
+    first, last = night_range(bookings['check_in'], bookings['check_out'], days)
+    lengths = np.maximum(last - first + 1, 0)
+    booking = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    day = np.repeat(first, lengths) + np.arange(lengths.sum()) - starts
+    return booking, day
+
+def compute_forecast(today=None, horizon=FORECAST_DAYS, history_days=HISTORY_DAYS):
+    """
+    Per-night room occupancy and revenue for the `horizon` days from `today`.
+
+    Each future day starts from what is on the books now. The expected pickup
+    for a day `L` days out is the average, over the past `history_days`, of
+    (rooms finally occupied - rooms on the books `L` days before), so later
+    bookings and cancellations are both reflected. Revenue adds the pickup at
+    the historical revenue per room-night to the on-the-books revenue.
+    """
+    today = today or timezone.localdate()
+    origin = today - timedelta(days=history_days)
+    days = history_days + horizon
+    total_rooms = Rooms.objects.count()
+
+    on_the_books = np.zeros(horizon)
+    revenue_on_the_books = np.zeros(horizon)
+    pickup = np.zeros(horizon)
+    room_day_rate = 0.0
+
+    bookings = _booking_arrays(origin, today + timedelta(days=horizon - 1))
+    if bookings is not None:
+        booking, day = _expand_stays(bookings, days)
+        # Booking revenue is spread evenly over its nights; every expanded
+        # booking has at least one.
+        nights = np.maximum(stay_nights(bookings['check_in'], bookings['check_out']), 1)
+        day_rate = bookings['price'] / nights
+
+        future = day >= history_days
+        active = np.isin(bookings['status'], ON_THE_BOOKS_STATUSES)[booking] & future
+        on_the_books = np.bincount(day[active] - history_days, minlength=horizon).astype(float)
+        revenue_on_the_books = np.bincount(
+            day[active] - history_days, weights=day_rate[booking[active]], minlength=horizon
+        )
+
+        past = ~future
+        realized = np.isin(bookings['status'], REALIZED_STATUSES)[booking] & past
+        final = np.bincount(day[realized], minlength=history_days)
+        if realized.any():
+            room_day_rate = float(day_rate[booking[realized]].mean())
+
+        # A booking was on the books for past day d at lead L when it had been
+        # created by d - L and not yet removed, i.e. for L in [d - removed + 1, d - created].
+        d, b = day[past], booking[past]
+        lead_from = np.maximum(d - bookings['removed'][b] + 1, 0)
+        lead_to = np.minimum(d - bookings['created'][b], horizon - 1)
+        valid = lead_from <= lead_to
+        grid = np.zeros((history_days, horizon + 1))
+        np.add.at(grid, (d[valid], lead_from[valid]), 1)
+        np.add.at(grid, (d[valid], lead_to[valid] + 1), -1)
+        booked_at_lead = np.cumsum(grid, axis=1)[:, :horizon]
+
+        # Only learn from days after the first booking was made.
+        first_day = max(int(bookings['created'].min()), 0)
+        if first_day < history_days:
+            pickup = (final[first_day:, None] - booked_at_lead[first_day:]).mean(axis=0)
+
+    forecast = np.clip(on_the_books + pickup, 0, total_rooms)
+    revenue = np.maximum(revenue_on_the_books + (forecast - on_the_books) * room_day_rate, 0)
+    rates = forecast * 100 / total_rooms if total_rooms else np.zeros(horizon)
+
+    return {
+        "generated_for": today.isoformat(),
+        "total_rooms": total_rooms,
+        "dates": [(today + timedelta(days=i)).isoformat() for i in range(horizon)],
+        "on_the_books": [int(value) for value in on_the_books],
+        "occupancy_forecast": [round(float(value), 2) for value in forecast],
+        "occupancy_rate": [round(float(value), 2) for value in rates],
+        "revenue_on_the_books": [round(float(value), 2) for value in revenue_on_the_books],
+        "revenue_forecast": [round(float(value), 2) for value in revenue],
+    }
+
+def store_forecast(today=None):
+    today = today or timezone.localdate()
+    data = compute_forecast(today)
+    OccupancyForecast.objects.update_or_create(generated_for=today, defaults={'data': data})
+    return data
+
+def forecast_for_today(days=FORECAST_DEFAULT_DAYS):
+    """Today's forecast, computed at most once per day, trimmed to `days`."""
+    today = timezone.localdate()
+    data = OccupancyForecast.objects.filter(generated_for=today).values_list('data', flat=True).first()
+    if data is None:
+        data = store_forecast(today)
+
+    series = ['dates', 'on_the_books', 'occupancy_forecast', 'occupancy_rate', 'revenue_on_the_books', 'revenue_forecast']
+    return {**data, **{name: data[name][:days] for name in series}, "days": days}
@@ -0,0 +1,101 @@
+from datetime import datetime, time
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+import numpy as np
+from property.models import Rooms
+from booking.models import Bookings, Transactions
+from .analytics import get_version, read_after_bump
+from .occupancy import day_index, night_range, stay_nights
+
+KPI_CACHE_TIMEOUT = 60 * 10
+# Statuses that count as a sold room; pending and cancelled stays do not.
+SOLD_STATUSES = ['reserved', 'confirmed', 'checked_in', 'checked_out']
+
+def _stay_arrays(start, end):
+    rows = list(Bookings.objects.filter(
+        status__in=SOLD_STATUSES,
+        is_venue_booking=False,
+        check_in_date__lte=end,
+        check_out_date__gte=start,
+    ).values_list('check_in_date', 'check_out_date', 'created_at', 'total_price'))
+    if not rows:
+        return None
+
+    check_in, check_out, created, price = zip(*rows)
+    check_in = day_index(check_in, start)
+    return {
+        'check_in': check_in.astype(np.int64),
+        'check_out': day_index(check_out, start).astype(np.int64),
+        'lead_time': (check_in - day_index(created, start)).astype(np.int64),
+        'price': np.array([float(p or 0) for p in price]),
+    }
+
+def compute_kpis(start, end):
+    """
+    ADR, RevPAR, occupancy, length of stay and lead time for the inclusive
+    date range, from one bookings query and one transactions aggregate.
+
+    Room-nights run from check-in up to check-out (see admin_dashboard.occupancy).
+    A stay's price is spread evenly over its nights, so a stay crossing the range
+    edge only contributes the nights inside it, and a same-day stay sells no
+    nights and adds no room revenue. Length of stay and lead time describe the
+    stays that check in during the range.
+    """
+    days = (end - start).days + 1
+    total_rooms = Rooms.objects.count()
+    available = total_rooms * days
+
+    room_nights = 0
+    room_revenue = 0.0
+    arrivals = 0
+    average_stay = average_lead = median_lead = 0.0
+
+    stays = _stay_arrays(start, end)
+    if stays is not None:
+        check_in = stays['check_in']
+        nights = stay_nights(check_in, stays['check_out'])
+        first, last = night_range(check_in, stays['check_out'], days)
+        nights_in_range = np.maximum(last - first + 1, 0)
+
+        room_nights = int(nights_in_range.sum())
+        sold = nights > 0
+        room_revenue = float((stays['price'][sold] / nights[sold] * nights_in_range[sold]).sum())
+
+        arriving = check_in >= 0
+        arrivals = int(arriving.sum())
+        if arrivals:
+            average_stay = float(nights[arriving].mean())
+            average_lead = float(stays['lead_time'][arriving].mean())
+            median_lead = float(np.median(stays['lead_time'][arriving]))
+
+    collected = Transactions.objects.filter(
+        booking__is_venue_booking=False,
+        status='completed',
+        transaction_date__gte=timezone.make_aware(datetime.combine(start, time.min)),
+        transaction_date__lte=timezone.make_aware(datetime.combine(end, time.max)),
+    ).aggregate(total=Sum('amount'))['total'] or 0
+
+    return {
+        "adr": round(room_revenue / room_nights, 2) if room_nights else 0,
+        "revpar": round(room_revenue / available, 2) if available else 0,
+        "occupancy_rate": round(room_nights * 100 / available, 2) if available else 0,
+        "room_revenue": round(room_revenue, 2),
+        "collected_room_revenue": float(collected),
+        "room_nights_sold": room_nights,
+        "available_room_nights": available,
+        "arrivals": arrivals,
+        "average_length_of_stay": round(average_stay, 2),
+        "average_lead_time": round(average_lead, 2),
+        "median_lead_time": round(median_lead, 2),
+    }
+
+def kpis_for_period(start, end):
+    """compute_kpis, cached per range until bookings, transactions or rooms change."""
+    key = f"analytics:kpis:{start.isoformat()}:{end.isoformat()}:v{get_version('dashboard_stats')}"
+    kpis = cache.get(key)
+    if kpis is None:
+        with read_after_bump('dashboard_stats'):
+            kpis = compute_kpis(start, end)
+        cache.set(key, kpis, KPI_CACHE_TIMEOUT)
+    return kpis
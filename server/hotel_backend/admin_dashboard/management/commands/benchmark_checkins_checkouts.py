@@ -0,0 +1,99 @@
+from collections import Counter
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from datetime import date, timedelta
+from booking.models import Bookings
+from property.models import Rooms
+from user_roles.models import CustomUsers
+from admin_dashboard.daily_stats import apply_contributions, booking_contributions, daily_stats_series
+from admin_dashboard.models import DailyBookingStats
+import random
+import time
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic bookings history inside a rolled-back transaction and time '
+        'the daily_checkins_checkouts rollup read for one month as the table grows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500_000, help='Total bookings to seed')
+        parser.add_argument('--steps', type=int, default=5, help='Number of table sizes to measure')
+        parser.add_argument('--month-rows', type=int, default=2_000, help='Bookings inside the measured month')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per table size')
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        target_start = date(2025, 3, 1)
+        target_end = date(2025, 3, 31)
+
+        with transaction.atomic():
+            user = CustomUsers.objects.create_user(
+                username='benchmark@example.com', email='benchmark@example.com', password=None
+            )
+            room = Rooms.objects.create(room_name='Benchmark Room')
+
+            self.seed(user, room, rng, target_start, target_start, target_end, options['month_rows'], options['batch_size'])
+            history_rows = max(options['rows'] - options['month_rows'], 0)
+            step_rows = history_rows // max(options['steps'], 1)
+
+            self.stdout.write(f"{'table rows':>12}  {'rollup rows':>12}  {'median ms':>10}  {'min ms':>8}")
+            for step in range(options['steps'] + 1):
+                if step:
+                    self.seed(user, room, rng, None, target_start, target_end, step_rows, options['batch_size'])
+                timings = []
+                for _ in range(options['repeat']):
+                    began = time.perf_counter()
+                    daily_stats_series(target_start, target_end, ['check_ins', 'check_outs'])
+                    timings.append((time.perf_counter() - began) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f"{Bookings.objects.count():>12}  {DailyBookingStats.objects.count():>12}  "
+                    f"{timings[len(timings) // 2]:>10.2f}  {timings[0]:>8.2f}"
+                )
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def seed(self, user, room, rng, month_start, target_start, target_end, count, batch_size):
+        """
+        Insert `count` bookings, inside the target month when month_start is set,
+        otherwise outside it. bulk_create skips the signals that maintain the
+        rollup, so their contributions are applied here, untimed.
+        """
+        statuses = ['checked_in', 'checked_out', 'checked_out', 'cancelled', 'reserved']
+        history_start = date(2015, 1, 1)
+        history_days = (date(2030, 12, 31) - history_start).days
+
+        batch = []
+        for _ in range(count):
+            if month_start:
+                check_in = month_start + timedelta(days=rng.randrange((target_end - target_start).days + 1))
+            else:
+                check_in = history_start + timedelta(days=rng.randrange(history_days))
+                if target_start - timedelta(days=14) <= check_in <= target_end:
+                    check_in -= timedelta(days=60)
+            batch.append(Bookings(
+                user=user,
+                room=room,
+                check_in_date=check_in,
+                check_out_date=check_in + timedelta(days=rng.randint(1, 7)),
+                status=rng.choice(statuses),
+            ))
+            if len(batch) >= batch_size:
+                self.insert(batch)
+                batch = []
+        if batch:
+            self.insert(batch)
+
+    def insert(self, bookings):
+        Bookings.objects.bulk_create(bookings)
+        contributions = Counter()
+        for booking in bookings:
+            contributions.update(booking_contributions(booking))
+        apply_contributions(contributions)
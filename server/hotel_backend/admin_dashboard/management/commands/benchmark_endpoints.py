@@ -0,0 +1,189 @@
+from contextlib import ExitStack
+from datetime import date, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from booking.models import Bookings
+from user_roles.login_guard import reset_attempts
+from user_roles.models import CustomUsers, Notification
+from admin_dashboard.management.commands.generate_dataset import SYNTHETIC_PASSWORD, USER_PREFIX
+import json
+import time
+
+DEFAULT_BASELINE = settings.BASE_DIR / 'benchmarks' / 'endpoint_baseline.json'
+ADMIN_EMAIL = f"{USER_PREFIX}admin@example.com"
+GUEST_EMAIL = f"{USER_PREFIX}1@example.com"
+DAILY_ANALYTICS = [
+    'daily_revenue', 'daily_bookings', 'daily_occupancy',
+    'daily_checkins_checkouts', 'daily_cancellations', 'daily_no_shows_rejected',
+]
+
+def endpoints(month):
+    """(name, method, path, params, who) for every benchmarked request."""
+    arrival = date.today() + timedelta(days=14)
+    month_params = {'month': month.month, 'year': month.year}
+    return [
+        ('fetch_availability', 'get', '/booking/availability',
+         {'arrival': arrival.isoformat(), 'departure': (arrival + timedelta(days=3)).isoformat()}, 'guest'),
+        ('bookings_list', 'get', '/booking/bookings', {'page': 1, 'page_size': 10}, 'guest'),
+        ('admin_bookings', 'get', '/master/bookings', {'page': 1, 'page_size': 10}, 'admin'),
+        ('dashboard_stats', 'get', '/master/stats', {}, 'admin'),
+        *[(name, 'get', f'/master/{name}', month_params, 'admin') for name in DAILY_ANALYTICS],
+        ('get_notifications', 'get', '/api/guest/notifications', {'limit': 10}, 'guest'),
+        ('user_login', 'post', '/api/auth/login', {'email': GUEST_EMAIL, 'password': SYNTHETIC_PASSWORD}, None),
+    ]
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+class Command(BaseCommand):
+    help = (
+        'Time the main endpoints in-process against the synthetic dataset (see generate_dataset), '
+        'and compare latency percentiles and query counts with a JSON baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+        parser.add_argument('--update', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per endpoint first')
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request')
+        parser.add_argument('--month', type=lambda value: date.fromisoformat(f"{value}-01"), default=None,
+                            help='Month for the analytics endpoints, YYYY-MM (default current month)')
+        parser.add_argument('--latency-tolerance', type=float, default=0.25,
+                            help='Allowed p50/p95 slowdown as a fraction of the baseline')
+        parser.add_argument('--latency-floor-ms', type=float, default=2.0,
+                            help='Slowdowns smaller than this are treated as noise')
+        parser.add_argument('--query-tolerance', type=int, default=0, help='Allowed extra queries per request')
+
+    def handle(self, *args, **options):
+        if not CustomUsers.objects.filter(email=GUEST_EMAIL).exists():
+            raise CommandError('No synthetic dataset found; run generate_dataset first')
+        clients = self.clients()
+        month = options['month'] or timezone.localdate().replace(day=1)
+
+        results = {}
+        self.stdout.write(f"{'endpoint':<26} {'statuses':>8} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8}")
+        for name, method, path, params, who in endpoints(month):
+            result = self.measure(clients[who], method, path, params, options)
+            results[name] = result
+            statuses = '/'.join(str(code) for code in result['statuses'])
+            self.stdout.write(
+                f"{name:<26} {statuses:>8} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['queries']:>8}"
+            )
+        # Timings from a mix of responses (e.g. some logins throttled) compare
+        # nothing meaningful, so neither record nor compare them.
+        mixed = [name for name, result in results.items() if len(result['statuses']) > 1]
+        if mixed:
+            raise CommandError(f"Endpoints returned more than one status across repeats: {', '.join(mixed)}")
+
+        report = {
+            "dataset": {
+                "bookings": Bookings.objects.count(),
+                "notifications": Notification.objects.count(),
+            },
+            "options": {"repeat": options['repeat'], "cold": options['cold'], "month": month.isoformat()[:7]},
+            "endpoints": results,
+        }
+        if options['update']:
+            self.write_baseline(options['baseline'], report)
+            return
+        self.compare(options['baseline'], report, options)
+
+    def clients(self):
+        admin, _ = CustomUsers.objects.get_or_create(
+            email=ADMIN_EMAIL, defaults={'username': ADMIN_EMAIL, 'role': 'admin', 'first_name': 'Synthetic'}
+        )
+        guest = CustomUsers.objects.get(email=GUEST_EMAIL)
+        clients = {None: APIClient()}
+        for who, user in (('admin', admin), ('guest', guest)):
+            client = APIClient()
+            client.cookies['access_token'] = str(AccessToken.for_user(user))
+            clients[who] = client
+        return clients
+
+    def measure(self, client, method, path, params, options):
+        timings, queries, statuses = [], 0, set()
+        for attempt in range(options['warmup'] + options['repeat']):
+            if options['cold']:
+                cache.clear()
+            counter = QueryCounter()
+            # Every attempt comes from a client address the login guard has not
+            # counted yet, so user_login stays under the per-IP limit and costs
+            # the same in every run.
+            extra = {'REMOTE_ADDR': f"10.{attempt // 250 % 250}.{attempt % 250}.1"}
+            reset_attempts(extra['REMOTE_ADDR'])
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                began = time.perf_counter()
+                if method == 'get':
+                    response = client.get(path, params, **extra)
+                else:
+                    response = client.post(path, params, format='json', **extra)
+                elapsed = (time.perf_counter() - began) * 1000
+            if attempt >= options['warmup']:
+                timings.append(elapsed)
+                queries = max(queries, counter.count)
+                statuses.add(response.status_code)
+        return {
+            "statuses": sorted(statuses),
+            "p50_ms": round(percentile(timings, 0.5), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "max_ms": round(max(timings), 3),
+            "queries": queries,
+        }
+
+    def write_baseline(self, path, report):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, sort_keys=True) + '\n')
+        self.stdout.write(self.style.SUCCESS(f"Wrote baseline to {path}"))
+
+    def compare(self, path, report, options):
+        try:
+            with open(path) as baseline_file:
+                baseline = json.load(baseline_file)
+        except FileNotFoundError:
+            raise CommandError(f"No baseline at {path}; run with --update to record one")
+
+        if baseline.get('dataset') != report['dataset'] or baseline.get('options') != report['options']:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded with {baseline.get('dataset')} {baseline.get('options')}, "
+                f"this run used {report['dataset']} {report['options']}; timings may not be comparable"
+            ))
+
+        regressions = []
+        for name, result in report['endpoints'].items():
+            before = baseline['endpoints'].get(name)
+            if before is None:
+                self.stdout.write(f"{name}: not in the baseline")
+                continue
+            if result['statuses'] != before['statuses']:
+                regressions.append(f"{name}: statuses {before['statuses']} -> {result['statuses']}")
+            if result['queries'] > before['queries'] + options['query_tolerance']:
+                regressions.append(f"{name}: {before['queries']} -> {result['queries']} queries")
+            for key in ('p50_ms', 'p95_ms'):
+                allowed = max(before[key] * (1 + options['latency_tolerance']), before[key] + options['latency_floor_ms'])
+                if result[key] > allowed:
+                    regressions.append(f"{name}: {key} {before[key]:.2f} -> {result[key]:.2f}")
+
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            raise CommandError(f"{len(regressions)} regression(s) against {path}")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.exports import EXPORT_FORMATS, EXPORTS, iter_export, parse_export_dates
+
+class Command(BaseCommand):
+    help = 'Stream bookings, transactions, reviews or users to a CSV or Parquet file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(EXPORTS))
+        parser.add_argument('--format', dest='export_format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--start-date', help='Inclusive start date (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Inclusive end date (YYYY-MM-DD)')
+        parser.add_argument('--output', '-o', help='Output file; CSV goes to stdout when omitted')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        export_format = options['export_format']
+        if export_format == 'parquet' and not options['output']:
+            raise CommandError("--output is required for parquet exports")
+
+        try:
+            start, end = parse_export_dates(options['start_date'], options['end_date'])
+            chunks = iter_export(options['dataset'], export_format, start, end, options['chunk_size'])
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(str(e))
+
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        mode, encoding = ('wb', None) if export_format == 'parquet' else ('w', 'utf-8')
+        with open(options['output'], mode, encoding=encoding, newline='' if encoding else None) as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported {options['dataset']} to {options['output']}"))
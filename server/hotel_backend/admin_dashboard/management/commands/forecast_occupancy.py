@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from admin_dashboard.forecast import store_forecast
+
+class Command(BaseCommand):
+    help = "Compute and store today's occupancy and revenue forecast"
+
+    def handle(self, *args, **options):
+        data = store_forecast()
+        self.stdout.write(
+            self.style.SUCCESS(f"Stored forecast for {data['generated_for']} ({len(data['dates'])} days)")
+        )
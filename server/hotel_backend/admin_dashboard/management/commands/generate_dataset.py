@@ -0,0 +1,381 @@
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from booking.models import Bookings, Reviews, Transactions
+from property.models import Amenities, Areas, Rooms
+from user_roles.models import CustomUsers, Notification
+from admin_dashboard.daily_stats import rebuild_daily_stats
+import random
+import time as clock
+
+# Every generated row can be found again through these names, so --flush
+# removes a previous dataset without touching real data.
+USER_PREFIX = 'synthetic-'
+ROOM_PREFIX = 'Synthetic Room '
+AREA_PREFIX = 'Synthetic Area '
+AMENITY_PREFIX = 'Synthetic amenity '
+SYNTHETIC_PASSWORD = 'synthetic-password'
+
+# (status, weight) by where the stay falls relative to --until.
+PAST_STATUSES = [('checked_out', 70), ('cancelled', 14), ('rejected', 6), ('missed_reservation', 10)]
+CURRENT_STATUSES = [('checked_in', 90), ('cancelled', 10)]
+FUTURE_STATUSES = [('pending', 30), ('reserved', 40), ('confirmed', 15), ('cancelled', 10), ('rejected', 5)]
+
+NOTIFICATION_TYPES = {
+    'reserved': 'reserved',
+    'checked_in': 'checked_in',
+    'checked_out': 'checked_out',
+    'cancelled': 'cancelled',
+    'rejected': 'rejected',
+    'missed_reservation': 'no_show',
+}
+
+REVIEW_TEXTS = [
+    'Great stay, friendly staff.',
+    'Clean room and quick check-in.',
+    'Good value for the price.',
+    'The venue was perfect for our event.',
+    'Room was fine but the aircon was noisy.',
+    '',
+]
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we set instead of stamping now()."""
+    fields = [field for model in models for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+class BulkWriter:
+    """Buffers new rows per model and bulk_creates them batch_size at a time."""
+    def __init__(self, using, batch_size):
+        self.using = using
+        self.batch_size = batch_size
+        self.pending = {}
+        self.counts = {}
+
+    def add(self, obj):
+        batch = self.pending.setdefault(type(obj), [])
+        batch.append(obj)
+        if len(batch) >= self.batch_size:
+            self.flush(type(obj))
+
+    def flush(self, model):
+        batch = self.pending.pop(model, [])
+        if batch:
+            # No primary keys come back on MySQL, so rows are found again by their synthetic names.
+            model.objects.using(self.using).bulk_create(batch)
+            self.counts[model] = self.counts.get(model, 0) + len(batch)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            for model in list(self.pending):
+                self.flush(model)
+
+def weighted(rng, choices):
+    return rng.choices([value for value, _ in choices], weights=[weight for _, weight in choices])[0]
+
+def stamp(day, rng, earliest_hour=8, latest_hour=20):
+    moment = time(rng.randint(earliest_hour, latest_hour), rng.randrange(60))
+    return datetime.combine(day, moment, tzinfo=dt_timezone.utc)
+
+class Command(BaseCommand):
+    help = (
+        'Generate a reproducible synthetic hotel dataset (rooms, areas, guests, bookings in every '
+        'status, transactions, reviews and notifications) with bulk inserts, for load and benchmark testing'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=2_000)
+        parser.add_argument('--areas', type=int, default=300)
+        parser.add_argument('--users', type=int, default=20_000)
+        parser.add_argument('--bookings', type=int, default=200_000)
+        parser.add_argument('--years', type=int, default=3, help='Years of booking history before --until')
+        parser.add_argument('--until', type=date.fromisoformat, default=None,
+                            help='Date the data is "as of", YYYY-MM-DD (default today); fix it to reproduce a dataset')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2_000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to fill, e.g. a SQLite or MySQL copy configured in settings')
+        parser.add_argument('--flush', action='store_true', help='Delete a previously generated dataset first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        if self.using not in connections.settings:
+            raise CommandError(f"Unknown database alias '{self.using}'")
+        self.until = options['until'] or date.today()
+        self.history_start = self.until - timedelta(days=365 * options['years'])
+
+        began = clock.perf_counter()
+        with transaction.atomic(using=self.using):
+            if options['flush']:
+                self.flush()
+            elif CustomUsers.objects.using(self.using).filter(username__startswith=USER_PREFIX).exists():
+                raise CommandError('A synthetic dataset already exists here; pass --flush to replace it')
+
+            with explicit_timestamps(Bookings, Reviews, Notification):
+                amenity_ids = self.create_amenities()
+                rooms = self.create_rooms(options['rooms'], amenity_ids)
+                areas = self.create_areas(options['areas'])
+                user_ids = self.create_users(options['users'])
+                bookings = self.create_bookings(options['bookings'], user_ids, rooms, areas)
+                self.create_dependents(bookings)
+
+        if self.using == DEFAULT_DB_ALIAS:
+            # bulk_create skips the signals that keep these up to date.
+            self.stdout.write("Rebuilding daily booking stats...")
+            rebuild_daily_stats()
+            cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated dataset on '{self.using}' in {clock.perf_counter() - began:.1f}s"
+        ))
+
+    def flush(self):
+        # Plain DELETE statements rather than QuerySet.delete(), which would load
+        # every row to send per-row delete signals; the rollup is rebuilt after
+        # generating anyway. The prefixes contain no LIKE wildcards.
+        quote = connections[self.using].ops.quote_name
+        users = f"SELECT id FROM {quote(CustomUsers._meta.db_table)} WHERE username LIKE %s"
+        rooms = f"SELECT id FROM {quote(Rooms._meta.db_table)} WHERE room_name LIKE %s"
+        user_params = [f"{USER_PREFIX}%"]
+        statements = [
+            (Notification, f"user_id IN ({users})", user_params),
+            (Reviews, f"user_id IN ({users})", user_params),
+            (Transactions, f"user_id IN ({users})", user_params),
+            (Bookings, f"user_id IN ({users})", user_params),
+            (Rooms.amenities.through, f"rooms_id IN ({rooms})", [f"{ROOM_PREFIX}%"]),
+            (Rooms, "room_name LIKE %s", [f"{ROOM_PREFIX}%"]),
+            (Areas, "area_name LIKE %s", [f"{AREA_PREFIX}%"]),
+            (Amenities, "description LIKE %s", [f"{AMENITY_PREFIX}%"]),
+            (CustomUsers, "username LIKE %s", user_params),
+        ]
+        with transaction.atomic(using=self.using), connections[self.using].cursor() as cursor:
+            for model, where, params in statements:
+                cursor.execute(f"DELETE FROM {quote(model._meta.db_table)} WHERE {where}", params)
+                self.stdout.write(f"Deleted {cursor.rowcount} {model._meta.db_table} rows")
+
+    def insert(self, model, objects):
+        with BulkWriter(self.using, self.batch_size) as writer:
+            for obj in objects:
+                writer.add(obj)
+        self.report(writer)
+
+    def report(self, writer):
+        for model, count in writer.counts.items():
+            self.stdout.write(f"Inserted {count} {model._meta.db_table} rows")
+
+    def create_amenities(self):
+        names = ['Wi-Fi', 'Air conditioning', 'Smart TV', 'Mini bar', 'Balcony', 'Bathtub',
+                 'Coffee maker', 'Work desk', 'Room service', 'Safe', 'Sea view', 'Kitchenette']
+        self.insert(Amenities, (Amenities(description=f"{AMENITY_PREFIX}{name}") for name in names))
+        return list(Amenities.objects.using(self.using).filter(
+            description__startswith=AMENITY_PREFIX).values_list('id', flat=True).order_by('id'))
+
+    def create_rooms(self, count, amenity_ids):
+        rng = self.rng
+        self.insert(Rooms, (
+            Rooms(
+                room_name=f"{ROOM_PREFIX}{number}",
+                room_type=rng.choice(['premium', 'suites']),
+                bed_type=rng.choice(['single', 'twin', 'double', 'queen', 'king']),
+                status='maintenance' if rng.random() < 0.05 else 'available',
+                room_price=Decimal(rng.randrange(1_500, 12_000, 50)),
+                max_guests=rng.randint(1, 6),
+                discount_percent=rng.choice([0, 0, 0, 5, 10, 15]),
+                description='Generated room',
+            )
+            for number in range(1, count + 1)
+        ))
+        rooms = dict(Rooms.objects.using(self.using).filter(
+            room_name__startswith=ROOM_PREFIX).values_list('id', 'room_price').order_by('id'))
+
+        through = Rooms.amenities.through
+        self.insert(through, (
+            through(rooms_id=room_id, amenities_id=amenity_id)
+            for room_id in rooms
+            for amenity_id in rng.sample(amenity_ids, rng.randint(2, min(6, len(amenity_ids))))
+        ))
+        return rooms
+
+    def create_areas(self, count):
+        rng = self.rng
+        self.insert(Areas, (
+            Areas(
+                area_name=f"{AREA_PREFIX}{number}",
+                capacity=rng.choice([20, 50, 80, 120, 200, 400]),
+                price_per_hour=Decimal(rng.randrange(1_000, 20_000, 100)),
+                status='maintenance' if rng.random() < 0.05 else 'available',
+                discount_percent=rng.choice([0, 0, 5, 10]),
+                description='Generated event venue',
+            )
+            for number in range(1, count + 1)
+        ))
+        return dict(Areas.objects.using(self.using).filter(
+            area_name__startswith=AREA_PREFIX).values_list('id', 'price_per_hour').order_by('id'))
+
+    def create_users(self, count):
+        rng = self.rng
+        # Hashing is deliberately slow, so every synthetic guest shares one hash.
+        password = make_password(SYNTHETIC_PASSWORD)
+        joined = datetime.combine(self.history_start, time(9), tzinfo=dt_timezone.utc)
+        self.insert(CustomUsers, (
+            CustomUsers(
+                username=f"{USER_PREFIX}{number}@example.com",
+                email=f"{USER_PREFIX}{number}@example.com",
+                password=password,
+                first_name=f"Guest{number}",
+                last_name=rng.choice(['Santos', 'Reyes', 'Cruz', 'Garcia', 'Mendoza', 'Bautista', 'Ocampo']),
+                role='guest',
+                is_verified=weighted(rng, [('verified', 60), ('unverified', 30), ('pending', 7), ('rejected', 3)]),
+                date_joined=joined,
+            )
+            for number in range(1, count + 1)
+        ))
+        return list(CustomUsers.objects.using(self.using).filter(
+            username__startswith=USER_PREFIX).values_list('id', flat=True).order_by('id'))
+
+    def booking(self, user_ids, room_items, area_items):
+        rng = self.rng
+        span = (self.until - self.history_start).days + 90
+        check_in = self.history_start + timedelta(days=rng.randrange(span))
+        created = stamp(min(check_in - timedelta(days=rng.randint(0, 60)), self.until), rng)
+
+        if area_items and rng.random() < 0.15:
+            area_id, price_per_hour = rng.choice(area_items)
+            hours = rng.randint(2, 8)
+            start = rng.randint(8, 22 - hours)
+            booking = Bookings(
+                area_id=area_id, is_venue_booking=True,
+                check_in_date=check_in, check_out_date=check_in,
+                start_time=time(start), end_time=time(start + hours),
+                total_price=price_per_hour * hours,
+                number_of_guests=rng.randint(10, 150),
+            )
+        else:
+            room_id, room_price = rng.choice(room_items)
+            nights = rng.choices([1, 2, 3, 4, 5, 7, 10], weights=[30, 25, 15, 10, 8, 8, 4])[0]
+            discount = Decimal('0.90') if nights >= 7 else Decimal('0.95') if nights >= 3 else Decimal('1')
+            booking = Bookings(
+                room_id=room_id,
+                check_in_date=check_in, check_out_date=check_in + timedelta(days=nights),
+                total_price=(room_price * discount * nights).quantize(Decimal('0.01')),
+                number_of_guests=rng.randint(1, 4),
+                time_of_arrival=time(rng.randint(12, 20)),
+            )
+
+        if booking.check_out_date < self.until:
+            booking.status = weighted(rng, PAST_STATUSES)
+        elif booking.check_in_date <= self.until:
+            booking.status = weighted(rng, CURRENT_STATUSES)
+        else:
+            booking.status = weighted(rng, FUTURE_STATUSES)
+
+        booking.user_id = rng.choice(user_ids)
+        booking.payment_method = rng.choice(['gcash', 'physical'])
+        booking.phone_number = f"09{rng.randrange(10 ** 9):09d}"
+        booking.created_at = created
+        booking.updated_at = stamp(min(booking.check_out_date, self.until), rng)
+        if booking.status in ('reserved', 'confirmed', 'checked_in', 'checked_out'):
+            booking.down_payment = (booking.total_price / 2).quantize(Decimal('0.01'))
+            booking.payment_status = 'paid' if booking.status == 'checked_out' else 'partial'
+            booking.payment_date = created if booking.payment_method == 'gcash' else None
+        if booking.status == 'cancelled':
+            booking.cancellation_date = stamp(min(check_in, self.until), rng)
+            booking.cancellation_reason = rng.choice(['Change of plans', 'Found another hotel', 'Emergency'])
+        if booking.updated_at < created:
+            booking.updated_at = created
+        return booking
+
+    def create_bookings(self, count, user_ids, rooms, areas):
+        if not user_ids or not rooms:
+            raise CommandError('At least one user and one room are needed to generate bookings')
+        room_items, area_items = list(rooms.items()), list(areas.items())
+        self.insert(Bookings, (self.booking(user_ids, room_items, area_items) for _ in range(count)))
+        return Bookings.objects.using(self.using).filter(user__username__startswith=USER_PREFIX).values_list(
+            'id', 'user_id', 'room_id', 'area_id', 'status', 'total_price', 'down_payment',
+            'check_in_date', 'check_out_date', 'created_at', 'cancellation_date',
+        ).order_by('id')
+
+    def booking_chunks(self, bookings):
+        """The booking rows in id order, read batch_size at a time between the inserts."""
+        last_id = 0
+        while True:
+            chunk = list(bookings.filter(id__gt=last_id)[:self.batch_size])
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1][0]
+
+    def create_dependents(self, bookings):
+        """Transactions, reviews and notifications, following from each booking's status."""
+        rng = self.rng
+        with BulkWriter(self.using, self.batch_size) as writer:
+            for chunk in self.booking_chunks(bookings):
+                for row in chunk:
+                    for obj in self.dependents(rng, *row):
+                        writer.add(obj)
+        self.report(writer)
+
+    def dependents(self, rng, booking_id, user_id, room_id, area_id, status, total, down_payment,
+                   check_in, check_out, created, cancelled_at):
+        if down_payment is not None:
+            yield Transactions(
+                booking_id=booking_id, user_id=user_id, transaction_type='reservation',
+                amount=down_payment, status='completed', transaction_date=created,
+            )
+        if status == 'checked_out':
+            yield Transactions(
+                booking_id=booking_id, user_id=user_id, transaction_type='booking',
+                amount=total - down_payment, status='completed', transaction_date=stamp(check_out, rng),
+            )
+            if rng.random() < 0.35:
+                yield Reviews(
+                    user_id=user_id, booking_id=booking_id, room_id=room_id, area_id=area_id,
+                    rating=rng.choices([1, 2, 3, 4, 5], weights=[3, 5, 15, 37, 40])[0],
+                    review_text=rng.choice(REVIEW_TEXTS),
+                    created_at=stamp(min(check_out + timedelta(days=rng.randint(0, 5)), self.until), rng),
+                )
+        elif status == 'cancelled' and rng.random() < 0.3:
+            # The guest had paid half up front. The refund is a negative amount,
+            # so revenue sums net the two out once it completes.
+            paid = (total / 2).quantize(Decimal('0.01'))
+            yield Transactions(
+                booking_id=booking_id, user_id=user_id, transaction_type='reservation',
+                amount=paid, status='completed', transaction_date=created,
+            )
+            yield Transactions(
+                booking_id=booking_id, user_id=user_id, transaction_type='cancellation_refund',
+                amount=-paid, status=rng.choice(['completed', 'pending']),
+                transaction_date=cancelled_at or created,
+            )
+        elif status == 'pending' and rng.random() < 0.2:
+            yield Transactions(
+                booking_id=booking_id, user_id=user_id, transaction_type='reservation',
+                amount=(total / 2).quantize(Decimal('0.01')), status=rng.choice(['pending', 'failed']),
+                transaction_date=created,
+            )
+
+        if status in NOTIFICATION_TYPES:
+            yield Notification(
+                user_id=user_id, booking_id=booking_id,
+                notification_type=NOTIFICATION_TYPES[status],
+                message=f"Your booking #{booking_id} is now {status.replace('_', ' ')}.",
+                is_read=check_out < self.until or rng.random() < 0.5,
+                created_at=cancelled_at or stamp(min(check_in, self.until), rng),
+            )
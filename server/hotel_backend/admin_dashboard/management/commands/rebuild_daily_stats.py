@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from admin_dashboard.daily_stats import rebuild_daily_stats
+
+class Command(BaseCommand):
+    help = 'Recompute the daily booking stats rollup from the bookings and transactions tables'
+
+    def handle(self, *args, **options):
+        count = rebuild_daily_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt daily booking stats ({count} rows)")
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.reports import previous_month, render_monthly_reports, stale_report_months
+
+class Command(BaseCommand):
+    help = (
+        'Render monthly report artifacts: last month plus any report that was requested '
+        'or whose data changed since it was rendered'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int)
+        parser.add_argument('--month', type=int)
+
+    def handle(self, *args, **options):
+        if (options['year'] is None) != (options['month'] is None):
+            raise CommandError("--year and --month must be given together")
+
+        if options['year'] is not None:
+            if not 1 <= options['month'] <= 12:
+                raise CommandError("Invalid month")
+            months = [(options['year'], options['month'])]
+        else:
+            months = sorted(set(stale_report_months()) | {previous_month()})
+
+        rendered = render_monthly_reports(months)
+        for (year, month), version in rendered.items():
+            self.stdout.write(f"Rendered {year}-{month:02d} (data version {version})")
+        if len(rendered) < len(months):
+            raise CommandError(f"{len(months) - len(rendered)} of {len(months)} monthly report(s) failed to render")
+        self.stdout.write(self.style.SUCCESS(f"Rendered {len(months)} monthly report(s)"))
@@ -0,0 +1,115 @@
+# Generated by Django 5.2.2 on 2026-10-19 08:43
+
+from collections import Counter, defaultdict
+from datetime import datetime
+from decimal import Decimal
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# A frozen copy of admin_dashboard.daily_stats as it stood when the rollup was
+# introduced, so later changes to the live module cannot alter this migration.
+def as_date(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+def booking_property(booking):
+    if booking is None:
+        return ('none', 0)
+    if booking.is_venue_booking and booking.area_id:
+        return ('area', booking.area_id)
+    if booking.room_id:
+        return ('room', booking.room_id)
+    return ('none', 0)
+
+def booking_contributions(booking):
+    contributions = Counter()
+    prop = booking_property(booking)
+    dated = [
+        (booking.created_at, True, 'bookings_created'),
+        (booking.check_in_date, booking.status in ('checked_in', 'checked_out'), 'check_ins'),
+        (booking.check_out_date, booking.status == 'checked_out', 'check_outs'),
+        (booking.cancellation_date, booking.status == 'cancelled', 'cancellations'),
+        (booking.updated_at, booking.status == 'missed_reservation', 'no_shows'),
+        (booking.updated_at, booking.status == 'rejected', 'rejections'),
+    ]
+    for value, counts, field in dated:
+        day = as_date(value)
+        if day and counts:
+            contributions[(day, *prop, field)] += 1
+    return contributions
+
+def transaction_contributions(txn):
+    contributions = Counter()
+    paid_on = as_date(txn.transaction_date)
+    if txn.status == 'completed' and paid_on:
+        booking = txn.booking if txn.booking_id else None
+        contributions[(paid_on, *booking_property(booking), 'revenue')] += Decimal(str(txn.amount))
+    return contributions
+
+def populate_daily_stats(apps, schema_editor):
+    DailyBookingStats = apps.get_model('admin_dashboard', 'DailyBookingStats')
+    Bookings = apps.get_model('booking', 'Bookings')
+    Transactions = apps.get_model('booking', 'Transactions')
+
+    totals = Counter()
+    bookings = Bookings.objects.only(
+        'room_id', 'area_id', 'is_venue_booking', 'status', 'created_at', 'updated_at',
+        'check_in_date', 'check_out_date', 'cancellation_date'
+    )
+    for booking in bookings.iterator(chunk_size=2000):
+        totals.update(booking_contributions(booking))
+
+    transactions = Transactions.objects.filter(status='completed').select_related('booking').only(
+        'amount', 'status', 'transaction_date', 'booking_id',
+        'booking__room_id', 'booking__area_id', 'booking__is_venue_booking'
+    )
+    for txn in transactions.iterator(chunk_size=2000):
+        totals.update(transaction_contributions(txn))
+
+    rows = defaultdict(dict)
+    for (day, property_type, property_id, field), amount in totals.items():
+        if amount:
+            rows[(day, property_type, property_id)][field] = amount
+    DailyBookingStats.objects.bulk_create([
+        DailyBookingStats(date=day, property_type=property_type, property_id=property_id, **changes)
+        for (day, property_type, property_id), changes in rows.items()
+    ], batch_size=2000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0001_initial'),
+        ('booking', '0003_bookings_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('property_type', models.CharField(choices=[('room', 'Room'), ('area', 'Area'), ('none', 'None')], default='none', max_length=10)),
+                ('property_id', models.PositiveIntegerField(default=0)),
+                ('bookings_created', models.IntegerField(default=0)),
+                ('check_ins', models.IntegerField(default=0)),
+                ('check_outs', models.IntegerField(default=0)),
+                ('cancellations', models.IntegerField(default=0)),
+                ('no_shows', models.IntegerField(default=0)),
+                ('rejections', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'db_table': 'daily_booking_stats',
+                'constraints': [models.UniqueConstraint(fields=('date', 'property_type', 'property_id'), name='daily_booking_stats_unique')],
+            },
+        ),
+        migrations.RunPython(populate_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.2 on 2026-10-19 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0002_daily_booking_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('data_version', models.PositiveIntegerField(default=0)),
+                ('rendered_version', models.PositiveIntegerField(blank=True, null=True)),
+                ('png', models.BinaryField(blank=True, null=True)),
+                ('pdf', models.BinaryField(blank=True, null=True)),
+                ('rendered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'monthly_reports',
+                'constraints': [models.UniqueConstraint(fields=('year', 'month'), name='monthly_reports_unique')],
+            },
+        ),
+    ]
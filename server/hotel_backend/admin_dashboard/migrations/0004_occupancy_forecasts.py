@@ -0,0 +1,25 @@
+# Generated by Django 5.2.2 on 2026-10-19 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0003_monthly_reports'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generated_for', models.DateField(unique=True)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'occupancy_forecasts',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+# Table for the shared tier of the default cache ('shared' in CACHES), with the
+# columns `manage.py createcachetable` gives DatabaseCache. They are spelled out
+# so that the migration does not depend on the CACHES setting at migrate time.
+CREATE_CACHE_TABLE = [
+    "CREATE TABLE cache_table ("
+    "cache_key varchar(255) NOT NULL PRIMARY KEY, value longtext NOT NULL, expires datetime(6) NOT NULL)",
+    "CREATE INDEX cache_table_expires ON cache_table (expires)",
+]
+DROP_CACHE_TABLE = ["DROP TABLE cache_table"]
+
+
+def run_on_default(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.alias == 'default':
+            for statement in statements:
+                schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0004_occupancy_forecasts'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_default(CREATE_CACHE_TABLE), run_on_default(DROP_CACHE_TABLE)),
+    ]
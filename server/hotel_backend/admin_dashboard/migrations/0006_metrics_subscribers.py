@@ -0,0 +1,23 @@
+# Generated by Django 5.2.2 on 2026-10-19 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0005_cache_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricsSubscriber',
+            fields=[
+                ('channel_name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'metrics_subscribers',
+            },
+        ),
+    ]
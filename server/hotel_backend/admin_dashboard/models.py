@@ -12,3 +12,78 @@ class ArchivedUser(models.Model):
     
     class Meta:
         db_table = 'archived_users'
+
+
+class DailyBookingStats(models.Model):
+    """
+    Per-day, per-property rollup of booking activity. Maintained incrementally
+    by admin_dashboard.signals and rebuilt with `manage.py rebuild_daily_stats`.
+    """
+    PROPERTY_TYPE_CHOICES = [
+        ('room', 'Room'),
+        ('area', 'Area'),
+        ('none', 'None'),
+    ]
+    date = models.DateField()
+    property_type = models.CharField(max_length=10, choices=PROPERTY_TYPE_CHOICES, default='none')
+    property_id = models.PositiveIntegerField(default=0)
+    bookings_created = models.IntegerField(default=0)
+    check_ins = models.IntegerField(default=0)
+    check_outs = models.IntegerField(default=0)
+    cancellations = models.IntegerField(default=0)
+    no_shows = models.IntegerField(default=0)
+    rejections = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'daily_booking_stats'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'property_type', 'property_id'], name='daily_booking_stats_unique'),
+        ]
+
+
+class MonthlyReport(models.Model):
+    """
+    Rendered PNG/PDF report for one month. admin_dashboard.signals bumps
+    `data_version` whenever the month's data changes; the stored artifacts are
+    current while `rendered_version` matches it.
+    """
+    year = models.PositiveIntegerField()
+    month = models.PositiveSmallIntegerField()
+    data_version = models.PositiveIntegerField(default=0)
+    rendered_version = models.PositiveIntegerField(null=True, blank=True)
+    png = models.BinaryField(null=True, blank=True)
+    pdf = models.BinaryField(null=True, blank=True)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'monthly_reports'
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='monthly_reports_unique'),
+        ]
+
+
+class OccupancyForecast(models.Model):
+    """
+    Occupancy and revenue forecast as generated on `generated_for`. Written by
+    `manage.py forecast_occupancy` nightly, or by the first request of the day.
+    """
+    generated_for = models.DateField(unique=True)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'occupancy_forecasts'
+
+
+class MetricsSubscriber(models.Model):
+    """
+    A websocket consumer subscribed to live dashboard metrics. Each consumer
+    refreshes its row while connected, so a worker that dies without
+    disconnecting stops counting once `expires_at` passes.
+    """
+    channel_name = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'metrics_subscribers'
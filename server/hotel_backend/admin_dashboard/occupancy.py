@@ -0,0 +1,34 @@
+from datetime import datetime
+from django.utils import timezone
+import numpy as np
+import pandas as pd
+
+# A stay sells a night for every day from check-in up to, but not including,
+# check-out; a same-day stay sells none. The KPIs and the forecast count these
+# nights. The daily occupancy chart also marks the check-out day, as it always
+# has, so it shows one more day per stay (occupied_range).
+
+def day_index(values, origin):
+    """Local-day offsets from `origin` for dates or aware datetimes; NaN where missing."""
+    series = pd.Series(values, dtype=object)
+    sample = next((value for value in series if value is not None), None)
+    if isinstance(sample, datetime) and timezone.is_aware(sample):
+        stamps = pd.to_datetime(series, utc=True)
+        stamps = stamps.dt.tz_convert(timezone.get_current_timezone_name()).dt.tz_localize(None)
+    else:
+        # Dates are calendar days already; converting them from UTC would move
+        # them a day back under a negative-offset TIME_ZONE.
+        stamps = pd.to_datetime(series)
+    return (stamps.dt.normalize() - pd.Timestamp(origin)).dt.days.to_numpy(dtype=float)
+
+def stay_nights(check_in, check_out):
+    """Nights each stay sells, from day-index arrays."""
+    return np.maximum(check_out - check_in, 0)
+
+def night_range(check_in, check_out, days):
+    """First and last night of each stay, clipped to [0, days); first > last when none fall inside."""
+    return np.maximum(check_in, 0), np.minimum(check_out - 1, days - 1)
+
+def occupied_range(check_in, check_out, days):
+    """First and last day each stay shows on the daily occupancy chart, check-out day included, clipped to [0, days)."""
+    return np.maximum(check_in, 0), np.minimum(np.maximum(check_out, check_in), days - 1)
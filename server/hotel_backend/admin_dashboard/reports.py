@@ -0,0 +1,160 @@
+import io
+import logging
+from calendar import month_name
+from datetime import date
+from django.db.models import F, Q
+from django.utils import timezone
+from matplotlib.figure import Figure
+import pandas as pd
+from property.models import Rooms
+from .analytics import daily_occupancy_rates, month_bounds, property_breakdown
+from .daily_stats import as_date, daily_stats_series
+from .models import MonthlyReport
+
+REPORT_FORMATS = ['png', 'pdf']
+REPORT_CONTENT_TYPES = {
+    'png': 'image/png',
+    'pdf': 'application/pdf',
+}
+REPORT_TOP_ROOMS = 10
+
+logger = logging.getLogger(__name__)
+
+def _months_between(start, end):
+    months = set()
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.add((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def booking_report_months(booking):
+    """Every (year, month) whose report reads this booking."""
+    if booking is None:
+        return set()
+    months = set()
+    for value in (booking.created_at, booking.updated_at, booking.cancellation_date):
+        day = as_date(value)
+        if day:
+            months.add((day.year, day.month))
+    check_in, check_out = as_date(booking.check_in_date), as_date(booking.check_out_date)
+    if check_in and check_out and check_in <= check_out:
+        months |= _months_between(check_in, check_out)
+    return months
+
+def transaction_report_months(txn):
+    if txn is None:
+        return set()
+    day = as_date(txn.transaction_date)
+    return {(day.year, day.month)} if day else set()
+
+def bump_report_versions(months=None):
+    """Mark the reports for `months` (all reports when None) as stale."""
+    reports = MonthlyReport.objects.all()
+    if months is not None:
+        if not months:
+            return
+        condition = Q()
+        for year, month in months:
+            condition |= Q(year=year, month=month)
+        reports = reports.filter(condition)
+    reports.update(data_version=F('data_version') + 1)
+
+def report_data(year, month):
+    start_dt, end_dt = month_bounds(year, month)
+    start, end = start_dt.date(), end_dt.date()
+
+    frame = pd.DataFrame(
+        daily_stats_series(start, end, ['revenue', 'bookings_created', 'cancellations']),
+        index=pd.date_range(start, end, freq='D')
+    )
+    frame['occupancy'] = daily_occupancy_rates(start, end)
+    rankings = property_breakdown(Rooms, 'revenue', start_dt, end_dt, top=REPORT_TOP_ROOMS)
+    return frame, rankings
+
+def render_report_figure(year, month, frame, rankings):
+    figure = Figure(figsize=(11.69, 8.27))
+    figure.suptitle(
+        f"{month_name[month]} {year} — revenue ₱{frame['revenue'].sum():,.2f}, "
+        f"{int(frame['bookings_created'].sum())} bookings, "
+        f"{int(frame['cancellations'].sum())} cancellations, "
+        f"average occupancy {frame['occupancy'].mean():.1f}%"
+    )
+    occupancy, revenue, cancellations, ranking = figure.subplots(2, 2).flatten()
+    days = frame.index.day
+
+    occupancy.plot(days, frame['occupancy'], marker='o', markersize=3)
+    occupancy.set_title('Occupancy rate (%)')
+    occupancy.set_ylim(0, 100)
+
+    revenue.bar(days, frame['revenue'])
+    revenue.set_title('Daily revenue')
+
+    cancellations.bar(days, frame['cancellations'], color='tab:red')
+    cancellations.set_title('Cancellations')
+
+    names = [name for name, _ in reversed(rankings)]
+    ranking.barh(names, [value for _, value in reversed(rankings)], color='tab:green')
+    ranking.set_title(f"Top {REPORT_TOP_ROOMS} rooms by revenue")
+
+    for axes in (occupancy, revenue, cancellations):
+        axes.set_xlabel('Day')
+    figure.tight_layout()
+    return figure
+
+def _figure_bytes(figure, report_format):
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=report_format, dpi=100)
+    return buffer.getvalue()
+
+def render_monthly_report(year, month):
+    """
+    Render and store the month's artifacts. The version is read before the data,
+    so a change made while rendering leaves the report stale rather than wrong.
+    """
+    report, _ = MonthlyReport.objects.get_or_create(year=year, month=month)
+    version = MonthlyReport.objects.filter(pk=report.pk).values_list('data_version', flat=True).get()
+
+    figure = render_report_figure(year, month, *report_data(year, month))
+    artifacts = {report_format: _figure_bytes(figure, report_format) for report_format in REPORT_FORMATS}
+
+    MonthlyReport.objects.filter(pk=report.pk).filter(
+        Q(rendered_version__isnull=True) | Q(rendered_version__lte=version)
+    ).update(rendered_version=version, rendered_at=timezone.now(), **artifacts)
+    return version
+
+def current_report_artifact(year, month, report_format):
+    """Stored bytes when the month's report is up to date, else None. One query."""
+    artifact = MonthlyReport.objects.filter(
+        year=year, month=month, rendered_version=F('data_version')
+    ).values_list(report_format, flat=True).first()
+    return bytes(artifact) if artifact is not None else None
+
+def stale_report_months():
+    return list(
+        MonthlyReport.objects.filter(
+            Q(rendered_version__isnull=True) | ~Q(rendered_version=F('data_version'))
+        ).order_by('year', 'month').values_list('year', 'month')
+    )
+
+def previous_month(today=None):
+    today = today or timezone.localdate()
+    first = date(today.year, today.month, 1)
+    return (first.year - 1, 12) if first.month == 1 else (first.year, first.month - 1)
+
+def request_report_render(year, month):
+    """
+    Queue a month for the render_monthly_reports command. A report row that has
+    never been rendered counts as stale, so the next run picks it up.
+    """
+    MonthlyReport.objects.get_or_create(year=year, month=month)
+
+def render_monthly_reports(months):
+    """Render each (year, month), logging failures so one bad month does not stop the rest."""
+    rendered = {}
+    for year, month in months:
+        try:
+            rendered[(year, month)] = render_monthly_report(year, month)
+        except Exception:
+            logger.exception("Error rendering monthly report %d-%02d", year, month)
+    return rendered
@@ -1,9 +1,33 @@
-from django.db.models.signals import post_save
+import logging
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
+from django.core.cache import cache
 from django.dispatch import receiver
-from booking.models import Bookings
+from booking.models import Bookings, Transactions
+from property.models import Rooms
 from booking.serializers import BookingSerializer
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from .analytics import (
+    METRICS_GROUP,
+    METRICS_PUSH_INTERVAL,
+    METRICS_PUSH_KEY,
+    invalidate_booking_month,
+    invalidate_dashboard_stats,
+    live_metrics_snapshot,
+    metrics_subscriber_count,
+)
+from .daily_stats import (
+    apply_contributions,
+    booking_contributions,
+    booking_property,
+    contribution_delta,
+    moved_revenue_delta,
+    transaction_contributions,
+)
+from .reports import booking_report_months, bump_report_versions, transaction_report_months
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Bookings)
 def send_active_count_update(sender, instance, created, **kwargs):
@@ -12,7 +36,7 @@ def send_active_count_update(sender, instance, created, **kwargs):
         status__in=['rejected', 'cancelled', 'no_show', 'checked_out']
     ).order_by('-created_at')
     count = bookings.count()
-    serialized_bookings = BookingSerializer(bookings, many=True).data
+    serialized_bookings = BookingSerializer(BookingSerializer.with_related(bookings), many=True).data
     
     async_to_sync(channel_layer.group_send)(
         'admin_notifications',
@@ -29,4 +53,91 @@ def send_active_count_update(sender, instance, created, **kwargs):
             'type': 'active_count_update',
             'count': count
         }
-    )
\ No newline at end of file
+    )
+
+@receiver([post_save, post_delete], sender=Bookings)
+@receiver([post_save, post_delete], sender=Transactions)
+@receiver([post_save, post_delete], sender=Rooms)
+def invalidate_dashboard_cache(sender, instance, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver([post_save, post_delete], sender=Bookings)
+def invalidate_booking_month_cache(sender, instance, **kwargs):
+    invalidate_booking_month(instance)
+
+
+# Daily rollup maintenance: remember what the stored row contributed before the
+# write, then apply the difference once the new state is saved. The same lookup
+# records which monthly reports the old row fed into.
+_CONTRIBUTIONS = {
+    Bookings: booking_contributions,
+    Transactions: transaction_contributions,
+}
+_REPORT_MONTHS = {
+    Bookings: booking_report_months,
+    Transactions: transaction_report_months,
+}
+
+@receiver(pre_save, sender=Bookings)
+@receiver(pre_save, sender=Transactions)
+def remember_previous_state(sender, instance, **kwargs):
+    previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._daily_stats_before = _CONTRIBUTIONS[sender](previous) if previous else {}
+    instance._report_months_before = _REPORT_MONTHS[sender](previous)
+    if sender is Bookings:
+        instance._property_before = booking_property(previous) if previous else None
+
+@receiver(post_save, sender=Bookings)
+@receiver(post_save, sender=Transactions)
+def update_daily_stats(sender, instance, **kwargs):
+    before = getattr(instance, '_daily_stats_before', {})
+    delta = contribution_delta(before, _CONTRIBUTIONS[sender](instance))
+    if sender is Bookings:
+        delta.update(moved_revenue_delta(instance, getattr(instance, '_property_before', None)))
+        instance._property_before = booking_property(instance)
+    apply_contributions(delta)
+    instance._daily_stats_before = _CONTRIBUTIONS[sender](instance)
+
+@receiver(post_delete, sender=Bookings)
+@receiver(post_delete, sender=Transactions)
+def remove_daily_stats(sender, instance, **kwargs):
+    apply_contributions(contribution_delta(_CONTRIBUTIONS[sender](instance), {}))
+
+
+# Monthly report artifacts go stale when anything their month reads changes.
+@receiver([post_save, post_delete], sender=Bookings)
+@receiver([post_save, post_delete], sender=Transactions)
+def invalidate_monthly_reports(sender, instance, **kwargs):
+    months = _REPORT_MONTHS[sender](instance) | getattr(instance, '_report_months_before', set())
+    bump_report_versions(months)
+    instance._report_months_before = _REPORT_MONTHS[sender](instance)
+
+@receiver([post_save, post_delete], sender=Rooms)
+def invalidate_all_monthly_reports(sender, instance, **kwargs):
+    bump_report_versions()
+
+
+def push_dashboard_metrics():
+    if not metrics_subscriber_count():
+        return
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            METRICS_GROUP,
+            {
+                'type': 'metrics_update',
+                'metrics': live_metrics_snapshot()
+            }
+        )
+    except Exception:
+        logger.exception("Error pushing dashboard metrics")
+
+@receiver([post_save, post_delete], sender=Bookings)
+@receiver([post_save, post_delete], sender=Transactions)
+def schedule_dashboard_metrics_push(sender, instance, **kwargs):
+    # Nobody watching means nothing to compute; otherwise the short-lived flag
+    # lets a burst of writes share one snapshot per interval.
+    if not metrics_subscriber_count():
+        return
+    if cache.add(METRICS_PUSH_KEY, True, METRICS_PUSH_INTERVAL):
+        transaction.on_commit(push_dashboard_metrics)
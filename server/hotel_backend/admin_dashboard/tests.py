@@ -1,3 +1,947 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import date, datetime, timezone as dt_timezone
+from rest_framework.test import APIClient
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+from hotel_backend.asgi import application
+from hotel_backend.cache import TwoTierCache
+from hotel_backend import query_log
+from hotel_backend.metrics import finish_sample, request_metrics, start_sample, timed_query
+from hotel_backend.pagination import _decode_cursor, _encode_cursor, _ordering_fields
+from booking.models import Bookings, Reviews, Transactions
+from property.models import Rooms, Areas
+from property.serializers import RoomSerializer
+from user_roles.login_guard import LoginThrottled
+from user_roles.models import CustomUsers, Notification
+from .analytics import (
+    METRICS_GROUP, METRICS_PUSH_KEY, add_metrics_subscriber, daily_occupied_rooms, metrics_subscriber_count,
+    remove_metrics_subscriber,
+)
+from .daily_stats import rebuild_daily_stats
+from .exports import iter_export
+from .forecast import compute_forecast
+from .kpis import compute_kpis
+from .models import DailyBookingStats, MetricsSubscriber, MonthlyReport
+from .occupancy import day_index
+from .reports import render_monthly_report
+from .signals import push_dashboard_metrics
 
-# Create your tests here.
+class AnalyticsTestCase(TestCase):
+    @contextmanager
+    def assertQueryBudget(self, app, cache_table):
+        """Queries on the application's tables, and on the shared cache tier's table."""
+        with CaptureQueriesContext(connection) as queries:
+            yield
+        # The cache tier's writes run in atomic blocks, which add savepoints here.
+        shared = sum(
+            'cache_table' in query['sql'] or 'SAVEPOINT' in query['sql'] for query in queries.captured_queries
+        )
+        self.assertEqual((len(queries) - shared, shared), (app, cache_table))
+
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUsers.objects.create_user(
+            username='admin@example.com', email='admin@example.com', password='secret', role='admin'
+        )
+        self.guest = CustomUsers.objects.create_user(
+            username='guest@example.com', email='guest@example.com', password='secret'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        self.room = Rooms.objects.create(room_name='Deluxe', room_price=1000)
+        self.other_room = Rooms.objects.create(room_name='Suite', room_price=2000)
+        Rooms.objects.create(room_name='Closed', status='maintenance')
+        self.area = Areas.objects.create(area_name='Ballroom', capacity=100)
+
+    def book(self, **kwargs):
+        fields = {
+            'user': self.guest,
+            'room': self.room,
+            'check_in_date': date(2025, 3, 10),
+            'check_out_date': date(2025, 3, 12),
+        }
+        fields.update(kwargs)
+        booking = Bookings.objects.create(**fields)
+        if 'created_at' in kwargs:
+            Bookings.objects.filter(id=booking.id).update(created_at=kwargs['created_at'])
+        return booking
+
+    def pay(self, booking, amount, when):
+        return Transactions.objects.create(
+            booking=booking, user=self.guest, transaction_type='booking',
+            amount=amount, status='completed', transaction_date=when
+        )
+
+class CursorPaginationTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        tied = timezone.make_aware(datetime(2025, 3, 1, 12))
+        self.bookings = [self.book(created_at=tied) for _ in range(3)]
+        self.bookings += [self.book(created_at=timezone.make_aware(datetime(2025, 3, day))) for day in (2, 3)]
+        for booking in self.bookings:
+            booking.refresh_from_db()
+
+    def page(self, **params):
+        response = self.client.get(reverse('admin_bookings'), {'pagination': 'cursor', 'page_size': 2, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['data']], response.data['pagination']
+
+    def test_cursor_round_trip(self):
+        fields = _ordering_fields(Bookings.objects.all(), ('-created_at',))
+        self.assertEqual(fields, [('created_at', True), ('id', True)])
+        booking = self.bookings[0]
+        cursor = _encode_cursor(booking, fields, True)
+        self.assertEqual(_decode_cursor(cursor, Bookings, fields), ([booking.created_at, booking.id], True))
+
+    def test_pages_through_ties_forwards_and_backwards(self):
+        ids = [booking.id for booking in self.bookings]
+        first, pagination = self.page()
+        self.assertEqual(first, ids[:2])
+        self.assertFalse(pagination['has_previous'])
+        second, pagination = self.page(cursor=pagination['next_cursor'])
+        self.assertEqual(second, ids[2:4])
+        last, pagination = self.page(cursor=pagination['next_cursor'])
+        self.assertEqual(last, ids[4:])
+        self.assertFalse(pagination['has_next'])
+
+        back, pagination = self.page(cursor=pagination['previous_cursor'])
+        self.assertEqual(back, ids[2:4])
+        self.assertTrue(pagination['has_next'])
+        back, pagination = self.page(cursor=pagination['previous_cursor'])
+        self.assertEqual(back, ids[:2])
+        self.assertFalse(pagination['has_previous'])
+
+    def test_total_is_counted_once(self):
+        with CaptureQueriesContext(connection) as first:
+            _, pagination = self.page(include_total='true')
+        self.assertEqual(pagination['total_items'], 5)
+        with CaptureQueriesContext(connection) as second:
+            _, pagination = self.page(include_total='true')
+        self.assertEqual(pagination['total_items'], 5)
+        counts = [
+            [query for query in queries.captured_queries if 'COUNT(' in query['sql'] and 'cache_table' not in query['sql']]
+            for queries in (first, second)
+        ]
+        self.assertEqual([len(count) for count in counts], [1, 0])
+
+    def test_bad_cursors_are_rejected_everywhere(self):
+        _, pagination = self.page()
+        listings = [
+            reverse('admin_bookings'), reverse('fetch_all_users'), reverse('fetch_archived_users'),
+            reverse('bookings_list'), reverse('user_bookings'),
+            reverse('room_reviews', args=[self.room.id]), reverse('area_reviews', args=[self.area.id]),
+        ]
+        for url in listings:
+            for params, error in (
+                ({'cursor': 'garbage'}, "Invalid cursor"),
+                ({'pagination': 'cursor', 'page_size': 'ten'}, "page_size must be a positive integer"),
+            ):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400, url)
+                self.assertEqual(response.data, {"error": error}, url)
+
+        response = self.client.get(reverse('fetch_all_users'), {'cursor': pagination['next_cursor']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "Cursor does not match this listing"})
+
+class DashboardStatsTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        march = timezone.make_aware(datetime(2025, 3, 5))
+        checked_in = self.book(status='checked_in', created_at=march)
+        self.book(status='pending', created_at=march)
+        venue = self.book(
+            room=None, area=self.area, is_venue_booking=True, status='reserved',
+            check_in_date=date(2025, 3, 20), check_out_date=date(2025, 3, 20), created_at=march
+        )
+        self.book(status='pending', created_at=timezone.make_aware(datetime(2025, 1, 5)))
+        self.pay(checked_in, 1500, march)
+        self.pay(venue, 500, march)
+
+    def test_stats_values(self):
+        response = self.client.get(reverse('dashboard_stats'), {'month': 3, 'year': 2025})
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['total_rooms'], 3)
+        self.assertEqual(data['maintenance_rooms'], 1)
+        self.assertEqual(data['available_rooms'], 1)
+        self.assertEqual(data['occupied_rooms'], 1)
+        self.assertEqual(data['active_bookings'], 2)
+        self.assertEqual(data['pending_bookings'], 1)
+        self.assertEqual(data['unpaid_bookings'], 3)
+        self.assertEqual(data['checked_in_count'], 1)
+        self.assertEqual(data['total_bookings'], 3)
+        self.assertEqual(data['upcoming_reservations'], 1)
+        self.assertEqual(data['revenue'], 2000)
+        self.assertEqual(data['room_revenue'], 1500)
+        self.assertEqual(data['venue_revenue'], 500)
+
+    def test_query_budget(self):
+        with self.assertQueryBudget(app=3, cache_table=8):
+            self.client.get(reverse('dashboard_stats'), {'month': 3, 'year': 2025})
+        # Warm: the figures come from this process's L1; only the version
+        # counter is read from the shared tier.
+        with self.assertQueryBudget(app=0, cache_table=1):
+            self.client.get(reverse('dashboard_stats'), {'month': 3, 'year': 2025})
+
+    def test_writes_invalidate_cache(self):
+        self.client.get(reverse('dashboard_stats'), {'month': 3, 'year': 2025})
+        self.book(status='pending', created_at=timezone.make_aware(datetime(2025, 3, 6)))
+        response = self.client.get(reverse('dashboard_stats'), {'month': 3, 'year': 2025})
+        self.assertEqual(response.data['total_bookings'], 4)
+
+class BookingStatusCountsTests(AnalyticsTestCase):
+    def test_counts_all_statuses_in_one_query(self):
+        now = timezone.localtime()
+        self.book(status='pending')
+        self.book(status='pending')
+        missed = self.book(status='missed_reservation')
+        params = {'month': now.month, 'year': now.year}
+
+        with self.assertQueryBudget(app=1, cache_table=8):
+            response = self.client.get(reverse('booking_status_counts'), params)
+        self.assertEqual(response.data['pending'], 2)
+        self.assertEqual(response.data['missed_reservation'], 1)
+        self.assertEqual(response.data['checked_out'], 0)
+
+        missed.status = 'checked_out'
+        missed.save()
+        response = self.client.get(reverse('booking_status_counts'), params)
+        self.assertEqual(response.data['missed_reservation'], 0)
+        self.assertEqual(response.data['checked_out'], 1)
+
+class DailyOccupancyTests(AnalyticsTestCase):
+    def test_matches_per_day_overlap_counts(self):
+        self.book(status='reserved', check_in_date=date(2025, 2, 25), check_out_date=date(2025, 3, 2))
+        self.book(status='checked_in', room=self.other_room, check_in_date=date(2025, 3, 1), check_out_date=date(2025, 3, 1))
+        self.book(status='confirmed', check_in_date=date(2025, 3, 31), check_out_date=date(2025, 4, 3))
+        self.book(status='cancelled', check_in_date=date(2025, 3, 5), check_out_date=date(2025, 3, 9))
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('daily_occupancy'), {'month': 3, 'year': 2025})
+        data = response.data['data']
+        self.assertEqual(len(data), 31)
+        self.assertEqual(data[0], round(2 / 3 * 100, 2))
+        self.assertEqual(data[1], round(1 / 3 * 100, 2))
+        self.assertEqual(data[2], 0)
+        self.assertEqual(data[30], round(1 / 3 * 100, 2))
+
+    def test_arbitrary_range(self):
+        self.book(status='reserved', check_in_date=date(2025, 3, 31), check_out_date=date(2025, 4, 3))
+        response = self.client.get(reverse('daily_occupancy'), {'start_date': '2025-01-01', 'end_date': '2025-06-30'})
+        self.assertEqual(response.data['days'], 181)
+        occupied = [i for i, rate in enumerate(response.data['data']) if rate]
+        self.assertEqual(occupied, [89, 90, 91, 92])
+
+        response = self.client.get(reverse('daily_occupancy'), {'start_date': '2025-06-30', 'end_date': '2025-01-01'})
+        self.assertEqual(response.status_code, 400)
+
+class PropertyBreakdownTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        march = timezone.make_aware(datetime(2025, 3, 5))
+        first = self.book(status='checked_out')
+        second = self.book(status='checked_out', room=self.other_room)
+        self.book(status='pending', room=self.other_room)
+        self.pay(first, 1000, march)
+        self.pay(second, 2500, march)
+        self.pay(second, 100, timezone.make_aware(datetime(2025, 5, 5)))
+
+    def test_room_revenue_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('room_revenue'), {'month': 3, 'year': 2025})
+        self.assertEqual(response.data['room_names'], ['Deluxe', 'Suite', 'Closed'])
+        self.assertEqual(response.data['revenue_data'], [1000.0, 2500.0, 0.0])
+
+    def test_top_n_over_date_range(self):
+        response = self.client.get(reverse('room_revenue'), {
+            'start_date': '2025-01-01', 'end_date': '2025-06-30', 'top': 1
+        })
+        self.assertEqual(response.data['room_names'], ['Suite'])
+        self.assertEqual(response.data['revenue_data'], [2600.0])
+
+        now = timezone.localtime()
+        response = self.client.get(reverse('room_bookings'), {'month': now.month, 'year': now.year, 'top': 2})
+        self.assertEqual(response.data['room_names'], ['Suite', 'Deluxe'])
+        self.assertEqual(response.data['booking_counts'], [2, 1])
+
+class DailyStatsTests(AnalyticsTestCase):
+    def snapshot(self):
+        return sorted(
+            DailyBookingStats.objects.exclude(
+                bookings_created=0, check_ins=0, check_outs=0, cancellations=0,
+                no_shows=0, rejections=0, revenue=0
+            ).values_list(
+                'date', 'property_type', 'property_id', 'bookings_created', 'check_ins',
+                'check_outs', 'cancellations', 'no_shows', 'rejections', 'revenue'
+            )
+        )
+
+    def test_write_hooks_match_rebuild(self):
+        booking = self.book(status='pending')
+        booking.status = 'checked_in'
+        booking.save()
+        booking.status = 'checked_out'
+        booking.save()
+        venue = self.book(room=None, area=self.area, is_venue_booking=True, status='reserved')
+        venue.status = 'cancelled'
+        venue.cancellation_date = timezone.make_aware(datetime(2025, 3, 8))
+        venue.save()
+        self.pay(booking, 1200, timezone.make_aware(datetime(2025, 3, 12, 10)))
+        refund = self.pay(venue, 300, timezone.make_aware(datetime(2025, 3, 8, 9)))
+        refund.delete()
+        self.book(status='rejected').delete()
+
+        incremental = self.snapshot()
+        rebuild_daily_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+        response = self.client.get(reverse('daily_checkins_checkouts'), {'month': 3, 'year': 2025})
+        self.assertEqual(response.data['checkins'][9], 1)
+        self.assertEqual(response.data['checkouts'][11], 1)
+        response = self.client.get(reverse('daily_revenue'), {'month': 3, 'year': 2025})
+        self.assertEqual(response.data['data'][11], 1200.0)
+        self.assertEqual(sum(response.data['data']), 1200.0)
+
+    def test_moving_a_booking_moves_its_revenue(self):
+        booking = self.book(status='checked_out')
+        self.pay(booking, 800, timezone.make_aware(datetime(2025, 3, 12)))
+        booking.room = self.other_room
+        booking.save()
+        booking.room = None
+        booking.area = self.area
+        booking.is_venue_booking = True
+        booking.save()
+
+        revenue = DailyBookingStats.objects.filter(revenue__gt=0).values_list('property_type', 'property_id', 'revenue')
+        self.assertEqual(list(revenue), [('area', self.area.id, 800)])
+        incremental = self.snapshot()
+        rebuild_daily_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_daily_stats_with_previous_year(self):
+        self.pay(self.book(status='checked_out'), 500, timezone.make_aware(datetime(2024, 3, 2)))
+        self.pay(self.book(status='checked_out'), 700, timezone.make_aware(datetime(2025, 3, 2)))
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('daily_stats'), {
+                'month': 3, 'year': 2025, 'fields': 'revenue,check_outs', 'compare': 'previous_year'
+            })
+        self.assertEqual(response.data['data']['revenue'][1], 700.0)
+        self.assertEqual(response.data['previous_year']['revenue'][1], 500.0)
+        self.assertEqual(response.data['data']['check_outs'][11], 2)
+
+        response = self.client.get(reverse('daily_stats'), {'fields': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_checkins_benchmark_reads_the_rollup_and_rolls_back(self):
+        out = io.StringIO()
+        call_command('benchmark_checkins_checkouts', rows=60, steps=2, month_rows=20, repeat=1, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([int(line.split()[0]) for line in lines[1:4]], [20, 40, 60])
+        self.assertGreater(int(lines[1].split()[1]), 0)
+        self.assertIn('Benchmark complete', lines[-1])
+        self.assertFalse(Bookings.objects.exists())
+        self.assertFalse(DailyBookingStats.objects.exists())
+
+class BatchAnalyticsTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        booking = self.book(status='checked_out')
+        self.pay(booking, 900, timezone.make_aware(datetime(2025, 3, 11)))
+
+    def test_batch_matches_individual_endpoints(self):
+        params = {'month': 3, 'year': 2025}
+        with self.assertQueryBudget(app=11, cache_table=22):
+            response = self.client.get(reverse('batch_analytics'), params)
+        self.assertEqual(response.status_code, 200)
+        series = response.data['series']
+        self.assertEqual(len(series), 12)
+
+        for name in ['daily_revenue', 'daily_checkins_checkouts', 'daily_occupancy', 'room_revenue']:
+            single = self.client.get(reverse(name), params).data
+            for key, value in series[name].items():
+                self.assertEqual(value, single[key], name)
+
+    def test_series_selection_and_validation(self):
+        response = self.client.get(reverse('batch_analytics'), {
+            'start_date': '2025-01-01', 'end_date': '2025-03-31', 'series': 'daily_revenue,area_bookings'
+        })
+        self.assertEqual(list(response.data['series']), ['daily_revenue', 'area_bookings'])
+        self.assertEqual(response.data['days'], 90)
+
+        response = self.client.get(reverse('batch_analytics'), {
+            'start_date': '2025-01-01', 'end_date': '2025-03-31', 'series': 'stats'
+        })
+        self.assertEqual(response.status_code, 400)
+
+class LiveMetricsTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(METRICS_GROUP, self.channel)
+
+    def tearDown(self):
+        async_to_sync(self.layer.group_discard)(METRICS_GROUP, self.channel)
+
+    def test_booking_write_pushes_today_metrics(self):
+        add_metrics_subscriber(self.channel)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(status='pending')
+        message = async_to_sync(self.layer.receive)(self.channel)
+        self.assertEqual(message['type'], 'metrics_update')
+        self.assertEqual(message['metrics']['today']['bookings_created'], 1)
+        self.assertEqual(message['metrics']['stats']['pending_bookings'], 1)
+
+    def test_no_push_without_subscribers(self):
+        add_metrics_subscriber(self.channel)
+        remove_metrics_subscriber(self.channel)
+        with self.assertQueryBudget(app=1, cache_table=0):
+            push_dashboard_metrics()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.book(status='pending')
+        self.assertNotIn(push_dashboard_metrics, callbacks)
+
+    def test_subscribers_expire_unless_refreshed(self):
+        add_metrics_subscriber(self.channel)
+        add_metrics_subscriber(self.channel)
+        self.assertEqual(metrics_subscriber_count(), 1)
+        # A consumer whose worker died never unsubscribes; its row just lapses.
+        MetricsSubscriber.objects.update(expires_at=timezone.now())
+        self.assertEqual(metrics_subscriber_count(), 0)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.book(status='pending')
+        self.assertNotIn(push_dashboard_metrics, callbacks)
+
+    def test_bursts_share_one_push(self):
+        add_metrics_subscriber(self.channel)
+        with self.captureOnCommitCallbacks() as callbacks:
+            for _ in range(3):
+                self.book(status='pending')
+        self.assertEqual(callbacks.count(push_dashboard_metrics), 1)
+
+        cache.delete(METRICS_PUSH_KEY)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.book(status='pending')
+        self.assertEqual(callbacks.count(push_dashboard_metrics), 1)
+
+class ExportTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.march = self.book(status='confirmed', total_price=1000, created_at=timezone.make_aware(datetime(2025, 3, 5)))
+        self.april = self.book(status='pending', created_at=timezone.make_aware(datetime(2025, 4, 5)))
+
+    def export_rows(self, dataset, **params):
+        response = self.client.get(reverse('export_data', args=[dataset]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join(async_to_sync(self.collect)(response.streaming_content)).decode()
+        return list(csv.DictReader(io.StringIO(content)))
+
+    async def collect(self, chunks):
+        return [chunk async for chunk in chunks]
+
+    def test_csv_date_filter(self):
+        rows = self.export_rows('bookings', start_date='2025-03-01', end_date='2025-03-31')
+        self.assertEqual([int(row['id']) for row in rows], [self.march.id])
+        self.assertEqual(rows[0]['total_price'], '1000.00')
+        self.assertEqual(len(self.export_rows('bookings')), 2)
+
+    def test_pages_by_primary_key(self):
+        third = self.book(status='confirmed')
+        with CaptureQueriesContext(connection) as queries:
+            chunks = list(iter_export('bookings', 'csv', chunk_size=2))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all('LIMIT 2' in query['sql'] for query in queries.captured_queries))
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        self.assertEqual([int(row['id']) for row in rows], [self.march.id, self.april.id, third.id])
+
+    def test_command_writes_to_stdout(self):
+        out = io.StringIO()
+        call_command('export_data', 'transactions', stdout=out)
+        self.assertEqual(out.getvalue().splitlines(), ['id,booking_id,user_id,transaction_type,amount,status,transaction_date'])
+
+    def test_users_export_omits_passwords(self):
+        rows = self.export_rows('users')
+        self.assertEqual(len(rows), 2)
+        self.assertNotIn('password', rows[0])
+
+    def test_parquet_round_trip(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+        import pandas as pd
+
+        data = b''.join(iter_export('bookings', 'parquet', chunk_size=1))
+        frame = pd.read_parquet(io.BytesIO(data))
+        self.assertEqual(sorted(frame['id']), [self.march.id, self.april.id])
+        self.assertEqual(frame.loc[frame['id'] == self.march.id, 'status'].item(), 'confirmed')
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.client.get(reverse('export_data', args=['passwords'])).status_code, 400)
+        self.assertEqual(
+            self.client.get(reverse('export_data', args=['bookings']), {'start_date': 'March'}).status_code, 400
+        )
+        self.client.force_authenticate(self.guest)
+        self.assertEqual(self.client.get(reverse('export_data', args=['bookings'])).status_code, 403)
+
+class MonthlyReportTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        march = timezone.make_aware(datetime(2025, 3, 5))
+        self.booking = self.book(status='checked_in', created_at=march)
+        self.pay(self.booking, 1500, march)
+        render_monthly_report(2025, 3)
+
+    def get_report(self, **params):
+        return self.client.get(reverse('monthly_report', args=[2025, 3]), params)
+
+    def test_serves_stored_artifacts_without_recomputing(self):
+        with self.assertNumQueries(1):
+            response = self.get_report()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response.content.startswith(b'\x89PNG'))
+        self.assertTrue(self.get_report(file_type='pdf').content.startswith(b'%PDF'))
+
+    def test_changes_to_the_month_make_it_stale(self):
+        self.book(status='pending', created_at=timezone.make_aware(datetime(2025, 5, 5)),
+                  check_in_date=date(2025, 5, 10), check_out_date=date(2025, 5, 12))
+        self.assertEqual(self.get_report().status_code, 200)
+
+        self.booking.status = 'checked_out'
+        self.booking.save()
+        response = self.get_report()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+
+        render_monthly_report(2025, 3)
+        self.assertEqual(self.get_report().status_code, 200)
+
+    def test_requested_month_is_rendered_by_the_command(self):
+        response = self.client.get(reverse('monthly_report', args=[2024, 1]))
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(MonthlyReport.objects.filter(year=2024, month=1, rendered_version__isnull=False).exists())
+
+        out = io.StringIO()
+        with mock.patch('admin_dashboard.reports.render_monthly_report', side_effect=[RuntimeError('boom'), 0]), \
+                self.assertLogs('admin_dashboard.reports', 'ERROR'):
+            with self.assertRaises(CommandError):
+                call_command('render_monthly_reports', stdout=out)
+        self.assertNotIn('2024-01', out.getvalue())
+        self.assertEqual(self.client.get(reverse('monthly_report', args=[2024, 1])).status_code, 202)
+
+        call_command('render_monthly_reports', stdout=io.StringIO())
+        self.assertEqual(self.client.get(reverse('monthly_report', args=[2024, 1])).status_code, 200)
+
+class ForecastTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        february = timezone.make_aware(datetime(2025, 2, 1))
+        self.book(status='checked_out', total_price=2000, created_at=february,
+                  check_in_date=date(2025, 2, 10), check_out_date=date(2025, 2, 11))
+        self.book(status='cancelled', created_at=february,
+                  cancellation_date=timezone.make_aware(datetime(2025, 2, 13)),
+                  check_in_date=date(2025, 2, 15), check_out_date=date(2025, 2, 16))
+        self.book(status='confirmed', total_price=3000, created_at=timezone.make_aware(datetime(2025, 2, 20)),
+                  check_in_date=date(2025, 3, 5), check_out_date=date(2025, 3, 6))
+
+    def test_on_the_books_plus_pickup(self):
+        data = compute_forecast(today=date(2025, 3, 1))
+        self.assertEqual(data['dates'][4], '2025-03-05')
+        # The check-out night of 2025-03-06 is not sold.
+        self.assertEqual(data['on_the_books'][4:7], [1, 0, 0])
+        self.assertEqual(data['revenue_on_the_books'][4], 3000)
+        # 28 days of history since the first booking: the cancelled night was
+        # on the books 3-14 days out, the stayed night was booked 0-9 days out.
+        self.assertEqual(data['occupancy_forecast'][4], round(1 - 1 / 28, 2))
+        self.assertEqual(data['occupancy_forecast'][12], 0)
+        self.assertEqual(data['occupancy_forecast'][20], round(1 / 28, 2))
+        self.assertEqual(data['revenue_forecast'][20], round(1 / 28 * 2000, 2))
+
+    def test_endpoint_computes_once_per_day(self):
+        response = self.client.get(reverse('occupancy_forecast'), {'days': 60})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['days'], 60)
+        self.assertEqual(len(response.data['occupancy_forecast']), 60)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('occupancy_forecast'), {'days': 90})
+        self.assertEqual(len(response.data['dates']), 90)
+        self.assertEqual(self.client.get(reverse('occupancy_forecast'), {'days': 91}).status_code, 400)
+
+@override_settings(TIME_ZONE='America/New_York')
+class DayIndexTests(AnalyticsTestCase):
+    def test_dates_are_calendar_days_in_any_time_zone(self):
+        origin = date(2025, 3, 10)
+        self.assertEqual(list(day_index([date(2025, 3, 10), date(2025, 3, 12)], origin)), [0, 2])
+        # 02:00 UTC on the 11th is still the 10th in New York.
+        late = datetime(2025, 3, 11, 2, tzinfo=dt_timezone.utc)
+        self.assertEqual(list(day_index([late], origin)), [0])
+
+    def test_daily_occupancy_in_a_negative_offset_time_zone(self):
+        self.book(status='confirmed', check_in_date=date(2025, 3, 10), check_out_date=date(2025, 3, 11))
+        occupied = daily_occupied_rooms(date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual([day + 1 for day in occupied.nonzero()[0]], [10, 11])
+
+class KpiTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stay = self.book(status='confirmed', total_price=2000, created_at=timezone.make_aware(datetime(2025, 3, 1)),
+                              check_in_date=date(2025, 3, 10), check_out_date=date(2025, 3, 12))
+        self.book(status='checked_out', total_price=3000, created_at=timezone.make_aware(datetime(2025, 2, 20)),
+                  check_in_date=date(2025, 2, 27), check_out_date=date(2025, 3, 2))
+        self.book(status='checked_in', total_price=500, created_at=timezone.make_aware(datetime(2025, 3, 31)),
+                  check_in_date=date(2025, 3, 31), check_out_date=date(2025, 3, 31))
+        self.book(status='cancelled', total_price=9000, check_in_date=date(2025, 3, 15), check_out_date=date(2025, 3, 20))
+        self.pay(self.stay, 1000, timezone.make_aware(datetime(2025, 3, 5)))
+
+    def test_kpi_values(self):
+        response = self.client.get(reverse('kpis'), {'month': 3, 'year': 2025})
+        self.assertEqual(response.status_code, 200)
+        kpis = response.data['kpis']
+        # Nights in March: 2 + 1 (of 3, from February) + 0 for the same-day stay.
+        self.assertEqual(kpis['room_nights_sold'], 3)
+        self.assertEqual(kpis['available_room_nights'], 93)
+        self.assertEqual(kpis['room_revenue'], 3000)
+        self.assertEqual(kpis['adr'], 1000)
+        self.assertEqual(kpis['revpar'], round(3000 / 93, 2))
+        self.assertEqual(kpis['occupancy_rate'], round(300 / 93, 2))
+        self.assertEqual(kpis['collected_room_revenue'], 1000)
+        self.assertEqual(kpis['arrivals'], 2)
+        self.assertEqual(kpis['average_length_of_stay'], 1)
+        self.assertEqual(kpis['average_lead_time'], 4.5)
+
+    def test_kpis_and_forecast_count_the_same_nights(self):
+        Bookings.objects.exclude(pk=self.stay.pk).delete()
+        start, end = date(2025, 3, 1), date(2025, 3, 31)
+        self.assertEqual(compute_kpis(start, end)['room_nights_sold'], 2)
+        forecast = compute_forecast(today=start, horizon=31, history_days=1)
+        self.assertEqual(sum(forecast['on_the_books']), 2)
+        # The chart also marks the check-out day.
+        self.assertEqual(int(daily_occupied_rooms(start, end).sum()), 3)
+
+    def test_cached_until_bookings_change(self):
+        params = {'start_date': '2025-03-01', 'end_date': '2025-03-31'}
+        self.client.get(reverse('kpis'), params)
+        with self.assertQueryBudget(app=0, cache_table=1):
+            self.client.get(reverse('kpis'), params)
+
+        self.stay.total_price = 4000
+        self.stay.save()
+        self.assertEqual(self.client.get(reverse('kpis'), params).data['kpis']['room_revenue'], 5000)
+
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def worker(self, **options):
+        """A cache as a separate worker process would see it: its own L1 over the shared table."""
+        return TwoTierCache('', {'TIMEOUT': 300, 'OPTIONS': {
+            'SHARED_CACHE': 'shared',
+            'LOCAL_KEY_PREFIXES': ['analytics:'],
+            'SHARED_ONLY_KEY_PREFIXES': ['analytics:version:'],
+            **options,
+        }})
+
+    def test_values_are_shared_between_workers(self):
+        first, second = self.worker(), self.worker()
+        first.set('guest@example.com_register', '123456', 120)
+        self.assertEqual(second.get('guest@example.com_register'), '123456')
+        first.delete('guest@example.com_register')
+        self.assertIsNone(second.get('guest@example.com_register'))
+
+    def test_local_tier_serves_repeat_reads(self):
+        first, second = self.worker(), self.worker()
+        first.set('analytics:stats:2025-03:v1', {'revenue': 10})
+        with self.assertNumQueries(1):
+            second.get('analytics:stats:2025-03:v1')
+        with self.assertNumQueries(0):
+            value = second.get('analytics:stats:2025-03:v1')
+        value['revenue'] = 0
+        self.assertEqual(second.get('analytics:stats:2025-03:v1'), {'revenue': 10})
+
+        stats = second.stats()
+        self.assertEqual((stats['local_hits'], stats['shared_hits'], stats['misses']), (2, 1, 0))
+        self.assertEqual(stats['hit_rate'], 1)
+
+    def test_local_tier_is_bounded(self):
+        worker = self.worker(LOCAL_MAX_ENTRIES=2)
+        for name in 'abc':
+            worker.set(f'analytics:{name}', name)
+        worker.get('analytics:b')
+        worker.set('analytics:d', 'd')
+        self.assertEqual(worker.stats()['local_entries'], 2)
+        self.assertEqual(worker.stats()['local_evictions'], 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(worker.get('analytics:b'), 'b')
+        with self.assertNumQueries(1):
+            self.assertEqual(worker.get('analytics:c'), 'c')
+
+    def test_version_bump_reaches_other_workers(self):
+        first, second = self.worker(), self.worker()
+        first.set('analytics:version:dashboard_stats', 1, None)
+        second.set('analytics:stats:v1', 'old')
+        self.assertEqual(second.get('analytics:version:dashboard_stats'), 1)
+
+        first.incr('analytics:version:dashboard_stats')
+        self.assertEqual(second.get('analytics:version:dashboard_stats'), 2)
+        self.assertIsNone(second.get('analytics:stats:v2'))
+
+        second.set('otp', '111111', version=1)
+        first.incr_version('otp', version=1)
+        self.assertIsNone(second.get('otp', version=1))
+        self.assertEqual(second.get('otp', version=2), '111111')
+
+    def test_cache_stats_endpoint(self):
+        admin = CustomUsers.objects.create_user(
+            username='admin@example.com', email='admin@example.com', password='secret', role='admin'
+        )
+        guest = CustomUsers.objects.create_user(username='guest@example.com', email='guest@example.com', password='secret')
+        client = APIClient()
+        client.force_authenticate(guest)
+        self.assertEqual(client.get(reverse('cache_stats')).status_code, 403)
+
+        client.force_authenticate(admin)
+        cache.set('analytics:stats:v1', 1)
+        cache.get('analytics:stats:v1')
+        cache.get('analytics:missing')
+        response = client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.data['cache']['local_hits'], 1)
+        self.assertGreaterEqual(response.data['cache']['misses'], 1)
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        request_metrics.reset()
+        self.admin = CustomUsers.objects.create_user(
+            username='admin@example.com', email='admin@example.com', password='secret', role='admin'
+        )
+        Rooms.objects.create(room_name='Deluxe', room_price=1000)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_records_latency_queries_and_size_per_route(self):
+        self.client.get('/property/rooms')
+        self.client.get('/property/rooms')
+        self.client.get('/property/rooms/999')
+        text = self.scrape()
+
+        labels = '{view="property/rooms",method="GET"}'
+        self.assertIn(f'http_request_duration_seconds_count{labels} 2', text)
+        self.assertIn(f'http_response_size_bytes_count{labels} 2', text)
+        self.assertIn('http_request_duration_seconds_bucket{view="property/rooms",method="GET",le="+Inf"} 2', text)
+        self.assertIn('http_responses_total{view="property/rooms",method="GET",status="2xx"} 2', text)
+        self.assertIn('http_responses_total{view="property/rooms/<int:id>",method="GET",status="4xx"} 1', text)
+        queries = next(line for line in text.splitlines() if line.startswith(f'http_request_db_queries_sum{labels}'))
+        self.assertGreater(int(queries.split()[-1]), 0)
+
+    def test_counts_cache_lookups(self):
+        params = {'start_date': '2025-03-01', 'end_date': '2025-03-31'}
+        self.client.get(reverse('kpis'), params)
+        self.client.get(reverse('kpis'), params)
+        text = self.scrape()
+        hits = next(line for line in text.splitlines()
+                    if line.startswith('http_request_cache_lookups_total{view="master/kpis",method="GET",result="hit"}'))
+        self.assertGreaterEqual(int(hits.split()[-1]), 1)
+        self.assertIn('cache_lookups_total{result="local_hit"}', text)
+
+    def test_admin_only(self):
+        guest = CustomUsers.objects.create_user(username='guest@example.com', email='guest@example.com', password='secret')
+        self.client.force_authenticate(guest)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+class GenerateDatasetTests(TestCase):
+    def generate(self, **options):
+        call_command(
+            'generate_dataset', rooms=5, areas=2, users=20, bookings=300, until=date(2025, 6, 30),
+            batch_size=50, stdout=io.StringIO(), **options
+        )
+        # Ids change when the dataset is flushed and generated again, so
+        # bookings are compared by the names of their guest, room and area.
+        return list(Bookings.objects.order_by('id').values_list(
+            'user__username', 'room__room_name', 'area__area_name',
+            'status', 'check_in_date', 'check_out_date', 'total_price', 'created_at'
+        ))
+
+    def test_generates_every_table_reproducibly(self):
+        first = self.generate()
+        self.assertEqual(len(first), 300)
+        self.assertGreater(len({status for _, _, _, status, *_ in first}), 4)
+        self.assertGreater(len({username for username, *_ in first}), 1)
+        self.assertGreater(len({room for _, room, *_ in first if room}), 1)
+        self.assertTrue(Transactions.objects.filter(status='completed').exists())
+        refunds = Transactions.objects.filter(transaction_type='cancellation_refund')
+        self.assertTrue(refunds.exists())
+        self.assertFalse(refunds.filter(amount__gte=0).exists())
+        # A booking whose refund has completed brings in no revenue.
+        refunded = refunds.filter(status='completed').values('booking_id')
+        self.assertTrue(refunded.exists())
+        net = Transactions.objects.filter(booking_id__in=refunded, status='completed').aggregate(total=Sum('amount'))
+        self.assertEqual(net['total'], 0)
+        self.assertTrue(Reviews.objects.exists())
+        self.assertTrue(Notification.objects.exists())
+        self.assertTrue(DailyBookingStats.objects.exists())
+
+        with self.assertRaises(CommandError):
+            self.generate()
+        rooms = Rooms.objects.order_by('id', 'amenities__id').values_list(
+            'room_name', 'room_price', 'amenities__description')
+        first_rooms = list(rooms)
+        self.assertEqual(self.generate(flush=True), first)
+        self.assertEqual(list(rooms.all()), first_rooms)
+        self.assertEqual(Rooms.objects.count(), 5)
+
+    def test_endpoint_benchmark_fails_on_query_regression(self):
+        self.generate()
+        baseline = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+        options = {'baseline': baseline, 'repeat': 2, 'warmup': 1, 'month': date(2025, 6, 1),
+                   'latency_tolerance': 100, 'stdout': io.StringIO()}
+        call_command('benchmark_endpoints', update=True, **options)
+        with open(baseline) as baseline_file:
+            recorded = json.load(baseline_file)
+        self.assertEqual(recorded['endpoints']['user_login']['statuses'], [200])
+        self.assertEqual(recorded['endpoints']['get_notifications']['statuses'], [200])
+
+        call_command('benchmark_endpoints', **options)
+
+        recorded['endpoints']['admin_bookings']['queries'] -= 1
+        with open(baseline, 'w') as baseline_file:
+            json.dump(recorded, baseline_file)
+        with self.assertRaisesMessage(CommandError, '1 regression(s)'):
+            call_command('benchmark_endpoints', **options)
+
+        # One throttled login among the timed repeats fails the run outright.
+        with mock.patch('user_roles.views.admit_password_attempt', side_effect=[None, None, LoginThrottled()]), \
+                self.assertRaisesMessage(CommandError, 'more than one status across repeats: user_login'):
+            call_command('benchmark_endpoints', **options)
+
+class QueryLogTests(TestCase):
+    def setUp(self):
+        guest = CustomUsers.objects.create_user(username='guest@example.com', email='guest@example.com', password='secret')
+        for number in range(query_log.REPEATED_QUERY_LIMIT + 2):
+            room = Rooms.objects.create(room_name=f'Room {number}', room_price=1000, status='available')
+            booking = Bookings.objects.create(
+                user=guest, room=room, check_in_date=date(2025, 3, 1), check_out_date=date(2025, 3, 3),
+                status='checked_out', total_price=2000
+            )
+            Reviews.objects.create(user=guest, booking=booking, room=room, rating=4, review_text='Nice')
+            Transactions.objects.create(
+                booking=booking, user=guest, transaction_type='booking',
+                amount=2000, status='completed', transaction_date=timezone.now()
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(guest)
+
+    def test_list_endpoints_do_not_repeat_queries(self):
+        self.assertEqual(self.client.get('/property/rooms').status_code, 200)
+        self.assertEqual(self.client.get('/booking/user/reviews').status_code, 200)
+        response = self.client.get('/booking/user/bookings', {'page_size': 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data'][0]['total_amount'], 2000)
+        self.assertEqual(response.data['data'][0]['room_details']['average_rating'], 4)
+
+    def test_repeated_query_shape_raises_in_tests(self):
+        with mock.patch.object(RoomSerializer, 'with_related', lambda queryset: queryset):
+            with self.assertRaisesMessage(query_log.RepeatedQueryError, 'in property/rooms'):
+                self.client.get('/property/rooms')
+
+    def test_repeated_query_shape_warns_outside_tests(self):
+        with mock.patch.object(RoomSerializer, 'with_related', lambda queryset: queryset), \
+                mock.patch.object(query_log, 'REPEATED_QUERY_RAISE', False):
+            with self.assertLogs('hotel_backend.query_log', 'WARNING') as logs:
+                self.assertEqual(self.client.get('/property/rooms').status_code, 200)
+        self.assertTrue(any('N+1' in line and 'property/serializers.py' in line for line in logs.output))
+
+    def test_logs_slow_queries_with_view(self):
+        with mock.patch.object(query_log, 'SLOW_QUERY_MS', 0):
+            with self.assertLogs('hotel_backend.query_log', 'WARNING') as logs:
+                self.client.get('/property/rooms')
+        self.assertIn('Slow query', logs.output[0])
+        self.assertIn('in property/rooms from ', logs.output[0])
+
+    def count_reviews_per_room(self, allow_repeats=False):
+        sample, token = start_sample()
+        try:
+            with connection.execute_wrapper(timed_query):
+                if allow_repeats:
+                    with query_log.allow_repeated_queries():
+                        [room.reviews.count() for room in Rooms.objects.all()]
+                else:
+                    [room.reviews.count() for room in Rooms.objects.all()]
+        finally:
+            finish_sample(token)
+        return sample.repeated
+
+    def test_allow_repeated_queries(self):
+        self.assertEqual(len(self.count_reviews_per_room()), 1)
+        self.assertEqual(self.count_reviews_per_room(allow_repeats=True), [])
+
+    def test_query_shape_collapses_in_lists(self):
+        self.assertEqual(
+            query_log.query_shape('SELECT * FROM rooms WHERE id IN (%s, %s, %s)'),
+            query_log.query_shape('SELECT * FROM rooms WHERE id IN (%s,%s)'),
+        )
+
+class PendingBookingConsumerTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUsers.objects.create_user(
+            username='admin@example.com', email='admin@example.com', password='secret', role='admin'
+        )
+        self.guest = CustomUsers.objects.create_user(
+            username='guest@example.com', email='guest@example.com', password='secret'
+        )
+
+    def communicator(self, user=None):
+        headers = [(b'cookie', f'access_token={AccessToken.for_user(user)}'.encode())] if user else []
+        return WebsocketCommunicator(application, '/ws/admin_dashboard/active-bookings/', headers=headers)
+
+    async def test_only_admins_can_connect(self):
+        for user in (None, self.guest):
+            connected, code = await self.communicator(user).connect()
+            self.assertFalse(connected)
+            self.assertEqual(code, 4003)
+
+        communicator = self.communicator(self.admin)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual((await communicator.receive_json_from())['type'], 'active_count_update')
+        await communicator.disconnect()
+
+    async def test_metrics_subscription_is_counted_while_connected(self):
+        communicator = self.communicator(self.admin)
+        await communicator.connect()
+        await communicator.receive_json_from()
+        await communicator.send_json_to({'type': 'subscribe_metrics'})
+        self.assertEqual((await communicator.receive_json_from())['type'], 'metrics_snapshot')
+        self.assertEqual(await database_sync_to_async(metrics_subscriber_count)(), 1)
+        await communicator.disconnect()
+        self.assertEqual(await database_sync_to_async(metrics_subscriber_count)(), 0)
@@ -18,6 +18,14 @@ urlpatterns = [
     path('room_bookings', views.room_bookings, name='room_bookings'),
     path('area_revenue', views.area_revenue, name='area_revenue'),
     path('area_bookings', views.area_bookings, name='area_bookings'),
+    path('daily_stats', views.daily_stats, name='daily_stats'),
+    path('analytics', views.batch_analytics, name='batch_analytics'),
+    path('export/<str:dataset>', views.export_data, name='export_data'),
+    path('reports/<int:year>/<int:month>', views.monthly_report, name='monthly_report'),
+    path('forecast', views.occupancy_forecast, name='occupancy_forecast'),
+    path('kpis', views.kpis, name='kpis'),
+    path('cache_stats', views.cache_stats, name='cache_stats'),
+    path('metrics', views.metrics, name='metrics'),
     
     # CRUD Rooms
     path('rooms', views.fetch_rooms, name='fetch_rooms'),
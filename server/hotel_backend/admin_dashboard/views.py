@@ -1,6 +1,8 @@
 from django.utils import timezone
+from django.core.cache import cache
 from django.core.validators import ValidationError
 from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
@@ -12,9 +14,28 @@ from booking.serializers import BookingSerializer
 from user_roles.models import CustomUsers, Notification
 from user_roles.serializers import CustomUserSerializer
 from user_roles.views import create_booking_notification
+from user_roles.replica import replica_reads, use_read_replica
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
-from django.db.models import Q, Sum
-from datetime import datetime, date, timedelta
+from hotel_backend.metrics import render_metrics
+from hotel_backend.pagination import InvalidCursor, cursor_paginate, wants_cursor_pagination
+from django.db.models import Q
+from .daily_stats import FACT_FIELDS, daily_stats_series, previous_year
+from .analytics import (
+    analytics_batch,
+    booking_status_counts_for_month,
+    daily_occupancy_rates,
+    dashboard_stats_for_month,
+    month_bounds,
+    parse_date_range,
+    parse_series,
+    parse_top,
+    property_breakdown,
+    request_window,
+)
+from .exports import CONTENT_TYPES, aiter_export, export_filename, iter_export, parse_export_dates
+from .forecast import FORECAST_DAYS, FORECAST_DEFAULT_DAYS, forecast_for_today
+from .kpis import kpis_for_period
+from .reports import REPORT_CONTENT_TYPES, REPORT_FORMATS, current_report_artifact, request_report_render
 from .email.booking import send_booking_confirmation_email, send_booking_rejection_email, send_checkout_e_receipt
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
@@ -78,114 +99,13 @@ def get_admin_details(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def dashboard_stats(request):
     try:
         month = int(request.query_params.get('month', timezone.now().month))
         year = int(request.query_params.get('year', timezone.now().year))
         
-        start_date = timezone.datetime(year, month, 1)
-        if month == 12:
-            end_date = timezone.datetime(year + 1, 1, 1) - timezone.timedelta(days=1)
-        else:
-            end_date = timezone.datetime(year, month + 1, 1) - timezone.timedelta(days=1)
-        
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        
-        total_rooms = Rooms.objects.count()
-        
-        checked_in_room_ids = Bookings.objects.filter(
-            Q(status='checked_in') & 
-            Q(is_venue_booking=False) & 
-            Q(check_in_date__lte=end_date.date()) &
-            Q(check_out_date__gte=start_date.date())
-        ).values_list('room_id', flat=True).distinct()
-        
-        available_rooms = Rooms.objects.filter(
-            status='available'
-        ).exclude(
-            id__in=checked_in_room_ids
-        ).count()
-        
-        occupied_rooms = Bookings.objects.filter(
-            Q(status='checked_in') & 
-            Q(is_venue_booking=False) & 
-            Q(check_in_date__lte=end_date.date()) &
-            Q(check_out_date__gte=start_date.date())
-        ).count()
-        
-        maintenance_rooms = Rooms.objects.filter(status='maintenance').count()
-        
-        active_bookings = Bookings.objects.filter(
-            Q(status__in=['confirmed', 'reserved', 'checked_in']) &
-            Q(created_at__range=(start_date, end_date))
-        ).count()
-        
-        pending_bookings = Bookings.objects.filter(
-            Q(status='pending') &
-            Q(created_at__range=(start_date, end_date))
-        ).count()
-        
-        unpaid_bookings = Bookings.objects.filter(
-            Q(payment_status='unpaid') &
-            Q(created_at__range=(start_date, end_date))
-        ).count()
-        
-        checked_in_count = Bookings.objects.filter(
-            Q(status='checked_in') &
-            Q(check_in_date__range=(start_date.date(), end_date.date()))
-        ).count()
-        
-        total_bookings = Bookings.objects.filter(
-            created_at__range=(start_date, end_date)
-        ).count()
-        
-        upcoming_reservations = Bookings.objects.filter(
-            Q(is_venue_booking=True) &
-            Q(status__in=['confirmed', 'reserved']) &
-            Q(check_in_date__gte=start_date.date())
-        ).count()
-        
-        transactions_this_month = Transactions.objects.filter(
-            transaction_date__range=(start_date, end_date),
-            status='completed'
-        )
-        
-        revenue = transactions_this_month.aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        room_revenue = transactions_this_month.filter(
-            Q(booking__isnull=False) & 
-            Q(booking__is_venue_booking=False)
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        venue_revenue = transactions_this_month.filter(
-            Q(booking__isnull=False) & 
-            (Q(booking__is_venue_booking=True))
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        formatted_revenue = f"₱{revenue:,.2f}"
-        formatted_room_revenue = f"₱{room_revenue:,.2f}"
-        formatted_venue_revenue = f"₱{venue_revenue:,.2f}"
-        
-        response_data = {
-            'total_rooms': total_rooms,
-            'available_rooms': available_rooms,
-            'occupied_rooms': occupied_rooms,
-            'maintenance_rooms': maintenance_rooms,
-            'active_bookings': active_bookings,
-            'pending_bookings': pending_bookings,
-            'unpaid_bookings': unpaid_bookings,
-            'checked_in_count': checked_in_count,
-            'total_bookings': total_bookings,
-            'upcoming_reservations': upcoming_reservations,
-            'revenue': revenue,
-            'room_revenue': room_revenue,
-            'venue_revenue': venue_revenue,
-            'formatted_revenue': formatted_revenue,
-            'formatted_room_revenue': formatted_room_revenue,
-            'formatted_venue_revenue': formatted_venue_revenue,
-            'month': month,
-            'year': year
-        }
+        response_data = dashboard_stats_for_month(year, month)
         
         return Response(response_data, status=status.HTTP_200_OK)
     except Exception as e:
@@ -198,7 +118,7 @@ def dashboard_stats(request):
 @permission_classes([IsAuthenticated])
 def fetch_rooms(request):
     try:
-        rooms = Rooms.objects.all().order_by('id')
+        rooms = RoomSerializer.with_related(Rooms.objects.all()).order_by('id')
         
         page = request.query_params.get('page', 1)
         page_size = request.query_params.get('page_size', 9)
@@ -418,7 +338,7 @@ def delete_room(request, room_id):
 @permission_classes([IsAuthenticated])
 def fetch_areas(request):
     try:
-        areas = Areas.objects.all().order_by('id')
+        areas = AreaSerializer.with_related(Areas.objects.all()).order_by('id')
         
         page = request.query_params.get('page', 1)
         page_size = request.query_params.get('page_size', 9)
@@ -713,12 +633,21 @@ def admin_bookings(request):
             'checked_out'
         ]
         
-        bookings = Bookings.objects.filter(
+        bookings = BookingSerializer.with_related(Bookings.objects.filter(
             ~Q(status__in=exclude_statuses)
-        ).order_by('created_at')
+        )).order_by('created_at')
         
         page = request.query_params.get('page', 1)
         page_size = request.query_params.get('page_size', 9)
+        
+        if wants_cursor_pagination(request):
+            page_bookings, pagination = cursor_paginate(request, bookings, ('created_at',), page_size)
+            serializer = BookingSerializer(page_bookings, many=True)
+            return Response({
+                "data": serializer.data,
+                "pagination": pagination
+            }, status=status.HTTP_200_OK)
+        
         paginator = Paginator(bookings, page_size)
         
         try:
@@ -739,6 +668,8 @@ def admin_bookings(request):
                 "page_size": int(page_size)
             }
         }, status=status.HTTP_200_OK)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e), "traceback": traceback.format_exc()}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -946,40 +877,13 @@ def record_payment(request, booking_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def booking_status_counts(request):
     try:
         month = int(request.query_params.get('month'))
         year = int(request.query_params.get('year'))
         
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        
-        filters = {
-            'created_at__gte': start_date,
-            'created_at__lte': end_date,
-        }
-        
-        pending_count = Bookings.objects.filter(status='pending', **filters).count()
-        reserved_count = Bookings.objects.filter(status='reserved', **filters).count()
-        checked_in_count = Bookings.objects.filter(status='checked_in', **filters).count()
-        checked_out_count = Bookings.objects.filter(status='checked_out', **filters).count()
-        cancelled_count = Bookings.objects.filter(status='cancelled', **filters).count()
-        no_show_count = Bookings.objects.filter(status='no_show', **filters).count() 
-        rejected_count = Bookings.objects.filter(status='rejected', **filters).count()
-        
-        return Response({
-            "pending": pending_count,
-            "reserved": reserved_count,
-            "checked_in": checked_in_count,
-            "checked_out": checked_out_count,
-            "cancelled": cancelled_count,
-            "no_show": no_show_count,
-            "rejected": rejected_count
-        }, status=status.HTTP_200_OK)
+        return Response(booking_status_counts_for_month(year, month), status=status.HTTP_200_OK)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -992,6 +896,15 @@ def fetch_all_users(request):
         
         page = request.query_params.get('page')
         page_size = request.query_params.get('page_size')
+        
+        if wants_cursor_pagination(request):
+            page_users, pagination = cursor_paginate(request, users, ('id',), page_size or 10)
+            serializer = CustomUserSerializer(page_users, many=True)
+            return Response({
+                "users": serializer.data,
+                "pagination": pagination
+            }, status=status.HTTP_200_OK)
+        
         paginator = Paginator(users, page_size)
         
         try:
@@ -1011,6 +924,8 @@ def fetch_all_users(request):
                 "page_size": int(page_size)
             }
         }, status=status.HTTP_200_OK)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1196,6 +1111,15 @@ def fetch_archived_users(request):
         users = CustomUsers.objects.filter(role='guest', is_archived=True)
         page = request.query_params.get('page')
         page_size = request.query_params.get('page_size')
+        
+        if wants_cursor_pagination(request):
+            page_users, pagination = cursor_paginate(request, users, ('id',), page_size or 10)
+            serializer = CustomUserSerializer(page_users, many=True)
+            return Response({
+                "users": serializer.data,
+                "pagination": pagination
+            }, status=status.HTTP_200_OK)
+        
         paginator = Paginator(users, page_size)
         
         try:
@@ -1215,6 +1139,8 @@ def fetch_archived_users(request):
                 "page_size": int(page_size)
             }
         }, status=status.HTTP_200_OK)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1235,34 +1161,18 @@ def restore_user(request, user_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def daily_revenue(request):
     try:
         month = int(request.query_params.get('month', timezone.now().month))
         year = int(request.query_params.get('year', timezone.now().year))
         
-        start_date = datetime(year, month, 1)
-        
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        end_date = end_date.replace(hour=23, minute=59, second=59)        
-        days_in_month = (end_date.day)
-        daily_revenue = [0] * days_in_month
-        
-        transactions = Transactions.objects.filter(
-            transaction_date__gte=start_date,
-            transaction_date__lte=end_date,
-            status='completed'
-        )
-        
-        for transaction in transactions:
-            day_idx = transaction.transaction_date.day - 1
-            daily_revenue[day_idx] += float(transaction.amount)
+        start_date, end_date = month_bounds(year, month)
+        days_in_month = end_date.day
+        series = daily_stats_series(start_date.date(), end_date.date(), ['revenue'])
         
         return Response({
-            "data": daily_revenue,
+            "data": series['revenue'],
             "month": month,
             "year": year,
             "days_in_month": days_in_month
@@ -1275,33 +1185,18 @@ def daily_revenue(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def daily_bookings(request):
     try:
         month = int(request.query_params.get('month', timezone.now().month))
         year = int(request.query_params.get('year', timezone.now().year))
         
-        start_date = datetime(year, month, 1)
-        
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        end_date = end_date.replace(hour=23, minute=59, second=59)        
-        days_in_month = (end_date.day)        
-        daily_bookings = [0] * days_in_month
-        
-        bookings = Bookings.objects.filter(
-            created_at__gte=start_date,
-            created_at__lte=end_date
-        )
-        
-        for booking in bookings:
-            day_idx = booking.created_at.day - 1
-            daily_bookings[day_idx] += 1
+        start_date, end_date = month_bounds(year, month)
+        days_in_month = end_date.day
+        series = daily_stats_series(start_date.date(), end_date.date(), ['bookings_created'])
         
         return Response({
-            "data": daily_bookings,
+            "data": series['bookings_created'],
             "month": month,
             "year": year,
             "days_in_month": days_in_month
@@ -1314,43 +1209,31 @@ def daily_bookings(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def daily_occupancy(request):
     try:
-        month = int(request.query_params.get('month', timezone.now().month))
-        year = int(request.query_params.get('year', timezone.now().year))        
-        
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1).date() - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1).date() - timedelta(days=1)
-        
-        days_in_month = (end_date.day)        
-        daily_occupancy = [0] * days_in_month
-        
-        total_rooms = Rooms.objects.count()
-        if total_rooms == 0:
+        date_range = parse_date_range(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        if date_range:
+            start_date, end_date = date_range
             return Response({
-                "data": daily_occupancy,
-                "month": month,
-                "year": year,
-                "days_in_month": days_in_month
+                "data": daily_occupancy_rates(start_date, end_date),
+                "start_date": start_date,
+                "end_date": end_date,
+                "days": (end_date - start_date).days + 1
             }, status=status.HTTP_200_OK)
         
-        for day in range(1, days_in_month + 1):
-            current_date = date(year, month, day)
-            
-            occupied_rooms = Bookings.objects.filter(
-                Q(check_in_date__lte=current_date) & 
-                Q(check_out_date__gte=current_date) &
-                Q(status__in=['reserved', 'confirmed', 'checked_in']) &
-                Q(is_venue_booking=False)
-            ).count()
-            
-            occupancy_rate = (occupied_rooms / total_rooms) * 100
-            daily_occupancy[day - 1] = round(occupancy_rate, 2)
+        month = int(request.query_params.get('month', timezone.now().month))
+        year = int(request.query_params.get('year', timezone.now().year))        
+        
+        start_date, end_date = month_bounds(year, month)
+        days_in_month = end_date.day
         
         return Response({
-            "data": daily_occupancy,
+            "data": daily_occupancy_rates(start_date.date(), end_date.date()),
             "month": month,
             "year": year,
             "days_in_month": days_in_month
@@ -1363,40 +1246,19 @@ def daily_occupancy(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def daily_checkins_checkouts(request):
     try:
         month = int(request.query_params.get('month', timezone.now().month))
         year = int(request.query_params.get('year', timezone.now().year))
         
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        
-        days_in_month = (end_date.day)
-        daily_checkins = [0] * days_in_month
-        daily_checkouts = [0] * days_in_month
-        
-        bookings = Bookings.objects.all()
-        
-        for booking in bookings:
-            if booking.check_in_date and booking.check_in_date.month == month and booking.check_in_date.year == year:
-                if booking.status == 'checked_in' or booking.status == 'checked_out':
-                    day_idx = booking.check_in_date.day - 1
-                    if 0 <= day_idx < days_in_month:
-                        daily_checkins[day_idx] += 1
-            
-            if booking.check_out_date and booking.check_out_date.month == month and booking.check_out_date.year == year:
-                if booking.status == 'checked_out':
-                    day_idx = booking.check_out_date.day - 1
-                    if 0 <= day_idx < days_in_month:
-                        daily_checkouts[day_idx] += 1
+        start_date, end_date = month_bounds(year, month)
+        days_in_month = end_date.day
+        series = daily_stats_series(start_date.date(), end_date.date(), ['check_ins', 'check_outs'])
         
         return Response({
-            "checkins": daily_checkins,
-            "checkouts": daily_checkouts,
+            "checkins": series['check_ins'],
+            "checkouts": series['check_outs'],
             "month": month,
             "year": year,
             "days_in_month": days_in_month
@@ -1409,32 +1271,18 @@ def daily_checkins_checkouts(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def daily_cancellations(request):
     try:
         month = int(request.query_params.get('month', timezone.now().month))
-        year = int(request.query_params.get('year', timezone.now().year))       
-        start_date = datetime(year, month, 1)
-        
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        days_in_month = (end_date.day)
-        daily_cancellations = [0] * days_in_month        
-        cancelled_bookings = Bookings.objects.filter(
-            status='cancelled',
-            cancellation_date__gte=start_date,
-            cancellation_date__lte=end_date
-        )
+        year = int(request.query_params.get('year', timezone.now().year))
         
-        for booking in cancelled_bookings:
-            day_idx = booking.cancellation_date.day - 1
-            daily_cancellations[day_idx] += 1
+        start_date, end_date = month_bounds(year, month)
+        days_in_month = end_date.day
+        series = daily_stats_series(start_date.date(), end_date.date(), ['cancellations'])
         
         return Response({
-            "data": daily_cancellations,
+            "data": series['cancellations'],
             "month": month,
             "year": year,
             "days_in_month": days_in_month
@@ -1447,83 +1295,45 @@ def daily_cancellations(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def area_revenue(request):
     try:
-        month = int(request.query_params.get('month', timezone.now().month))
-        year = int(request.query_params.get('year', timezone.now().year))
-        start_date = datetime(year, month, 1)
-        
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-            
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        
-        response_data = {
-            "area_names": [],
-            "revenue_data": [],
-            "month": month,
-            "year": year
-        }
-        
-        areas = Areas.objects.all()
-        
-        for area in areas:
-            area_revenue = Transactions.objects.filter(
-                booking__area=area,
-                transaction_date__gte=start_date,
-                transaction_date__lte=end_date,
-                status='completed',
-                booking__is_venue_booking=True
-            ).aggregate(Sum('amount'))['amount__sum'] or 0
-            
-            response_data["area_names"].append(area.area_name)
-            response_data["revenue_data"].append(float(area_revenue))
+        start_date, end_date, window = request_window(request.query_params)
+        top = parse_top(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        rows = property_breakdown(Areas, 'revenue', start_date, end_date, top)
         
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response({
+            "area_names": [row[0] for row in rows],
+            "revenue_data": [row[1] for row in rows],
+            **window
+        }, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def area_bookings(request):
     try:
-        month = int(request.query_params.get('month', timezone.now().month))
-        year = int(request.query_params.get('year', timezone.now().year))        
-        start_date = datetime(year, month, 1)
-        
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        
-        response_data = {
-            "area_names": [],
-            "booking_counts": [],
-            "month": month,
-            "year": year
-        }
-        
-        areas = Areas.objects.all()
-        
-        for area in areas:
-            area_bookings = Bookings.objects.filter(
-                area=area,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                is_venue_booking=True
-            ).count()
-            
-            response_data["area_names"].append(area.area_name)
-            response_data["booking_counts"].append(area_bookings)
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        start_date, end_date, window = request_window(request.query_params)
+        top = parse_top(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        rows = property_breakdown(Areas, 'bookings', start_date, end_date, top)
         
+        return Response({
+            "area_names": [row[0] for row in rows],
+            "booking_counts": [row[1] for row in rows],
+            **window
+        }, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({
             "error": str(e)
@@ -1531,41 +1341,45 @@ def area_bookings(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def room_revenue(request):
     try:
-        month = int(request.query_params.get('month', timezone.now().month))
-        year = int(request.query_params.get('year', timezone.now().year))        
-        start_date = datetime(year, month, 1)
+        start_date, end_date, window = request_window(request.query_params)
+        top = parse_top(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        rows = property_breakdown(Rooms, 'revenue', start_date, end_date, top)
         
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
+        return Response({
+            "room_names": [row[0] for row in rows],
+            "revenue_data": [row[1] for row in rows],
+            **window
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({
+            "error": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        
-        response_data = {
-            "room_names": [],
-            "revenue_data": [],
-            "month": month,
-            "year": year
-        }
-        
-        rooms = Rooms.objects.all()
-        
-        for room in rooms:
-            room_revenue = Transactions.objects.filter(
-                booking__room=room,
-                transaction_date__gte=start_date,
-                transaction_date__lte=end_date,
-                status='completed',
-                booking__is_venue_booking=False
-            ).aggregate(Sum('amount'))['amount__sum'] or 0
-            
-            response_data["room_names"].append(room.room_name)
-            response_data["revenue_data"].append(float(room_revenue))
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@use_read_replica
+def room_bookings(request):
+    try:
+        start_date, end_date, window = request_window(request.query_params)
+        top = parse_top(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        rows = property_breakdown(Rooms, 'bookings', start_date, end_date, top)
         
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response({
+            "room_names": [row[0] for row in rows],
+            "booking_counts": [row[1] for row in rows],
+            **window
+        }, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({
             "error": str(e)
@@ -1573,41 +1387,54 @@ def room_revenue(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def room_bookings(request):
+@use_read_replica
+def daily_no_shows_rejected(request):
     try:
         month = int(request.query_params.get('month', timezone.now().month))
-        year = int(request.query_params.get('year', timezone.now().year))        
-        start_date = datetime(year, month, 1)
+        year = int(request.query_params.get('year', timezone.now().year))
         
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
+        start_date, end_date = month_bounds(year, month)
+        days_in_month = end_date.day
+        series = daily_stats_series(start_date.date(), end_date.date(), ['no_shows', 'rejections'])
         
-        end_date = end_date.replace(hour=23, minute=59, second=59)
+        return Response({
+            "no_shows": series['no_shows'],
+            "rejected": series['rejections'],
+            "month": month,
+            "year": year,
+            "days_in_month": days_in_month
+        }, status=status.HTTP_200_OK)
         
+    except Exception as e:
+        return Response({
+            "error": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@use_read_replica
+def daily_stats(request):
+    try:
+        start_date, end_date, window = request_window(request.query_params)
+        fields = [f for f in request.query_params.get('fields', '').split(',') if f] or FACT_FIELDS
+        unknown = [f for f in fields if f not in FACT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Valid fields are: {', '.join(FACT_FIELDS)}")
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        start, end = start_date.date(), end_date.date()
         response_data = {
-            "room_names": [],
-            "booking_counts": [],
-            "month": month,
-            "year": year
+            "data": daily_stats_series(start, end, fields),
+            "days": (end - start).days + 1,
+            **window
         }
         
-        rooms = Rooms.objects.all()
-        
-        for room in rooms:
-            room_bookings = Bookings.objects.filter(
-                room=room,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                is_venue_booking=False
-            ).count()
-            
-            response_data["room_names"].append(room.room_name)
-            response_data["booking_counts"].append(room_bookings)
+        if request.query_params.get('compare') == 'previous_year':
+            response_data["previous_year"] = daily_stats_series(previous_year(start), previous_year(end), fields)
         
         return Response(response_data, status=status.HTTP_200_OK)
-        
     except Exception as e:
         return Response({
             "error": str(e)
@@ -1615,52 +1442,141 @@ def room_bookings(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def daily_no_shows_rejected(request):
+@use_read_replica
+def batch_analytics(request):
+    if request.user.role != 'admin':
+        return Response({"error": "Only admin users can access this endpoint"}, status=status.HTTP_403_FORBIDDEN)
+    
     try:
-        month = int(request.query_params.get('month', timezone.now().month))
-        year = int(request.query_params.get('year', timezone.now().year))        
-        start_date = datetime(year, month, 1)
-        
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        end_date = end_date.replace(hour=23, minute=59, second=59)        
-        days_in_month = (end_date.day)
-        
-        daily_no_shows = [0] * days_in_month
-        daily_rejected = [0] * days_in_month
-        
-        no_show_bookings = Bookings.objects.filter(
-            status='missed_reservation',
-            updated_at__gte=start_date,
-            updated_at__lte=end_date
-        )
-        
-        rejected_bookings = Bookings.objects.filter(
-            status='rejected',
-            updated_at__gte=start_date,
-            updated_at__lte=end_date
+        start_date, end_date, window = request_window(request.query_params)
+        series = parse_series(request.query_params, window)
+        top = parse_top(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        return Response({
+            "series": analytics_batch(series, start_date, end_date, window, top),
+            "days": (end_date.date() - start_date.date()).days + 1,
+            **window
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({
+            "error": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_data(request, dataset):
+    if request.user.role != 'admin':
+        return Response({"error": "Only admin users can access this endpoint"}, status=status.HTTP_403_FORBIDDEN)
+    
+    export_format = request.query_params.get('file_type', 'csv')
+    try:
+        start, end = parse_export_dates(
+            request.query_params.get('start_date'), request.query_params.get('end_date')
         )
+        rows = iter_export(dataset, export_format, start, end)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except RuntimeError as e:
+        return Response({"error": str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    
+    response = StreamingHttpResponse(aiter_export(rows, replica_reads), content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, export_format, start, end)}"'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def monthly_report(request, year, month):
+    if request.user.role != 'admin':
+        return Response({"error": "Only admin users can access this endpoint"}, status=status.HTTP_403_FORBIDDEN)
+    
+    report_format = request.query_params.get('file_type', 'png')
+    if report_format not in REPORT_FORMATS:
+        return Response({"error": f"Unknown format. Use one of: {', '.join(REPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= month <= 12:
+        return Response({"error": "Invalid month"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        artifact = current_report_artifact(year, month, report_format)
+        if artifact is None:
+            request_report_render(year, month)
+            return Response({
+                "status": "queued",
+                "year": year,
+                "month": month
+            }, status=status.HTTP_202_ACCEPTED)
         
-        for booking in no_show_bookings:
-            day_idx = booking.updated_at.day - 1
-            daily_no_shows[day_idx] += 1
-        
-        for booking in rejected_bookings:
-            day_idx = booking.updated_at.day - 1
-            daily_rejected[day_idx] += 1
-        
+        response = HttpResponse(artifact, content_type=REPORT_CONTENT_TYPES[report_format])
+        response['Content-Disposition'] = f'inline; filename="report_{year}-{month:02d}.{report_format}"'
+        return response
+    except Exception as e:
         return Response({
-            "no_shows": daily_no_shows,
-            "rejected": daily_rejected,
-            "month": month,
-            "year": year,
-            "days_in_month": days_in_month
+            "error": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@use_read_replica
+def occupancy_forecast(request):
+    if request.user.role != 'admin':
+        return Response({"error": "Only admin users can access this endpoint"}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        days = int(request.query_params.get('days', FORECAST_DEFAULT_DAYS))
+        if not 1 <= days <= FORECAST_DAYS:
+            raise ValueError
+    except ValueError:
+        return Response({"error": f"days must be between 1 and {FORECAST_DAYS}"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        return Response(forecast_for_today(days), status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({
+            "error": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@use_read_replica
+def kpis(request):
+    if request.user.role != 'admin':
+        return Response({"error": "Only admin users can access this endpoint"}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        start_date, end_date, window = request_window(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        return Response({
+            "kpis": kpis_for_period(start_date.date(), end_date.date()),
+            "days": (end_date.date() - start_date.date()).days + 1,
+            **window
         }, status=status.HTTP_200_OK)
-        
     except Exception as e:
         return Response({
             "error": str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cache_stats(request):
+    if request.user.role != 'admin':
+        return Response({"error": "Only admin users can access this endpoint"}, status=status.HTTP_403_FORBIDDEN)
+    
+    # Counters are per worker process, so this reports the worker that served the request.
+    if not hasattr(cache, 'stats'):
+        return Response({"error": "The configured cache does not record hit rates"}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    
+    return Response({"cache": cache.stats()}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def metrics(request):
+    if request.user.role != 'admin':
+        return Response({"error": "Only admin users can access this endpoint"}, status=status.HTTP_403_FORBIDDEN)
+    
+    # Prometheus text format. Like cache_stats, these are the serving worker's own totals.
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.2 on 2026-10-19 08:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_initial'),
+        ('property', '0002_roomimages'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookings',
+            index=models.Index(fields=['check_in_date', 'status'], name='bookings_checkin_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookings',
+            index=models.Index(fields=['check_out_date', 'status'], name='bookings_checkout_status_idx'),
+        ),
+    ]
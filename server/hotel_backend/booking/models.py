@@ -53,6 +53,10 @@ class Bookings(models.Model):
     
     class Meta:
         db_table = 'bookings'
+        indexes = [
+            models.Index(fields=['check_in_date', 'status'], name='bookings_checkin_status_idx'),
+            models.Index(fields=['check_out_date', 'status'], name='bookings_checkout_status_idx'),
+        ]
     
     def __str__(self):
         if self.is_venue_booking and self.area:
@@ -9,7 +9,7 @@ from property.serializers import AreaSerializer, RoomSerializer
 from .validations.booking import validate_booking_request
 from django.utils import timezone
 from datetime import datetime
-from django.db.models import Sum
+from django.db.models import Prefetch, Sum
 from django.core.files.uploadedfile import InMemoryUploadedFile, UploadedFile
 import uuid
 
@@ -57,7 +57,21 @@ class BookingSerializer(serializers.ModelSerializer):
             return obj.payment_proof.url
         return None
     
+    @staticmethod
+    def with_related(queryset):
+        """Load the user, room, area and paid transactions of a list of bookings in a fixed number of queries."""
+        # The paid total is summed from prefetched rows: annotating it would make
+        # every page query group the whole filtered table before the LIMIT.
+        return queryset.select_related('user').prefetch_related(
+            Prefetch('room', queryset=RoomSerializer.with_related(Rooms.objects.all())),
+            Prefetch('area', queryset=AreaSerializer.with_related(Areas.objects.all())),
+            Prefetch('transactions', queryset=Transactions.objects.filter(status='completed'),
+                     to_attr='completed_transactions'),
+        )
+
     def get_total_amount(self, obj):
+        if hasattr(obj, 'completed_transactions'):
+            return sum(txn.amount for txn in obj.completed_transactions) or 0.00
         return Transactions.objects.filter(
             booking=obj,
             status='completed'
@@ -316,6 +330,10 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Reviews
         fields = ['id', 'rating', 'user', 'booking', 'review_text', 'created_at', 'room', 'area', 'user_profile_image', 'formatted_date', 'user_name', 'booking_details']
         read_only_fields = ['user', 'room', 'area', 'booking']
+
+    @staticmethod
+    def with_related(queryset):
+        return queryset.select_related('user', 'booking__room', 'booking__area')
     
     def get_user_name(self, obj):
         if obj.user:
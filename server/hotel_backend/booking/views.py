@@ -14,6 +14,7 @@ from rest_framework.permissions import IsAuthenticated
 from datetime import datetime
 from django.db.models import Q
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from hotel_backend.pagination import InvalidCursor, cursor_paginate, wants_cursor_pagination
 
 # Create your views here.
 @api_view(['GET'])
@@ -63,8 +64,8 @@ def fetch_availability(request):
     
     areas = areas.exclude(id__in=booked_area_ids)
     
-    room_serializer = RoomSerializer(rooms, many=True, context={'request': request})
-    area_serializer = AreaSerializer(areas, many=True)
+    room_serializer = RoomSerializer(RoomSerializer.with_related(rooms), many=True, context={'request': request})
+    area_serializer = AreaSerializer(AreaSerializer.with_related(areas), many=True)
     
     return Response({
         "rooms": room_serializer.data,
@@ -83,7 +84,7 @@ def bookings_list(request):
             page = request.query_params.get('page', 1)
             page_size = request.query_params.get('page_size', 10)
             status_filter = request.query_params.get('status')
-            bookings = Bookings.objects.all().order_by('-created_at')
+            bookings = BookingSerializer.with_related(Bookings.objects.all()).order_by('-created_at')
             
             if status_filter:
                 bookings = bookings.filter(status=status_filter)
@@ -91,6 +92,14 @@ def bookings_list(request):
             if request.user.role == 'guest':
                 bookings = bookings.filter(user=request.user)
             
+            if wants_cursor_pagination(request):
+                page_bookings, pagination = cursor_paginate(request, bookings, ('-created_at',), page_size)
+                serializer = BookingSerializer(page_bookings, many=True)
+                return Response({
+                    "data": serializer.data,
+                    "pagination": pagination
+                }, status=status.HTTP_200_OK)
+            
             paginator = Paginator(bookings, page_size)
             try:
                 paginated_bookings = paginator.page(page)
@@ -141,6 +150,8 @@ def bookings_list(request):
                 }, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -193,7 +204,7 @@ def reservation_list(request):
                 return Response({"error": "Authentication required to view reservations"}, 
                                 status=status.HTTP_401_UNAUTHORIZED)
             
-            bookings = Bookings.objects.all()
+            bookings = BookingSerializer.with_related(Bookings.objects.all())
             serializer = BookingSerializer(bookings, many=True)
             return Response({
                 "data": serializer.data
@@ -247,7 +258,7 @@ def area_reservations(request):
                 return Response({"error": "Authentication required to view area reservations"}, 
                                 status=status.HTTP_401_UNAUTHORIZED)
                 
-            bookings = Bookings.objects.filter(is_venue_booking=True).order_by('-created_at')
+            bookings = BookingSerializer.with_related(Bookings.objects.filter(is_venue_booking=True)).order_by('-created_at')
             serializer = BookingSerializer(bookings, many=True)
             return Response({
                 "data": serializer.data
@@ -300,19 +311,29 @@ def room_detail(request, room_id):
 def user_bookings(request):
     try:
         user = request.user
-        bookings = Bookings.objects.filter(user=user).order_by('-created_at')
+        bookings = BookingSerializer.with_related(Bookings.objects.filter(user=user)).order_by('-created_at')
         
         page = request.query_params.get('page', 1)
         page_size = request.query_params.get('page_size', 5)
         
-        paginator = Paginator(bookings, page_size)
-        
-        try:
-            paginated_bookings = paginator.page(page)
-        except PageNotAnInteger:
-            paginated_bookings = paginator.page(1)
-        except EmptyPage:
-            paginated_bookings = paginator.page(paginator.num_pages)
+        if wants_cursor_pagination(request):
+            paginated_bookings, pagination = cursor_paginate(request, bookings, ('-created_at',), page_size)
+        else:
+            paginator = Paginator(bookings, page_size)
+            
+            try:
+                paginated_bookings = paginator.page(page)
+            except PageNotAnInteger:
+                paginated_bookings = paginator.page(1)
+            except EmptyPage:
+                paginated_bookings = paginator.page(paginator.num_pages)
+            
+            pagination = {
+                "total_pages": paginator.num_pages,
+                "current_page": int(page),
+                "total_items": paginator.count,
+                "page_size": int(page_size)
+            }
             
         booking_data = []
         for booking in paginated_bookings:
@@ -330,13 +351,10 @@ def user_bookings(request):
         
         return Response({
             "data": booking_data,
-            "pagination": {
-                "total_pages": paginator.num_pages,
-                "current_page": int(page),
-                "total_items": paginator.count,
-                "page_size": int(page_size)
-            }
+            "pagination": pagination
         }, status=status.HTTP_200_OK)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -471,7 +489,7 @@ def booking_reviews(request, booking_id):
                     status=status.HTTP_403_FORBIDDEN)
     
     if request.method == 'GET':
-        reviews = Reviews.objects.filter(booking=booking)
+        reviews = ReviewSerializer.with_related(Reviews.objects.filter(booking=booking))
         serializer = ReviewSerializer(reviews, many=True)
         return Response({"data": serializer.data}, status=status.HTTP_200_OK)
     
@@ -507,7 +525,7 @@ def booking_reviews(request, booking_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_reviews(request):
-    reviews = Reviews.objects.filter(user=request.user).order_by('-created_at')
+    reviews = ReviewSerializer.with_related(Reviews.objects.filter(user=request.user)).order_by('-created_at')
     serializer = ReviewSerializer(reviews, many=True)
     return Response({"data": serializer.data}, status=status.HTTP_200_OK)
     
@@ -543,10 +561,20 @@ def review_detail(request, review_id):
 @api_view(['GET'])
 def room_reviews(request, room_id):
     try:
+        reviews = ReviewSerializer.with_related(Reviews.objects.filter(room_id=room_id)).order_by('-created_at')
+        
+        if wants_cursor_pagination(request):
+            page_reviews, pagination = cursor_paginate(
+                request, reviews, ('-created_at',), request.query_params.get('page_size', 10)
+            )
+            serializer = ReviewSerializer(page_reviews, many=True)
+            return Response({
+                "data": serializer.data,
+                **pagination
+            }, status=status.HTTP_200_OK)
+        
         page = int(request.query_params.get('page'))
         page_size = int(request.query_params.get('page_size'))
-        
-        reviews = Reviews.objects.filter(room_id=room_id).order_by('-created_at')
         paginator = Paginator(reviews, page_size)
         
         try:
@@ -564,16 +592,28 @@ def room_reviews(request, room_id):
         }, status=status.HTTP_200_OK)
     except Rooms.DoesNotExist:
         return Response({"error": "Room not found"}, status=status.HTTP_404_NOT_FOUND)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
 def area_reviews(request, area_id):
     try:
+        reviews = ReviewSerializer.with_related(Reviews.objects.filter(area_id=area_id)).order_by('-created_at')
+        
+        if wants_cursor_pagination(request):
+            page_reviews, pagination = cursor_paginate(
+                request, reviews, ('-created_at',), request.query_params.get('page_size', 10)
+            )
+            serializer = ReviewSerializer(page_reviews, many=True)
+            return Response({
+                "data": serializer.data,
+                **pagination
+            }, status=status.HTTP_200_OK)
+        
         page = int(request.query_params.get('page'))
         page_size = int(request.query_params.get('page_size'))
-        
-        reviews = Reviews.objects.filter(area_id=area_id).order_by('-created_at')
         paginator = Paginator(reviews, page_size)
         
         try:
@@ -592,5 +632,7 @@ def area_reviews(request, area_id):
     
     except Areas.DoesNotExist:
         return Response({"error": "Area not found"}, status=status.HTTP_404_NOT_FOUND)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -12,16 +12,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hotel_backend.settings')
 
+# Set up Django before importing anything that loads models.
+django_asgi_app = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
+from user_roles.middleware import JWTAuthMiddlewareStack
 from user_roles.routing import websocket_urlpatterns
 from admin_dashboard.routing import websockets_urlpatterns as admin_websockets_urlpatterns
 
-django_asgi_app = get_asgi_application()
-
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
-    "websocket": AuthMiddlewareStack(
+    "websocket": JWTAuthMiddlewareStack(
         URLRouter(
             websocket_urlpatterns + admin_websockets_urlpatterns
         )
@@ -0,0 +1,223 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from .metrics import record_cache_lookup
+
+_MISSING = object()
+
+class TwoTierCache(BaseCache):
+    """
+    A small per-process LRU (L1) in front of a shared cache alias (L2).
+
+    Every write goes to L2, so anything set by one worker is visible to all of
+    them. Only keys starting with one of LOCAL_KEY_PREFIXES are also kept in L1,
+    for at most LOCAL_TIMEOUT seconds. A delete in another process cannot evict
+    them, so those prefixes should only cover values that never change under the
+    same key: version-stamped keys, where invalidating means bumping the version
+    so readers move on to a new key, or short-lived figures that may be a little
+    stale. Version counters themselves belong in SHARED_ONLY_KEY_PREFIXES.
+
+    Keys under LOCAL_ONLY_KEY_PREFIXES never reach L2 at all: per-process data
+    read on every request, such as the authenticated user, where a short timeout
+    bounds how long other workers can miss an invalidation.
+
+    OPTIONS:
+        SHARED_CACHE: alias of the L2 cache (default "shared")
+        LOCAL_MAX_ENTRIES: L1 size, least recently used entries are dropped first
+        LOCAL_TIMEOUT: longest an entry stays in L1, in seconds
+        LOCAL_KEY_PREFIXES / SHARED_ONLY_KEY_PREFIXES: which keys L1 may hold
+        LOCAL_ONLY_KEY_PREFIXES: keys kept in L1 only
+    """
+    def __init__(self, location, params):
+        options = dict(params.get('OPTIONS') or {})
+        self._shared_alias = options.pop('SHARED_CACHE', 'shared')
+        self._local_max_entries = int(options.pop('LOCAL_MAX_ENTRIES', 500))
+        self._local_timeout = int(options.pop('LOCAL_TIMEOUT', 60))
+        self._local_prefixes = tuple(options.pop('LOCAL_KEY_PREFIXES', ()))
+        self._shared_only_prefixes = tuple(options.pop('SHARED_ONLY_KEY_PREFIXES', ()))
+        self._local_only_prefixes = tuple(options.pop('LOCAL_ONLY_KEY_PREFIXES', ()))
+        super().__init__({**params, 'OPTIONS': options})
+
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(['local_hits', 'shared_hits', 'misses', 'sets', 'local_evictions'], 0)
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _is_local(self, key):
+        return key.startswith(self._local_prefixes) and not key.startswith(self._shared_only_prefixes)
+
+    def _is_local_only(self, key):
+        return key.startswith(self._local_only_prefixes)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _resolve_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _local_get_unlocked(self, local_key):
+        entry = self._local.get(local_key)
+        if entry is None:
+            return _MISSING
+        pickled, expires = entry
+        if expires <= time.monotonic():
+            del self._local[local_key]
+            return _MISSING
+        self._local.move_to_end(local_key)
+        return pickled
+
+    def _local_get(self, local_key):
+        with self._lock:
+            pickled = self._local_get_unlocked(local_key)
+        return _MISSING if pickled is _MISSING else pickle.loads(pickled)
+
+    def _local_set(self, local_key, value, timeout):
+        lifetime = self._local_timeout if timeout is None else min(timeout, self._local_timeout)
+        if lifetime <= 0:
+            self._local_delete(local_key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[local_key] = (pickled, time.monotonic() + lifetime)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+                self._counts['local_evictions'] += 1
+
+    def _local_delete(self, local_key):
+        with self._lock:
+            self._local.pop(local_key, None)
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        use_local = self._is_local(key)
+        if use_local or self._is_local_only(key):
+            value = self._local_get(local_key)
+            if value is not _MISSING:
+                self._count('local_hits')
+                record_cache_lookup(True)
+                return value
+            if not use_local:
+                self._count('misses')
+                record_cache_lookup(False)
+                return default
+
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._count('misses')
+            record_cache_lookup(False)
+            return default
+        self._count('shared_hits')
+        record_cache_lookup(True)
+        if use_local:
+            self._local_set(local_key, value, None)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        timeout = self._resolve_timeout(timeout)
+        self._count('sets')
+        if self._is_local_only(key):
+            self._local_set(local_key, value, timeout)
+            return
+        self.shared.set(key, value, timeout, version=version)
+        if self._is_local(key):
+            self._local_set(local_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        timeout = self._resolve_timeout(timeout)
+        if self._is_local_only(key):
+            with self._lock:
+                if self._local_get_unlocked(local_key) is not _MISSING:
+                    return False
+            self._count('sets')
+            self._local_set(local_key, value, timeout)
+            return True
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._count('sets')
+            if self._is_local(key):
+                self._local_set(local_key, value, timeout)
+        else:
+            self._local_delete(local_key)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        timeout = self._resolve_timeout(timeout)
+        if self._is_local_only(key):
+            value = self._local_get(local_key)
+            if value is _MISSING:
+                return False
+            self._local_set(local_key, value, timeout)
+            return True
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self._is_local_only(key):
+            with self._lock:
+                return self._local.pop(local_key, None) is not None
+        self._local_delete(local_key)
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self._is_local(key) or self._is_local_only(key):
+            if self._local_get(local_key) is not _MISSING:
+                return True
+            if self._is_local_only(key):
+                return False
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self._is_local_only(key):
+            with self._lock:
+                pickled = self._local_get_unlocked(local_key)
+                if pickled is _MISSING:
+                    raise ValueError("Key '%s' not found" % key)
+                value = pickle.loads(pickled) + delta
+                self._local[local_key] = (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._local[local_key][1])
+            return value
+        # Shared counters are read-modify-write, so they always go to the shared tier.
+        self._local_delete(local_key)
+        return self.shared.incr(key, delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        """Hit counts and rates for this process since it started (or since reset_stats)."""
+        with self._lock:
+            counts = dict(self._counts)
+            local_entries = len(self._local)
+        lookups = counts['local_hits'] + counts['shared_hits'] + counts['misses']
+        hits = counts['local_hits'] + counts['shared_hits']
+        return {
+            **counts,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "local_hit_rate": round(counts['local_hits'] / lookups, 4) if lookups else None,
+            "local_entries": local_entries,
+            "local_max_entries": self._local_max_entries,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
@@ -0,0 +1,152 @@
+import hashlib
+import queue
+import threading
+import time
+
+POOL_SIZE = 4
+POOL_MAX_IDLE = 60 * 5
+# Idle connections older than this are pinged before they are handed out.
+POOL_PING_AFTER = 10
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+class ConnectionPool:
+    """Idle DB-API connections for one database alias, shared by every thread of the process."""
+    def __init__(self, size=POOL_SIZE, max_idle=POOL_MAX_IDLE, ping_after=POOL_PING_AFTER):
+        self.size = size
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.closed = False
+        self.counts = dict.fromkeys(['opened', 'reused', 'returned', 'discarded'], 0)
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def checkout(self, is_alive):
+        """The most recently returned healthy connection, or None if the pool has none."""
+        while True:
+            try:
+                connection, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            idle = time.monotonic() - returned_at
+            if idle > self.max_idle or (idle > self.ping_after and not is_alive(connection)):
+                self._discard(connection)
+                continue
+            self._count('reused')
+            return connection
+
+    def checkin(self, connection):
+        """Keep `connection` for reuse. Returns False when the pool is full and the caller should close it."""
+        with self._lock:
+            if self.closed or self._idle.qsize() >= self.size:
+                return False
+            self._idle.put((connection, time.monotonic()))
+            self.counts['returned'] += 1
+        return True
+
+    def _discard(self, connection):
+        self._count('discarded')
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def clear(self):
+        with self._lock:
+            self.closed = True
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(connection)
+
+    def stats(self):
+        with self._lock:
+            return {**self.counts, "idle": self._idle.qsize(), "size": self.size}
+
+def _fingerprint(conn_params):
+    return hashlib.md5(repr(sorted((conn_params or {}).items())).encode()).hexdigest()
+
+def get_pool(alias, options=None, conn_params=None):
+    """
+    The pool for `alias`. A pool holding connections opened with other
+    connection parameters, e.g. before the test runner switched NAME, is closed
+    and replaced.
+    """
+    fingerprint = _fingerprint(conn_params)
+    stale = None
+    with _pools_lock:
+        if alias in _pools and _pools[alias][0] != fingerprint:
+            stale = _pools.pop(alias)[1]
+        if alias not in _pools:
+            options = options or {}
+            _pools[alias] = (fingerprint, ConnectionPool(
+                size=options.get('SIZE', POOL_SIZE),
+                max_idle=options.get('MAX_IDLE', POOL_MAX_IDLE),
+                ping_after=options.get('PING_AFTER', POOL_PING_AFTER),
+            ))
+        pool = _pools[alias][1]
+    if stale is not None:
+        stale.clear()
+    return pool
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, (_, pool) in pools.items()}
+
+def close_pool(alias):
+    with _pools_lock:
+        _, pool = _pools.pop(alias, (None, None))
+    if pool is not None:
+        pool.clear()
+
+class PooledConnectionMixin:
+    """
+    Database wrapper mixin that hands closed connections to a process-wide pool
+    instead of closing them, so the next request on any thread skips the
+    connect and authentication round trips. Pool options come from the
+    database's POOL setting: SIZE, MAX_IDLE and PING_AFTER (seconds).
+
+    Connections closed inside a transaction or after a database error are
+    really closed, never pooled.
+    """
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict.get('POOL'), self.get_connection_params())
+
+    @staticmethod
+    def _raw_connection_alive(connection):
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def get_new_connection(self, conn_params):
+        # Remember the pool the connection belongs to, so that it goes back
+        # there, or is closed if that pool has been replaced since.
+        self._connection_pool = get_pool(self.alias, self.settings_dict.get('POOL'), conn_params)
+        connection = self._connection_pool.checkout(self._raw_connection_alive)
+        if connection is None:
+            connection = super().get_new_connection(conn_params)
+            self._connection_pool._count('opened')
+        return connection
+
+    def _close(self):
+        reusable = not (self.in_atomic_block or self.errors_occurred or self.needs_rollback) and self.autocommit
+        pool = getattr(self, '_connection_pool', None)
+        if reusable and pool is not None and pool.checkin(self.connection):
+            return
+        super()._close()
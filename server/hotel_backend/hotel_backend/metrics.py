@@ -0,0 +1,231 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from .query_log import inspect_query
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 10_240, 102_400, 1_048_576, 10_485_760)
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            yield bound, total
+
+class _ViewMetrics:
+    __slots__ = ('latency', 'queries', 'size', 'query_time', 'statuses', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.query_time = 0.0
+        self.statuses = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+class RequestSample:
+    """What one request did, filled in while it runs."""
+    __slots__ = ('request', 'queries', 'query_time', 'cache_hits', 'cache_misses', 'shapes', 'repeated', 'allow_repeats')
+
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.shapes = {}
+        self.repeated = []
+        self.allow_repeats = False
+
+_current = ContextVar('request_sample', default=None)
+
+def start_sample(request=None):
+    sample = RequestSample(request)
+    return sample, _current.set(sample)
+
+def finish_sample(token):
+    _current.reset(token)
+
+def current_sample():
+    return _current.get()
+
+def timed_query(execute, sql, params, many, context):
+    """
+    connection.execute_wrapper hook that adds each query's count and time to
+    the current request and passes it to the slow/repeated query checks.
+    """
+    began = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample = _current.get()
+        if sample is not None:
+            duration = time.perf_counter() - began
+            sample.queries += 1
+            sample.query_time += duration
+            inspect_query(sample, sql, duration)
+
+def record_cache_lookup(hit):
+    sample = _current.get()
+    if sample is not None:
+        if hit:
+            sample.cache_hits += 1
+        else:
+            sample.cache_misses += 1
+
+class RequestMetrics:
+    """Per-view totals for this process. Recording is a dict lookup and a few additions under a lock."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self.started_at = time.time()
+
+    def record(self, view, method, status, duration, sample, size=None):
+        with self._lock:
+            metrics = self._views.get((view, method))
+            if metrics is None:
+                metrics = self._views[(view, method)] = _ViewMetrics()
+            status_class = f"{status // 100}xx"
+            metrics.statuses[status_class] = metrics.statuses.get(status_class, 0) + 1
+            metrics.latency.observe(duration)
+            metrics.queries.observe(sample.queries)
+            metrics.query_time += sample.query_time
+            metrics.cache_hits += sample.cache_hits
+            metrics.cache_misses += sample.cache_misses
+            if size is not None:
+                metrics.size.observe(size)
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def snapshot(self):
+        with self._lock:
+            return {key: _copy_view(metrics) for key, metrics in self._views.items()}
+
+def _copy_view(metrics):
+    copy = _ViewMetrics()
+    for name in ('latency', 'queries', 'size'):
+        source, target = getattr(metrics, name), getattr(copy, name)
+        target.counts, target.sum, target.count = list(source.counts), source.sum, source.count
+    copy.query_time = metrics.query_time
+    copy.statuses = dict(metrics.statuses)
+    copy.cache_hits, copy.cache_misses = metrics.cache_hits, metrics.cache_misses
+    return copy
+
+request_metrics = RequestMetrics()
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+class PrometheusText:
+    def __init__(self):
+        self.lines = []
+
+    def header(self, name, kind, help_text):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name, value, **labels):
+        self.lines.append(f"{name}{_labels(**labels) if labels else ''} {_number(value)}")
+
+    def histogram(self, name, histogram, **labels):
+        for bound, count in histogram.cumulative():
+            self.sample(f"{name}_bucket", count, **labels, le=bound)
+        self.sample(f"{name}_sum", histogram.sum, **labels)
+        self.sample(f"{name}_count", histogram.count, **labels)
+
+    def render(self):
+        return '\n'.join(self.lines) + '\n'
+
+def render_request_metrics(text, metrics=request_metrics):
+    views = sorted(metrics.snapshot().items())
+
+    histograms = [
+        ('http_request_duration_seconds', 'latency', 'Request latency by view.'),
+        ('http_request_db_queries', 'queries', 'Database queries per request by view.'),
+        ('http_response_size_bytes', 'size', 'Response body size by view; streamed responses are not included.'),
+    ]
+    for name, attribute, help_text in histograms:
+        text.header(name, 'histogram', help_text)
+        for (view, method), view_metrics in views:
+            text.histogram(name, getattr(view_metrics, attribute), view=view, method=method)
+
+    text.header('http_responses_total', 'counter', 'Responses by view and status class.')
+    for (view, method), view_metrics in views:
+        for status_class, count in sorted(view_metrics.statuses.items()):
+            text.sample('http_responses_total', count, view=view, method=method, status=status_class)
+
+    text.header('http_request_db_query_seconds_total', 'counter', 'Time spent in database queries by view.')
+    for (view, method), view_metrics in views:
+        text.sample('http_request_db_query_seconds_total', view_metrics.query_time, view=view, method=method)
+
+    text.header('http_request_cache_lookups_total', 'counter', 'Cache lookups made while serving each view.')
+    for (view, method), view_metrics in views:
+        text.sample('http_request_cache_lookups_total', view_metrics.cache_hits, view=view, method=method, result='hit')
+        text.sample('http_request_cache_lookups_total', view_metrics.cache_misses, view=view, method=method, result='miss')
+
+    text.header('process_start_time_seconds', 'gauge', 'When this worker process started recording.')
+    text.sample('process_start_time_seconds', metrics.started_at)
+
+def render_process_metrics(text):
+    """Cache tiers, connection pools and replica lag for this worker process."""
+    from django.core.cache import cache
+    from user_roles.replica import replica_status
+    from .db_pool import pool_stats
+
+    if hasattr(cache, 'stats'):
+        stats = cache.stats()
+        text.header('cache_lookups_total', 'counter', 'Default cache lookups by the tier that answered.')
+        text.sample('cache_lookups_total', stats['local_hits'], result='local_hit')
+        text.sample('cache_lookups_total', stats['shared_hits'], result='shared_hit')
+        text.sample('cache_lookups_total', stats['misses'], result='miss')
+        text.header('cache_local_entries', 'gauge', 'Entries in the per-process cache tier.')
+        text.sample('cache_local_entries', stats['local_entries'])
+
+    pools = sorted(pool_stats().items())
+    if pools:
+        text.header('db_pool_connections_total', 'counter', 'Pooled database connections by event.')
+        for alias, stats in pools:
+            for event in ('opened', 'reused', 'returned', 'discarded'):
+                text.sample('db_pool_connections_total', stats[event], database=alias, event=event)
+        text.header('db_pool_idle_connections', 'gauge', 'Idle connections held by the pool.')
+        for alias, stats in pools:
+            text.sample('db_pool_idle_connections', stats['idle'], database=alias)
+
+    replica = replica_status()
+    if replica['configured']:
+        text.header('db_replica_in_use', 'gauge', 'Whether replica reads are currently enabled.')
+        text.sample('db_replica_in_use', int(replica['in_use']))
+        if replica['lag_seconds'] is not None:
+            text.header('db_replica_lag_seconds', 'gauge', 'Upper bound on replication lag from the heartbeat.')
+            text.sample('db_replica_lag_seconds', replica['lag_seconds'])
+
+def render_metrics():
+    text = PrometheusText()
+    render_request_metrics(text)
+    render_process_metrics(text)
+    return text.render()
@@ -0,0 +1,127 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+COUNT_CACHE_TIMEOUT = 60
+
+class InvalidCursor(ValueError):
+    pass
+
+def wants_cursor_pagination(request):
+    """Cursor mode is opt-in: `?pagination=cursor` or any `cursor` param."""
+    params = request.query_params
+    return params.get('pagination') == 'cursor' or 'cursor' in params
+
+def _ordering_fields(queryset, ordering):
+    fields = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+    pk_name = queryset.model._meta.pk.attname
+    if not any(name in (pk_name, 'pk') for name, _ in fields):
+        # The primary key breaks ties so that every row has a unique position.
+        fields.append((pk_name, fields[-1][1] if fields else False))
+    return fields
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _encode_cursor(row, fields, backwards):
+    payload = {
+        'o': [name for name, _ in fields],
+        'v': [_encode_value(getattr(row, name)) for name, _ in fields],
+        'b': int(backwards),
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def _decode_cursor(cursor, model, fields):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        names, values = payload['o'], payload['v']
+        backwards = bool(payload.get('b'))
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise InvalidCursor("Invalid cursor")
+
+    if names != [name for name, _ in fields] or len(values) != len(fields):
+        raise InvalidCursor("Cursor does not match this listing")
+
+    try:
+        values = [model._meta.get_field(name).to_python(value) for name, value in zip(names, values)]
+    except ValidationError:
+        raise InvalidCursor("Invalid cursor")
+    return values, backwards
+
+def _keyset_filter(fields, values, backwards):
+    """Rows strictly after (or before, when paging backwards) the cursor position."""
+    condition = Q()
+    for i, (name, desc) in enumerate(fields):
+        lookup = 'lt' if desc != backwards else 'gt'
+        clause = Q(**{f"{name}__{lookup}": values[i]})
+        for prev_name, prev_value in zip([n for n, _ in fields[:i]], values[:i]):
+            clause &= Q(**{prev_name: prev_value})
+        condition |= clause
+    return condition
+
+def cached_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    """COUNT(*) for a listing, cached briefly so paging does not recount every request."""
+    key = 'list_count:' + hashlib.md5(str(queryset.query).encode()).hexdigest()
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, timeout)
+    return total
+
+def cursor_paginate(request, queryset, ordering, page_size):
+    """
+    Keyset pagination over `queryset` ordered by `ordering` (non-null fields).
+    Returns the page rows and a pagination dict with opaque next/previous cursors.
+    Pass `include_total=true` to also get a cached `total_items`.
+    """
+    try:
+        page_size = int(page_size)
+    except (TypeError, ValueError):
+        page_size = 0
+    if page_size <= 0:
+        raise InvalidCursor("page_size must be a positive integer")
+
+    fields = _ordering_fields(queryset, ordering)
+    cursor = request.query_params.get('cursor')
+    backwards = False
+    page_queryset = queryset
+
+    if cursor:
+        values, backwards = _decode_cursor(cursor, queryset.model, fields)
+        page_queryset = page_queryset.filter(_keyset_filter(fields, values, backwards))
+
+    order_by = [('-' if desc != backwards else '') + name for name, desc in fields]
+    rows = list(page_queryset.order_by(*order_by)[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if backwards:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, bool(cursor)
+
+    pagination = {
+        "next_cursor": _encode_cursor(rows[-1], fields, False) if rows and has_next else None,
+        "previous_cursor": _encode_cursor(rows[0], fields, True) if rows and has_previous else None,
+        "has_next": has_next,
+        "has_previous": has_previous,
+        "page_size": page_size,
+    }
+
+    if request.query_params.get('include_total', '').lower() in ('1', 'true'):
+        pagination["total_items"] = cached_count(queryset)
+
+    return rows, pagination
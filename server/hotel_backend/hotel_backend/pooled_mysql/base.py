@@ -0,0 +1,5 @@
+from django.db.backends.mysql import base
+from hotel_backend.db_pool import PooledConnectionMixin
+
+class DatabaseWrapper(PooledConnectionMixin, base.DatabaseWrapper):
+    """The MySQL backend with connections kept in a process-wide pool (see hotel_backend.db_pool)."""
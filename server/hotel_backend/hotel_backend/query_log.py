@@ -0,0 +1,78 @@
+import logging
+import re
+import traceback
+from contextlib import contextmanager
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = getattr(settings, 'SLOW_QUERY_MS', 200)
+# The same query shape this many times in one request is treated as an N+1.
+REPEATED_QUERY_LIMIT = getattr(settings, 'REPEATED_QUERY_LIMIT', 10)
+# Fail the request with RepeatedQueryError as well as logging; on under `manage.py test`.
+REPEATED_QUERY_RAISE = getattr(settings, 'REPEATED_QUERY_RAISE', False)
+
+_IN_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+_PROJECT_DIR = str(settings.BASE_DIR)
+
+class RepeatedQueryError(Exception):
+    pass
+
+def query_shape(sql):
+    """The query with IN lists collapsed, so lookups that differ only in parameters compare equal."""
+    return _IN_LIST.sub('%s, ...', sql)
+
+def _caller():
+    """The innermost project frame that issued the query, skipping this module and installed packages."""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(_PROJECT_DIR) and 'site-packages' not in frame.filename \
+                and not frame.filename.endswith(('query_log.py', 'metrics.py')):
+            return f"{frame.filename[len(_PROJECT_DIR) + 1:]}:{frame.lineno} in {frame.name}"
+    return 'unknown'
+
+def _view(sample):
+    match = getattr(sample.request, 'resolver_match', None)
+    return match.route if match else 'unmatched'
+
+def inspect_query(sample, sql, duration):
+    """Log a slow query and count the shape for N+1 detection. Called for every query in a request."""
+    if duration * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.0f ms) in %s from %s: %s", duration * 1000, _view(sample), _caller(), sql
+        )
+
+    if sample.allow_repeats:
+        return
+    shape = query_shape(sql)
+    count = sample.shapes.get(shape, 0) + 1
+    sample.shapes[shape] = count
+    if count == REPEATED_QUERY_LIMIT:
+        # Not raised here: the views catch Exception around their queries and
+        # would turn it into an ordinary error response. The middleware raises
+        # once the view has returned (see check_repeated_queries).
+        message = (
+            f"Query repeated {count} times in {_view(sample)}, last from {_caller()} "
+            f"(N+1; prefetch or aggregate instead): {shape}"
+        )
+        sample.repeated.append(message)
+        logger.warning(message)
+
+def check_repeated_queries(sample):
+    if sample.repeated and REPEATED_QUERY_RAISE:
+        raise RepeatedQueryError('\n'.join(sample.repeated))
+
+@contextmanager
+def allow_repeated_queries():
+    """For loops that knowingly run one query per item, e.g. chunked bulk work."""
+    from .metrics import current_sample
+
+    sample = current_sample()
+    if sample is None:
+        yield
+        return
+    previous = sample.allow_repeats
+    sample.allow_repeats = True
+    try:
+        yield
+    finally:
+        sample.allow_repeats = previous
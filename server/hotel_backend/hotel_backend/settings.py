@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 from datetime import timedelta
 import cloudinary
@@ -59,6 +60,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its latency covers the rest of the middleware.
+    'user_roles.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -150,20 +153,38 @@ CHANNEL_LAYERS = {
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        # Served by daphne, where sync code runs on short-lived executor
+        # threads: a persistent per-thread connection (CONN_MAX_AGE > 0) would
+        # be left open by every thread that ever touched the database. Like
+        # flask, connections come from a process-wide pool instead, which pings
+        # idle connections before reuse (see hotel_backend.db_pool).
+        'ENGINE': 'hotel_backend.pooled_mysql',
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '3306'),
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'SIZE': int(os.getenv('DB_POOL_SIZE', '8')),
+            'MAX_IDLE': 60 * 5,
+        },
     },
     'flask': {
-        'ENGINE': 'django.db.backends.mysql',
+        # The flask host is remote, so connections come from a small pool
+        # shared by all threads instead of one persistent connection per
+        # thread; Django "closes" them after each request back into the pool.
+        'ENGINE': 'hotel_backend.pooled_mysql',
         'NAME': 'craveon',
         'USER': os.getenv('DB_USER'),
         'PASSWORD': 'admin',
         'HOST': '192.168.1.2',
         'PORT': os.getenv('DB_PORT', '3306'),
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'SIZE': int(os.getenv('FLASK_DB_POOL_SIZE', '4')),
+            'MAX_IDLE': 60 * 5,
+        },
         'SETTINGS': {
             'charset': 'utf8mb4',
         }
@@ -172,11 +193,31 @@ DATABASES = {
 
 AUTHENTICATION_BACKENDS = [
     'user_roles.backends.MultiDBAuthBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
+# Query checks run by RequestMetricsMiddleware (see hotel_backend.query_log):
+# queries slower than SLOW_QUERY_MS are logged, and a query shape repeated
+# REPEATED_QUERY_LIMIT times in one request is reported as an N+1, as an error
+# under `manage.py test` and a warning otherwise.
+SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', '200'))
+REPEATED_QUERY_LIMIT = int(os.getenv('REPEATED_QUERY_LIMIT', '10'))
+REPEATED_QUERY_RAISE = sys.argv[1:2] == ['test']
+
+# Optional read replica of the default database, used by the analytics,
+# export and catalog endpoints while it is less than REPLICA_MAX_LAG seconds behind.
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+REPLICA_MAX_LAG = int(os.getenv('DB_REPLICA_MAX_LAG', '10'))
+
 DATABASE_ROUTERS = [
     'user_roles.routers.SecondDbRouter',
+    'user_roles.routers.ReadReplicaRouter',
 ]
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -248,12 +289,34 @@ cloudinary.config(
 )
 
 # Cache settings
+# The shared tier lives in the default database so OTPs and cached figures
+# are seen by every worker; admin_dashboard migration 0005 creates its table.
+# Each process keeps a small LRU in front of it for the analytics and
+# listing-count keys, which are versioned or short-lived; version counters
+# always come from the shared tier.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'hotel_backend.cache.TwoTierCache',
         'TIMEOUT': 300,
-    }
+        'OPTIONS': {
+            'SHARED_CACHE': 'shared',
+            'LOCAL_MAX_ENTRIES': 500,
+            'LOCAL_TIMEOUT': 60,
+            'LOCAL_KEY_PREFIXES': ['analytics:', 'list_count:'],
+            'SHARED_ONLY_KEY_PREFIXES': ['analytics:version:'],
+            # The authenticated user and known flask misses are read on every
+            # request or login; they stay in process memory with short timeouts.
+            'LOCAL_ONLY_KEY_PREFIXES': ['auth:'],
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_table',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
 CACHE_MIDDLEWARE_ALIAS = 'default'
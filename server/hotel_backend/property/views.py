@@ -1,14 +1,16 @@
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from user_roles.replica import use_read_replica
 from .models import Rooms, Areas, Amenities
 from .serializers import RoomSerializer, AreaSerializer, AmenitySerializer
 
 # Create your views here.
 @api_view(['GET'])
+@use_read_replica
 def fetch_rooms(request):
     try:
-        rooms = Rooms.objects.filter(status='available')
+        rooms = RoomSerializer.with_related(Rooms.objects.filter(status='available'))
         serializer = RoomSerializer(rooms, many=True)
         return Response({
             "data": serializer.data
@@ -17,6 +19,7 @@ def fetch_rooms(request):
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
+@use_read_replica
 def fetch_room_detail(request, id):
     try:
         room = Rooms.objects.get(id=id)
@@ -28,6 +31,7 @@ def fetch_room_detail(request, id):
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
+@use_read_replica
 def fetch_amenities(request):
     try:
         amenities = Amenities.objects.all()
@@ -39,9 +43,10 @@ def fetch_amenities(request):
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
+@use_read_replica
 def fetch_areas(request):
     try:
-        areas = Areas.objects.filter(status='available')
+        areas = AreaSerializer.with_related(Areas.objects.filter(status='available'))
         serializer = AreaSerializer(areas, many=True)
         return Response({
             "data": serializer.data
@@ -50,6 +55,7 @@ def fetch_areas(request):
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
+@use_read_replica
 def fetch_area_detail(request, id):
     try:
         area = Areas.objects.get(id=id)
@@ -1,7 +1,11 @@
 import jwt
 from django.conf import settings
+from django.core.cache import cache
 from datetime import datetime, timedelta
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
 from .models import Customer
 
@@ -29,7 +33,53 @@ def decode_customer_jwt(token):
     except jwt.InvalidTokenError:
         return None
 
+# Authenticated users are cached briefly so that the many API calls behind a
+# single page do not each re-read the users table. `auth:` keys live only in
+# each process's memory (LOCAL_ONLY_KEY_PREFIXES), so user_roles.signals drops
+# the entry in the process that saved or deleted the user, and other workers
+# see the change within USER_CACHE_TIMEOUT seconds.
+USER_CACHE_TIMEOUT = 30
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+def _user_cache_entry(user):
+    """Every column but the password, plus the hash the token's revoke claim is compared with."""
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields if field.attname != 'password'
+    }
+    return {'fields': fields, 'password_hash': get_md5_hash_password(user.password)}
+
+def _user_from_cache_entry(model, entry):
+    # The password stays deferred: reading it loads it, and save() leaves it alone.
+    fields = entry['fields']
+    return model.from_db('default', list(fields), list(fields.values()))
+
 class CookieJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            user = super().get_user(validated_token)
+            cache.set(key, _user_cache_entry(user), USER_CACHE_TIMEOUT)
+            return user
+
+        # The cached user passed these checks when it was loaded, but the
+        # revoke claim belongs to the token, which may differ between requests.
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != entry['password_hash']:
+            raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return _user_from_cache_entry(self.user_model, entry)
+
     def authenticate(self, request):
         header = self.get_header(request)
         
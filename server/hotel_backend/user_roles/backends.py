@@ -1,35 +1,79 @@
+import hashlib
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
-from .models import Customer
+from django.core.cache import cache
+from django.db.models import Q
+from .login_guard import check_user_password, run_password_hash
+from .customer_sync import replica_as_customer, store_replica
+from .models import Customer, CustomerReplica
 from django.contrib.auth.hashers import check_password
 
+# Emails with no flask customer are remembered for a while so repeated failed
+# logins do not each cost a round trip to the other database.
+FLASK_MISS_CACHE_TIMEOUT = 60 * 5
+
+def flask_miss_key(email):
+    return f"auth:flask_miss:{hashlib.md5(email.strip().lower().encode()).hexdigest()}"
+
 class MultiDBAuthBackend(ModelBackend):
-    def authenticate(self, request, username=None, password=None, **kwargs):
-        User = get_user_model()
-        # Try Django user (default DB) by username or email
-        try:
-            user = User.objects.using('default').get(username=username)
-        except User.DoesNotExist:
-            try:
-                user = User.objects.using('default').get(email=username)
-            except User.DoesNotExist:
-                user = None
-        if user and user.check_password(password):
-            print("Authenticated with Django user")
-            return user
-
-        # Try Customer (flask DB)
-        try:
-            flask_user = Customer.objects.using('flask').get(email=username)
-            print("Found user in flask DB:", flask_user.email)
-            if check_password(password, flask_user.password):
-                flask_user.is_flask_customer = True
-                print("Authenticated with flask customer")
-                return flask_user
-            else:
-                print("Password mismatch for flask customer")
-        except Customer.DoesNotExist:
-            print("No user found in flask DB")
+    """
+    Authenticates Django users by username or email, and falls back to flask
+    customers (read from the local replica) only when no Django user matches.
+    Archived and inactive customers are refused. Callers that already loaded the
+    user can pass it as `user` to skip the lookup.
+    """
+    def authenticate(self, request, username=None, password=None, user=None, **kwargs):
+        if username is None or password is None:
+            return None
+
+        if user is None:
+            user = self.get_django_user(username)
+        if user is not None:
+            if check_user_password(user, password) and self.user_can_authenticate(user):
+                return user
+            return None
+
+        return self.authenticate_flask_customer(username, password)
+
+    def get_django_user(self, username):
+        matches = list(get_user_model().objects.using('default').filter(
+            Q(username=username) | Q(email=username)
+        )[:2])
+        # A username match wins over an email match.
+        for match in matches:
+            if match.username == username:
+                return match
+        return matches[0] if matches else None
+
+    def authenticate_flask_customer(self, email, password):
+        # The local replica answers for every customer synced so far. The flask
+        # database is asked only about customers newer than the last sync, or
+        # when the password does not match, in case it was changed since.
+        replica = CustomerReplica.objects.filter(email=email).first()
+        flask_user = replica_as_customer(replica) if replica is not None else None
+        if flask_user is None or not run_password_hash(check_password, password, flask_user.password):
+            flask_user = self.get_flask_customer(email)
+            if flask_user is None:
+                return None
+            if replica is not None and flask_user.password == replica.password:
+                return None
+            if not run_password_hash(check_password, password, flask_user.password):
+                return None
+
+        if flask_user.is_archived or flask_user.status != 'Active':
             return None
+        flask_user.is_flask_customer = True
+        return flask_user
 
-        return None
\ No newline at end of file
+    def get_flask_customer(self, email):
+        """The flask customer for `email`, mirrored into the replica; None (and remembered) when there is none."""
+        key = flask_miss_key(email)
+        if cache.get(key):
+            return None
+
+        flask_user = Customer.objects.using('flask').filter(email=email).first()
+        if flask_user is None:
+            cache.set(key, True, FLASK_MISS_CACHE_TIMEOUT)
+            return None
+        store_replica(flask_user)
+        return flask_user
@@ -1,6 +1,5 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
 from .models import Notification
 import json
 import logging
@@ -46,21 +45,18 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             logger.error(traceback.format_exc())
 
     async def authenticate_user(self, user_id):
-        try:
-            if not user_id:
-                await self.send_auth_response(False, "No user ID provided")
-                return
-                
-            self.user = await self.get_user(user_id)
-            if self.user and self.user.is_authenticated:
-                await self.setup_group()
-                await self.send_auth_response(True)
-            else:
-                await self.send_auth_response(False, "Authentication failed")
-                await self.close()
-        except Exception as e:
-            await self.send_auth_response(False, str(e))
+        # The identity comes from the access token resolved by JWTCookieAuthMiddleware;
+        # a client-sent id is only checked against it, never trusted on its own.
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated or (user_id and str(user_id) != str(user.id)):
+            await self.send_auth_response(False, "Authentication failed")
             await self.close()
+            return
+
+        if self.group_name is None:
+            self.user = user
+            await self.setup_group()
+        await self.send_auth_response(True)
 
     async def setup_group(self):
         try:
@@ -119,13 +115,6 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error(f"WS: Error updating unread count: {str(e)}")
 
-    @database_sync_to_async
-    def get_user(self, user_id):
-        try:
-            return get_user_model().objects.get(id=user_id)
-        except get_user_model().DoesNotExist:
-            return None
-
     @database_sync_to_async
     def get_unread_count(self):
         return Notification.objects.filter(user=self.user, is_read=False).count()
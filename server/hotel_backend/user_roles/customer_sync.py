@@ -0,0 +1,140 @@
+from django.db import transaction
+from django.db.models import CharField, Value
+from django.db.models.functions import MD5, Cast, Coalesce, Concat
+from django.utils import timezone
+from .models import Customer, CustomerReplica, CustomerSyncRun
+
+SYNC_CHUNK_SIZE = 1000
+CUSTOMER_FIELDS = [
+    'customer_id', 'full_name', 'email', 'contact', 'address', 'password', 'is_archived', 'status',
+]
+
+def _pages(queryset, size):
+    """Rows in customer_id order (the first column), one bounded query per page."""
+    last_id = None
+    while True:
+        page = queryset if last_id is None else queryset.filter(customer_id__gt=last_id)
+        chunk = list(page.order_by('customer_id')[:size])
+        if chunk:
+            yield chunk
+        if len(chunk) < size:
+            return
+        last_id = chunk[-1][0]
+
+def _row_hash():
+    """MD5 of a customer's synced columns, computed by whichever database holds the row."""
+    parts = []
+    for field in CUSTOMER_FIELDS[1:]:
+        parts += [Coalesce(Cast(field, CharField()), Value('')), Value('|')]
+    return MD5(Concat(*parts, output_field=CharField()))
+
+def _apply_chunk(chunk):
+    """Insert new and update changed replicas for one chunk of remote rows. Returns (created, updated)."""
+    ids = [row[0] for row in chunk]
+    existing = {
+        row[0]: row for row in CustomerReplica.objects.filter(customer_id__in=ids).values_list(*CUSTOMER_FIELDS)
+    }
+    now = timezone.now()
+    new, changed = [], []
+    for row in chunk:
+        if row[0] not in existing:
+            new.append(CustomerReplica(**dict(zip(CUSTOMER_FIELDS, row)), synced_at=now))
+        elif existing[row[0]] != row:
+            changed.append(CustomerReplica(**dict(zip(CUSTOMER_FIELDS, row)), synced_at=now))
+
+    with transaction.atomic():
+        CustomerReplica.objects.bulk_create(new)
+        CustomerReplica.objects.bulk_update(changed, CUSTOMER_FIELDS[1:] + ['synced_at'])
+    return len(new), len(changed)
+
+def _apply_changed(hashes, source):
+    """Fetch and apply only the remote rows of a (customer_id, hash) chunk that differ from the replica."""
+    ids = [customer_id for customer_id, _ in hashes]
+    local = dict(
+        CustomerReplica.objects.filter(customer_id__in=ids).annotate(row_hash=_row_hash()).values_list(
+            'customer_id', 'row_hash'
+        )
+    )
+    stale = [customer_id for customer_id, row_hash in hashes if local.get(customer_id) != row_hash]
+    if not stale:
+        return 0, 0
+    return _apply_chunk(list(
+        Customer.objects.using(source).filter(customer_id__in=stale).order_by('customer_id').values_list(*CUSTOMER_FIELDS)
+    ))
+
+def sync_customers(full=False, source='flask', chunk_size=SYNC_CHUNK_SIZE):
+    """
+    Mirror the flask `customers` table into CustomerReplica.
+
+    The remote table has no modification timestamp, so an incremental run reads
+    each customer's id and a hash of its columns, and only fetches the rows that
+    are new or whose hash differs from the replica's. A full run copies every
+    row. Both remove customers that no longer exist remotely.
+    """
+    run = CustomerSyncRun.objects.create(mode='full' if full else 'incremental')
+    try:
+        remote = Customer.objects.using(source)
+        if full:
+            remote = remote.values_list(*CUSTOMER_FIELDS)
+        else:
+            remote = remote.annotate(row_hash=_row_hash()).values_list('customer_id', 'row_hash')
+
+        # Rows arrive in id order, so any replica id that falls between two
+        # remote ids no longer exists remotely.
+        previous_id = None
+        for chunk in _pages(remote, chunk_size):
+            created, updated = _apply_chunk(chunk) if full else _apply_changed(chunk, source)
+            run.created += created
+            run.updated += updated
+            gone = CustomerReplica.objects.filter(customer_id__lte=chunk[-1][0]).exclude(
+                customer_id__in=[row[0] for row in chunk]
+            )
+            if previous_id is not None:
+                gone = gone.filter(customer_id__gt=previous_id)
+            run.deleted += gone.delete()[0]
+            previous_id = chunk[-1][0]
+
+        gone = CustomerReplica.objects.all()
+        if previous_id is not None:
+            gone = gone.filter(customer_id__gt=previous_id)
+        run.deleted += gone.delete()[0]
+    except Exception as e:
+        run.error = str(e)
+        raise
+    finally:
+        run.finished_at = timezone.now()
+        run.save()
+    return run
+
+def store_replica(customer):
+    """Mirror a single customer fetched from the remote database."""
+    CustomerReplica.objects.update_or_create(
+        customer_id=customer.customer_id,
+        defaults={field: getattr(customer, field) for field in CUSTOMER_FIELDS[1:]}
+    )
+
+def replica_as_customer(replica):
+    return Customer(**{field: getattr(replica, field) for field in CUSTOMER_FIELDS})
+
+def customer_sync_status():
+    """How far behind the replica is: time since the last successful sync and the row count."""
+    last_success = CustomerSyncRun.objects.filter(
+        finished_at__isnull=False, error__isnull=True
+    ).order_by('-finished_at').first()
+    last_full = CustomerSyncRun.objects.filter(
+        mode='full', finished_at__isnull=False, error__isnull=True
+    ).order_by('-finished_at').values_list('finished_at', flat=True).first()
+    last_failure = CustomerSyncRun.objects.filter(error__isnull=False).order_by('-started_at').first()
+    now = timezone.now()
+
+    return {
+        "replica_rows": CustomerReplica.objects.count(),
+        "last_sync_at": last_success.finished_at if last_success else None,
+        "last_sync_mode": last_success.mode if last_success else None,
+        "lag_seconds": round((now - last_success.finished_at).total_seconds()) if last_success else None,
+        "last_full_sync_at": last_full,
+        "full_sync_lag_seconds": round((now - last_full).total_seconds()) if last_full else None,
+        "last_error": last_failure.error if last_failure and (
+            not last_success or last_failure.started_at > last_success.finished_at
+        ) else None,
+    }
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import LoginThrottle
+
+# bcrypt takes hundreds of milliseconds per call. Hashing runs on a small pool
+# so that a burst of login attempts cannot occupy every request thread, and
+# callers are turned away at once when the pool's queue is full.
+PASSWORD_HASH_WORKERS = getattr(settings, 'PASSWORD_HASH_WORKERS', 4)
+PASSWORD_HASH_QUEUE = getattr(settings, 'PASSWORD_HASH_QUEUE', 16)
+PASSWORD_BUSY_RETRY_AFTER = 1
+
+# Admission limits, checked before any hashing: attempts per client IP and
+# failed attempts per account, each over a fixed window. The counters are rows
+# of LoginThrottle rather than cache entries: the shared cache is a database
+# table whose incr is a read followed by a write, so parallel attempts could
+# overwrite each other's counts.
+LOGIN_WINDOW = getattr(settings, 'LOGIN_WINDOW', 60 * 5)
+IP_ATTEMPT_LIMIT = getattr(settings, 'LOGIN_IP_ATTEMPT_LIMIT', 30)
+ACCOUNT_FAILURE_LIMIT = getattr(settings, 'LOGIN_ACCOUNT_FAILURE_LIMIT', 5)
+
+class PasswordWorkersBusy(Exception):
+    retry_after = PASSWORD_BUSY_RETRY_AFTER
+
+class LoginThrottled(Exception):
+    retry_after = LOGIN_WINDOW
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_QUEUE)
+
+def run_password_hash(func, *args):
+    """Run `func` on the hashing pool and wait for it. Raises PasswordWorkersBusy if the queue is full."""
+    if not _slots.acquire(blocking=False):
+        raise PasswordWorkersBusy()
+    try:
+        return _executor.submit(func, *args).result()
+    finally:
+        _slots.release()
+
+def check_user_password(user, raw_password):
+    """user.check_password on the pool, including the upgrade of outdated hashes."""
+    is_correct, must_update = run_password_hash(verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        user.password = run_password_hash(make_password, raw_password)
+        user.save(update_fields=['password'])
+    return is_correct
+
+def set_user_password(user, raw_password):
+    """user.set_password on the pool."""
+    user.password = run_password_hash(make_password, raw_password)
+    user._password = raw_password
+
+def _key(kind, value):
+    return f"{kind}:{hashlib.md5(str(value).strip().lower().encode()).hexdigest()}"
+
+def _count(key):
+    return LoginThrottle.objects.filter(key=key, expires_at__gt=timezone.now()).values_list('count', flat=True).first() or 0
+
+def _increment(key):
+    """Add one to the counter at `key` and return the new count, starting a new window if it has expired."""
+    while True:
+        now = timezone.now()
+        counters = LoginThrottle.objects.filter(key=key)
+        with transaction.atomic():
+            if counters.filter(expires_at__gt=now).update(count=F('count') + 1):
+                # The row stays locked until commit, so this reads our own increment.
+                return counters.values_list('count', flat=True).get()
+            expires_at = now + timedelta(seconds=LOGIN_WINDOW)
+            if counters.filter(expires_at__lte=now).update(count=1, expires_at=expires_at):
+                return 1
+            try:
+                with transaction.atomic():
+                    LoginThrottle.objects.create(key=key, count=1, expires_at=expires_at)
+            except IntegrityError:
+                # Another attempt created the row first; count on it instead.
+                continue
+        LoginThrottle.objects.filter(expires_at__lte=now).delete()
+        return 1
+
+def admit_password_attempt(ip, account=None):
+    """Count an attempt from `ip`, raising LoginThrottled if the IP or account is over its limit."""
+    if account and _count(_key('account', account)) >= ACCOUNT_FAILURE_LIMIT:
+        raise LoginThrottled()
+    if ip and _increment(_key('ip', ip)) > IP_ATTEMPT_LIMIT:
+        raise LoginThrottled()
+
+def record_password_failure(account):
+    _increment(_key('account', account))
+
+def clear_password_failures(account):
+    LoginThrottle.objects.filter(key=_key('account', account)).delete()
+
+def reset_attempts(ip):
+    """Forget the attempts counted for `ip`."""
+    LoginThrottle.objects.filter(key=_key('ip', ip)).delete()
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+from user_roles.authentication import CookieJWTAuthentication, invalidate_cached_user
+from user_roles.models import CustomUsers
+import time
+
+class Command(BaseCommand):
+    help = 'Time CookieJWTAuthentication per request with a cold and a warm user cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2_000, help='Authenticated requests per run')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = CustomUsers.objects.create_user(
+                username='auth-benchmark@example.com', email='auth-benchmark@example.com', password=None
+            )
+            factory = RequestFactory()
+            factory.cookies['access_token'] = str(AccessToken.for_user(user))
+            auth = CookieJWTAuthentication()
+
+            self.stdout.write(f"{'user cache':>10}  {'median us':>10}  {'p95 us':>8}  {'queries/req':>11}")
+            for label, cold in (('cold', True), ('warm', False)):
+                invalidate_cached_user(user.id)
+                timings = []
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(options['requests']):
+                        if cold:
+                            invalidate_cached_user(user.id)
+                        request = Request(factory.get('/api/'))
+                        began = time.perf_counter()
+                        auth.authenticate(request)
+                        timings.append((time.perf_counter() - began) * 1_000_000)
+                timings.sort()
+                self.stdout.write(
+                    f"{label:>10}  {timings[len(timings) // 2]:>10.1f}  "
+                    f"{timings[int(len(timings) * 0.95)]:>8.1f}  {len(queries) / len(timings):>11.2f}"
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
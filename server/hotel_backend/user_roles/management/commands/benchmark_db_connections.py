@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from hotel_backend.db_pool import close_pool
+import time
+
+class Command(BaseCommand):
+    help = 'Time a one-query request against a database, reconnecting every request and with the configured connection reuse'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='flask', help='Database alias to benchmark')
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per run')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            if connection.alias == alias:
+                opened.append(connection)
+
+        connection_created.connect(count_connection)
+        try:
+            self.stdout.write(f"{alias}: {connection.settings_dict['ENGINE']}, CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']}")
+            self.stdout.write(f"{'connections':>12}  {'median ms':>10}  {'p95 ms':>8}  {'opened':>6}")
+            for label, reconnect in (('per request', True), ('configured', False)):
+                connection.close()
+                close_pool(alias)
+                opened.clear()
+                timings = []
+                for _ in range(options['requests']):
+                    # The same signals the request handler sends, so Django
+                    # closes or keeps the connection exactly as it would live.
+                    began = time.perf_counter()
+                    request_started.send(sender=self.__class__)
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                        cursor.fetchone()
+                    request_finished.send(sender=self.__class__)
+                    if reconnect:
+                        connection.close()
+                        close_pool(alias)
+                    timings.append((time.perf_counter() - began) * 1000)
+                timings.sort()
+                # connection_created also fires for connections taken from a pool.
+                reused = connection.pool.stats()['reused'] if hasattr(connection, 'pool') else 0
+                self.stdout.write(
+                    f"{label:>12}  {timings[len(timings) // 2]:>10.3f}  "
+                    f"{timings[int(len(timings) * 0.95)]:>8.3f}  {len(opened) - reused:>6}"
+                )
+        finally:
+            connection_created.disconnect(count_connection)
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from user_roles.customer_sync import customer_sync_status, sync_customers
+
+class Command(BaseCommand):
+    help = (
+        'Mirror the flask customers table into the local replica. Incremental runs compare a hash '
+        'of each row and fetch only new or changed customers; --full copies every row'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Copy every row instead of comparing hashes')
+        parser.add_argument('--status', action='store_true', help='Only report the replica sync lag')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not options['status']:
+            run = sync_customers(full=options['full'], chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{run.mode.capitalize()} sync: {run.created} created, {run.updated} updated, {run.deleted} deleted"
+            ))
+
+        for name, value in customer_sync_status().items():
+            self.stdout.write(f"{name}: {value}")
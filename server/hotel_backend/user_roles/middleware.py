@@ -1,4 +1,16 @@
+import time
+from contextlib import ExitStack
 from ipware import get_client_ip # type: ignore
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from channels.sessions import CookieMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from hotel_backend.metrics import finish_sample, request_metrics, start_sample, timed_query
+from hotel_backend.query_log import check_repeated_queries
+from .authentication import CookieJWTAuthentication
 
 class ClientIPMiddleware:
     def __init__(self, get_response):
@@ -9,4 +21,65 @@ class ClientIPMiddleware:
         ip, _ = get_client_ip(request)
         # Attach IP to the request object for access in views
         request.client_ip = ip
-        return self.get_response(request)
\ No newline at end of file
+        return self.get_response(request)
+
+class RequestMetricsMiddleware:
+    """
+    Records each request's latency, database queries and query time, cache
+    lookups and response size under its URL pattern, such as
+    "master/booking/<int:booking_id>" (see hotel_backend.metrics).
+    Totals are kept in memory per worker process. Each query also goes through
+    the slow and repeated query checks in hotel_backend.query_log.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample, token = start_sample(request)
+        began = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timed_query))
+                response = self.get_response(request)
+        finally:
+            finish_sample(token)
+
+        match = getattr(request, 'resolver_match', None)
+        request_metrics.record(
+            view=match.route if match else 'unmatched',
+            method=request.method,
+            status=response.status_code,
+            duration=time.perf_counter() - began,
+            sample=sample,
+            size=None if response.streaming else len(response.content),
+        )
+        check_repeated_queries(sample)
+        return response
+
+
+@database_sync_to_async
+def get_user_from_token(raw_token):
+    """
+    Validate an access token and load its user through CookieJWTAuthentication,
+    so a warm user cache answers without touching the database.
+    """
+    authentication = CookieJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+class JWTCookieAuthMiddleware(BaseMiddleware):
+    """
+    Resolves the `access_token` cookie once per WebSocket connection and sets
+    scope["user"], or AnonymousUser when the token is missing or invalid.
+    """
+    async def __call__(self, scope, receive, send):
+        raw_token = scope.get('cookies', {}).get('access_token')
+        user = await get_user_from_token(raw_token) if raw_token else None
+        scope = dict(scope, user=user or AnonymousUser())
+        return await super().__call__(scope, receive, send)
+
+def JWTAuthMiddlewareStack(inner):
+    return CookieMiddleware(JWTCookieAuthMiddleware(inner))
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.2 on 2026-10-19 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_roles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+                ('customer_id', models.AutoField(primary_key=True, serialize=False)),
+                ('full_name', models.CharField(max_length=100)),
+                ('email', models.CharField(max_length=100)),
+                ('contact', models.CharField(max_length=11)),
+                ('address', models.TextField()),
+                ('password', models.CharField(max_length=100)),
+                ('is_archived', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('Active', 'Active'), ('Inactive', 'Inactive')], default='Active', max_length=10)),
+            ],
+            options={
+                'db_table': 'customers',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerReplica',
+            fields=[
+                ('customer_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('full_name', models.CharField(max_length=100)),
+                ('email', models.CharField(db_index=True, max_length=100)),
+                ('contact', models.CharField(max_length=11)),
+                ('address', models.TextField()),
+                ('password', models.CharField(max_length=100)),
+                ('is_archived', models.BooleanField(default=False)),
+                ('status', models.CharField(default='Active', max_length=10)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'customer_replicas',
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerSyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], max_length=12)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('deleted', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'customer_sync_runs',
+            },
+        ),
+    ]
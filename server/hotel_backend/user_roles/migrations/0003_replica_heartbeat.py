@@ -0,0 +1,23 @@
+# Generated by Django 5.2.2 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_roles', '0002_customer_replica'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplicaHeartbeat',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('beat', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'replica_heartbeat',
+            },
+        ),
+    ]
@@ -63,6 +63,59 @@ class Customer(models.Model):
         db_table = 'customers'  # Use existing table name
         app_label = 'user_roles'
 
+class CustomerReplica(models.Model):
+    """
+    Local read-only copy of the flask `customers` table, written only by
+    `manage.py sync_customers` so that logins do not wait on the remote database.
+    """
+    customer_id = models.IntegerField(primary_key=True)
+    full_name = models.CharField(max_length=100)
+    email = models.CharField(max_length=100, db_index=True)
+    contact = models.CharField(max_length=11)
+    address = models.TextField()
+    password = models.CharField(max_length=100)
+    is_archived = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, default='Active')
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'customer_replicas'
+
+class CustomerSyncRun(models.Model):
+    MODE_CHOICES = [
+        ('full', 'Full'),
+        ('incremental', 'Incremental'),
+    ]
+    mode = models.CharField(max_length=12, choices=MODE_CHOICES)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'customer_sync_runs'
+
+class ReplicaHeartbeat(models.Model):
+    # A single row, stamped on the primary and read back from the read replica
+    # to measure replication lag (see user_roles.replica).
+    id = models.PositiveSmallIntegerField(primary_key=True)
+    beat = models.DateTimeField()
+
+    class Meta:
+        db_table = 'replica_heartbeat'
+
+class LoginThrottle(models.Model):
+    # One counter per client IP or account for the login guard, incremented
+    # with a single UPDATE so concurrent attempts cannot lose counts.
+    key = models.CharField(max_length=64, primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'login_throttles'
+
 class Notification(models.Model):
     TYPE_CHOICES = [
         ('reserved', 'Reserved'),
@@ -0,0 +1,136 @@
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = 'replica'
+# The replica is skipped once it may be further behind the primary than this.
+REPLICA_MAX_LAG = getattr(settings, 'REPLICA_MAX_LAG', 10)
+# How often each process writes a heartbeat and checks which one the replica has.
+REPLICA_CHECK_INTERVAL = getattr(settings, 'REPLICA_CHECK_INTERVAL', 2)
+
+_scope = ContextVar('replica_scope', default=None)
+
+class _ReplicaScope:
+    def __init__(self):
+        self.wrote = False
+        self.fresh_after = None
+
+@contextmanager
+def replica_reads():
+    """Route ORM reads in this block to the replica while it is close enough to the primary."""
+    token = _scope.set(_ReplicaScope())
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+def use_read_replica(view):
+    """View decorator for read-only endpoints that can tolerate REPLICA_MAX_LAG of staleness."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def read_after(timestamp):
+    """Inside a replica block, only use a replica that has applied writes made up to `timestamp` (epoch seconds)."""
+    scope = _scope.get()
+    if scope is None or timestamp is None:
+        yield
+        return
+    previous = scope.fresh_after
+    scope.fresh_after = max(previous or 0, timestamp)
+    try:
+        yield
+    finally:
+        scope.fresh_after = previous
+
+def note_primary_write():
+    """Reads after a write in the same block go to the primary, so they see it."""
+    scope = _scope.get()
+    if scope is not None:
+        scope.wrote = True
+
+# Lag is measured with a heartbeat row: each process periodically stamps the
+# row on the primary and reads it back from the replica. Replication applies
+# writes in order, so a replica holding a stamp from time T has every write
+# committed before T.
+_heartbeat_lock = threading.Lock()
+_heartbeat = {'checked_at': None, 'caught_up_to': None, 'failing': False}
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.settings
+
+def _check_heartbeat():
+    from .models import ReplicaHeartbeat
+
+    seen = None
+    try:
+        seen = ReplicaHeartbeat.objects.using(REPLICA_ALIAS).filter(pk=1).values_list('beat', flat=True).first()
+    except Exception:
+        # Logged once per outage rather than on every check.
+        if not _heartbeat['failing']:
+            logger.warning("Replica heartbeat read failed; reading from the primary", exc_info=True)
+        _heartbeat['failing'] = True
+    else:
+        if _heartbeat['failing']:
+            logger.info("Replica heartbeat readable again")
+        _heartbeat['failing'] = False
+
+    now = timezone.now()
+    if not ReplicaHeartbeat.objects.using(DEFAULT_DB_ALIAS).filter(pk=1).update(beat=now):
+        try:
+            ReplicaHeartbeat.objects.using(DEFAULT_DB_ALIAS).create(pk=1, beat=now)
+        except IntegrityError:
+            pass
+    return seen.timestamp() if seen else None
+
+def replica_caught_up_to():
+    """Epoch seconds up to which the replica is known to have every primary write, or None."""
+    now = time.monotonic()
+    checked_at = _heartbeat['checked_at']
+    if checked_at is not None and now - checked_at < REPLICA_CHECK_INTERVAL:
+        return _heartbeat['caught_up_to']
+    # One thread refreshes; the others keep using the previous answer.
+    if not _heartbeat_lock.acquire(blocking=False):
+        return _heartbeat['caught_up_to']
+    try:
+        _heartbeat['caught_up_to'] = _check_heartbeat()
+        _heartbeat['checked_at'] = now
+    finally:
+        _heartbeat_lock.release()
+    return _heartbeat['caught_up_to']
+
+def reset_replica_state():
+    _heartbeat.update(checked_at=None, caught_up_to=None, failing=False)
+
+def replica_for_read():
+    """The replica alias if the current block may read from it, otherwise None (the primary)."""
+    scope = _scope.get()
+    if scope is None or scope.wrote or not replica_configured():
+        return None
+    caught_up_to = replica_caught_up_to()
+    if caught_up_to is None or time.time() - caught_up_to > REPLICA_MAX_LAG:
+        return None
+    if scope.fresh_after is not None and caught_up_to < scope.fresh_after:
+        return None
+    return REPLICA_ALIAS
+
+def replica_status():
+    caught_up_to = replica_caught_up_to() if replica_configured() else None
+    lag = round(time.time() - caught_up_to, 3) if caught_up_to is not None else None
+    return {
+        "configured": replica_configured(),
+        "lag_seconds": lag,
+        "max_lag_seconds": REPLICA_MAX_LAG,
+        "in_use": lag is not None and lag <= REPLICA_MAX_LAG,
+    }
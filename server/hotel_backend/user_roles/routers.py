@@ -1,3 +1,6 @@
+from django.db import DEFAULT_DB_ALIAS
+from .replica import REPLICA_ALIAS, note_primary_write, replica_for_read
+
 class SecondDbRouter:
     def db_for_read(self, model, **hints):
         if model._meta.model_name == 'customer':
@@ -15,4 +18,37 @@ class SecondDbRouter:
     def allow_migrate(self, db, app_label, model_name=None, **hints):
         if model_name == 'customer': 
             return db == 'flask'
-        return None
\ No newline at end of file
+        return None
+
+class ReadReplicaRouter:
+    """
+    Sends reads made inside user_roles.replica.replica_reads() to the replica
+    while it keeps up, and every write to the primary.
+    """
+    # The cache table and the heartbeat are only ever read from the primary.
+    primary_only = {('django_cache', 'cacheentry'), ('user_roles', 'replicaheartbeat')}
+
+    def _primary_only(self, model):
+        return (model._meta.app_label, model._meta.model_name) in self.primary_only
+
+    def db_for_read(self, model, **hints):
+        if self._primary_only(model):
+            return None
+        return replica_for_read()
+
+    def db_for_write(self, model, **hints):
+        if not self._primary_only(model):
+            note_primary_write()
+        # Objects loaded from the replica are saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica's schema arrives through replication.
+        if db == REPLICA_ALIAS:
+            return False
+        return None
@@ -59,7 +59,7 @@ class NotificationSerializer(serializers.ModelSerializer):
     booking_id = serializers.SerializerMethodField()
     
     def get_booking_id(self, obj):
-        return str(obj.booking.id) if obj.booking else None
+        return str(obj.booking_id) if obj.booking_id else None
     
     class Meta:
         model = Notification
@@ -1,8 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-from .models import Notification
+from .authentication import invalidate_cached_user
+from .models import CustomUsers, Notification
 from .serializers import NotificationSerializer
 
 @receiver(post_save, sender=Notification)
@@ -20,4 +21,8 @@ def send_notification(sender, instance, created, **args):
                 "notification": notification_data,
                 "unread_count": unread_count,
             }
-        )
\ No newline at end of file
+        )
+
+@receiver([post_save, post_delete], sender=CustomUsers)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
@@ -1,3 +1,431 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from unittest import mock
+from datetime import timedelta
+from django.apps import apps
+from django.utils import timezone
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.core.cache import cache
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from hotel_backend.asgi import application
+from hotel_backend.db_pool import PooledConnectionMixin, close_pool
+from .authentication import CookieJWTAuthentication
+from .backends import MultiDBAuthBackend, flask_miss_key
+from . import login_guard
+from .middleware import JWTAuthMiddlewareStack
+from .customer_sync import customer_sync_status, sync_customers
+from property.models import Rooms
+from .models import Customer, CustomerReplica, CustomUsers, LoginThrottle, ReplicaHeartbeat
+from .replica import (
+    REPLICA_ALIAS, REPLICA_MAX_LAG, _heartbeat, read_after, replica_caught_up_to, replica_reads, reset_replica_state,
+)
 
-# Create your tests here.
+class CookieJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUsers.objects.create_user(
+            username='guest@example.com', email='guest@example.com', password='secret'
+        )
+        self.factory = RequestFactory()
+        self.factory.cookies['access_token'] = str(AccessToken.for_user(self.user))
+
+    def authenticate(self):
+        user, _ = CookieJWTAuthentication().authenticate(Request(self.factory.get('/')))
+        return user
+
+    def test_user_lookup_is_cached(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate().pk, self.user.pk)
+
+    def test_role_and_archive_changes_invalidate(self):
+        self.authenticate()
+        self.user.role = 'admin'
+        self.user.save()
+        self.assertEqual(self.authenticate().role, 'admin')
+
+        self.user.is_archived = True
+        self.user.save()
+        self.assertTrue(self.authenticate().is_archived)
+
+class MultiDBAuthBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUsers.objects.create_user(
+            username='guest', email='guest@example.com', password='secret'
+        )
+        self.backend = MultiDBAuthBackend()
+
+    def test_reuses_the_fetched_user(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.backend.authenticate(None, 'guest@example.com', 'wrong', user=self.user))
+            self.assertEqual(self.backend.authenticate(None, 'guest@example.com', 'secret', user=self.user), self.user)
+
+    def test_single_lookup_by_username_or_email(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.authenticate(None, 'guest', 'secret'), self.user)
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.backend.authenticate(None, 'guest@example.com', 'wrong'))
+
+    def test_flask_customer_read_from_replica(self):
+        CustomerReplica.objects.create(
+            customer_id=7, full_name='Flask Customer', email='customer@example.com',
+            contact='09123456789', address='Manila', password=make_password('secret')
+        )
+        with self.assertNumQueries(2):
+            customer = self.backend.authenticate(None, 'customer@example.com', 'secret')
+        self.assertEqual(customer.customer_id, 7)
+        self.assertTrue(customer.is_flask_customer)
+
+    def test_archived_and_inactive_customers_are_refused(self):
+        replica = CustomerReplica.objects.create(
+            customer_id=7, full_name='Flask Customer', email='customer@example.com',
+            contact='09123456789', address='Manila', password=make_password('secret'), is_archived=True
+        )
+        self.assertIsNone(self.backend.authenticate(None, 'customer@example.com', 'secret'))
+        replica.is_archived = False
+        replica.status = 'Inactive'
+        replica.save()
+        self.assertIsNone(self.backend.authenticate(None, 'customer@example.com', 'secret'))
+
+    def test_password_mismatch_rechecks_the_flask_database(self):
+        CustomerReplica.objects.create(
+            customer_id=7, full_name='Flask Customer', email='customer@example.com',
+            contact='09123456789', address='Manila', password=make_password('old')
+        )
+        remote = Customer(
+            customer_id=7, full_name='Flask Customer', email='customer@example.com',
+            contact='09123456789', address='Manila', password=make_password('new')
+        )
+        with mock.patch.object(MultiDBAuthBackend, 'get_flask_customer', return_value=remote) as fetch:
+            self.assertEqual(self.backend.authenticate(None, 'customer@example.com', 'new').customer_id, 7)
+            self.assertIsNone(self.backend.authenticate(None, 'customer@example.com', 'wrong'))
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_known_flask_miss_skips_the_flask_database(self):
+        cache.set(flask_miss_key('nobody@example.com'), True)
+        # Users and the customer replica, both local.
+        with self.assertNumQueries(2):
+            self.assertIsNone(self.backend.authenticate(None, 'nobody@example.com', 'secret'))
+
+class CustomerSyncTests(TransactionTestCase):
+    """Syncs from a `customers` table created in the default database for the test."""
+    def setUp(self):
+        with connection.schema_editor() as editor:
+            editor.create_model(Customer)
+        for i in range(1, 4):
+            self.remote(customer_id=i, full_name=f'Customer {i}')
+
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            editor.delete_model(Customer)
+
+    def remote(self, **fields):
+        fields.setdefault('email', f"customer{fields['customer_id']}@example.com")
+        return Customer.objects.using('default').create(contact='0912', address='Manila', password='x', **fields)
+
+    def test_incremental_then_full(self):
+        run = sync_customers(source='default', chunk_size=2)
+        self.assertEqual((run.created, run.updated, run.deleted), (3, 0, 0))
+
+        run = sync_customers(source='default', chunk_size=2)
+        self.assertEqual((run.created, run.updated, run.deleted), (0, 0, 0))
+
+        Customer.objects.using('default').filter(customer_id=1).update(is_archived=True)
+        Customer.objects.using('default').filter(customer_id=3).update(password='y', status='Inactive')
+        Customer.objects.using('default').filter(customer_id=2).delete()
+        self.remote(customer_id=4, full_name='Customer 4')
+
+        run = sync_customers(source='default', chunk_size=2)
+        self.assertEqual((run.created, run.updated, run.deleted), (1, 2, 1))
+        self.assertTrue(CustomerReplica.objects.get(customer_id=1).is_archived)
+        self.assertEqual(CustomerReplica.objects.get(customer_id=3).password, 'y')
+        self.assertEqual(list(CustomerReplica.objects.order_by('customer_id').values_list('customer_id', flat=True)), [1, 3, 4])
+
+        CustomerReplica.objects.filter(customer_id=4).update(full_name='Edited locally')
+        run = sync_customers(full=True, source='default', chunk_size=2)
+        self.assertEqual((run.created, run.updated, run.deleted), (0, 1, 0))
+
+        status = customer_sync_status()
+        self.assertEqual(status['replica_rows'], 3)
+        self.assertEqual(status['last_sync_mode'], 'full')
+        self.assertLessEqual(status['lag_seconds'], 5)
+        self.assertIsNone(status['last_error'])
+
+class LoginGuardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        CustomUsers.objects.create_user(username='guest@example.com', email='guest@example.com', password='secret')
+        self.client = APIClient()
+
+    def login(self, email='guest@example.com', password='wrong'):
+        return self.client.post(reverse('user_login'), {'email': email, 'password': password}, format='json')
+
+    def test_account_locked_before_hashing(self):
+        for _ in range(login_guard.ACCOUNT_FAILURE_LIMIT):
+            self.assertEqual(self.login().status_code, 401)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login(password='secret')
+        # Only the account's failure counter is read; the user is never loaded.
+        self.assertEqual(len(queries), 1)
+        self.assertIn('login_throttles', queries[0]['sql'])
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], str(login_guard.LOGIN_WINDOW))
+
+    def test_success_clears_account_failures(self):
+        for _ in range(login_guard.ACCOUNT_FAILURE_LIMIT - 1):
+            self.login()
+        self.assertEqual(self.login(password='secret').status_code, 200)
+        self.assertEqual(self.login().status_code, 401)
+
+    def test_per_ip_limit(self):
+        for i in range(login_guard.IP_ATTEMPT_LIMIT):
+            self.assertEqual(self.login(email=f'nobody{i}@example.com').status_code, 404)
+        self.assertEqual(self.login().status_code, 429)
+
+    def test_counter_increments_in_the_database(self):
+        key = login_guard._key('ip', '10.0.0.1')
+        self.assertEqual(login_guard._increment(key), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(login_guard._increment(key), 2)
+        # The count is added by the UPDATE itself, not read and written back.
+        statements = [query['sql'] for query in queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertTrue(statements[0].startswith('UPDATE'))
+        self.assertIn('"count" + 1', statements[0])
+
+    def test_expired_counter_starts_a_new_window(self):
+        key = login_guard._key('account', 'guest@example.com')
+        LoginThrottle.objects.create(key=key, count=login_guard.ACCOUNT_FAILURE_LIMIT, expires_at=timezone.now())
+        self.assertEqual(self.login(password='secret').status_code, 200)
+        self.assertEqual(login_guard._increment(key), 1)
+
+    def test_full_hashing_queue_fails_fast(self):
+        for _ in range(login_guard.PASSWORD_HASH_QUEUE):
+            login_guard._slots.acquire()
+        try:
+            response = self.login(password='secret')
+        finally:
+            for _ in range(login_guard.PASSWORD_HASH_QUEUE):
+                login_guard._slots.release()
+        self.assertEqual(response.status_code, 503)
+
+class WebSocketAuthTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUsers.objects.create_user(
+            username='guest@example.com', email='guest@example.com', password='secret'
+        )
+        self.cookie = (b'cookie', f'access_token={AccessToken.for_user(self.user)}'.encode())
+
+    def scope_user(self, headers):
+        users = []
+
+        async def app(scope, receive, send):
+            users.append(scope['user'])
+
+        async_to_sync(JWTAuthMiddlewareStack(app))({'type': 'websocket', 'headers': headers}, None, None)
+        return users[0]
+
+    def test_reconnects_resolve_the_user_from_cache(self):
+        self.assertEqual(self.scope_user([self.cookie]).pk, self.user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(5):
+                self.assertEqual(self.scope_user([self.cookie]).pk, self.user.pk)
+        self.assertEqual(len(queries), 0)
+
+    def test_invalid_token_is_anonymous(self):
+        self.assertFalse(self.scope_user([(b'cookie', b'access_token=not-a-token')]).is_authenticated)
+
+    async def test_notifications_ignore_client_sent_user_id(self):
+        communicator = WebsocketCommunicator(application, '/ws/notifications/', headers=[self.cookie])
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual((await communicator.receive_json_from())['type'], 'initial_count')
+
+        await communicator.send_json_to({'type': 'authenticate', 'userId': self.user.pk + 1})
+        self.assertFalse((await communicator.receive_json_from())['success'])
+        await communicator.disconnect()
+
+        anonymous = WebsocketCommunicator(application, '/ws/notifications/')
+        await anonymous.connect()
+        await anonymous.send_json_to({'type': 'authenticate', 'userId': self.user.pk})
+        self.assertFalse((await anonymous.receive_json_from())['success'])
+        await anonymous.disconnect()
+
+class PooledSQLiteWrapper(PooledConnectionMixin, SQLiteDatabaseWrapper):
+    pass
+
+class ConnectionPoolTests(SimpleTestCase):
+    alias = 'pool-test'
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.addCleanup(close_pool, self.alias)
+
+    def wrapper(self, **pool):
+        settings_dict = {**connections['default'].settings_dict, 'NAME': self.path, 'POOL': {'SIZE': 1, **pool}}
+        return PooledSQLiteWrapper(settings_dict, alias=self.alias)
+
+    def query(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return wrapper.connection
+
+    def test_closed_connections_are_reused_across_wrappers(self):
+        first, second = self.wrapper(), self.wrapper()
+        raw = self.query(first)
+        first.close()
+        self.assertIs(self.query(second), raw)
+
+        # Only SIZE idle connections are kept; the rest are really closed.
+        self.query(first)
+        first.close()
+        second.close()
+        self.assertEqual(first.pool.stats(), {'opened': 2, 'reused': 1, 'returned': 2, 'discarded': 0, 'idle': 1, 'size': 1})
+
+    def test_pool_is_replaced_when_connection_settings_change(self):
+        first = self.wrapper()
+        raw = self.query(first)
+        handle, other_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, other_path)
+        second = self.wrapper()
+        second.settings_dict['NAME'] = other_path
+
+        self.assertIsNot(self.query(second), raw)
+        self.assertIsNot(second.pool, first._connection_pool)
+        # The connection opened for the old NAME is closed, not pooled.
+        first.close()
+        self.assertEqual(second.pool.stats()['idle'], 0)
+        second.close()
+        self.assertEqual(second.pool.stats()['idle'], 1)
+
+    def test_connections_in_a_bad_state_are_not_pooled(self):
+        wrapper = self.wrapper()
+        raw = self.query(wrapper)
+        wrapper.set_autocommit(False)
+        wrapper.close()
+        self.assertEqual(wrapper.pool.stats()['idle'], 0)
+
+        self.assertIsNot(self.query(wrapper), raw)
+        wrapper.errors_occurred = True
+        wrapper.close()
+        self.assertEqual(wrapper.pool.stats()['idle'], 0)
+
+    def test_stale_and_dead_connections_are_replaced(self):
+        wrapper = self.wrapper(MAX_IDLE=0)
+        raw = self.query(wrapper)
+        wrapper.close()
+        self.assertIsNot(self.query(wrapper), raw)
+        self.assertEqual(wrapper.pool.stats()['discarded'], 1)
+        close_pool(self.alias)
+
+        wrapper = self.wrapper(PING_AFTER=-1)
+        raw = self.query(wrapper)
+        wrapper.close()
+        raw.close()
+        self.assertIsNot(self.query(wrapper), raw)
+        self.assertEqual(wrapper.pool.stats()['discarded'], 1)
+
+class ReadReplicaTests(TestCase):
+    """
+    A second SQLite file stands in for the replica and the tests play
+    replication by hand. The settings have no replica, so it is registered
+    once the test databases exist and then added to the test's databases.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        handle, cls.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connections.settings[REPLICA_ALIAS] = {**connections['default'].settings_dict, 'NAME': cls.replica_path}
+        cls.databases = cls.databases | {REPLICA_ALIAS}
+        with connections[REPLICA_ALIAS].schema_editor() as editor:
+            for model in apps.get_models():
+                if model._meta.managed:
+                    editor.create_model(model)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.databases = cls.databases - {REPLICA_ALIAS}
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+        os.remove(cls.replica_path)
+        super().tearDownClass()
+
+    def setUp(self):
+        reset_replica_state()
+        self.addCleanup(reset_replica_state)
+        self.room = Rooms.objects.create(room_name='Primary suite', room_price=1000)
+        Rooms.objects.using(REPLICA_ALIAS).create(pk=self.room.pk, room_name='Replica suite', room_price=1000)
+
+    def replicate_heartbeat(self, age=0):
+        ReplicaHeartbeat.objects.using(REPLICA_ALIAS).update_or_create(
+            pk=1, defaults={'beat': timezone.now() - timedelta(seconds=age)}
+        )
+        reset_replica_state()
+
+    def room_names(self):
+        return [room['room_name'] for room in self.client.get('/property/rooms').json()['data']]
+
+    def test_catalog_reads_use_a_caught_up_replica(self):
+        self.assertEqual(self.room_names(), ['Primary suite'])
+        # The first check stamped the primary's heartbeat; the replica has none yet.
+        self.assertTrue(ReplicaHeartbeat.objects.filter(pk=1).exists())
+
+        self.replicate_heartbeat()
+        self.assertEqual(self.room_names(), ['Replica suite'])
+        self.assertEqual(Rooms.objects.get().room_name, 'Primary suite')
+
+    def test_unreadable_replica_is_logged_once_per_outage(self):
+        with connections[REPLICA_ALIAS].cursor() as cursor:
+            cursor.execute('ALTER TABLE replica_heartbeat RENAME TO replica_heartbeat_gone')
+        with self.assertLogs('user_roles.replica', 'WARNING') as logs:
+            for _ in range(3):
+                self.assertIsNone(replica_caught_up_to())
+                _heartbeat['checked_at'] = None
+        self.assertEqual(len(logs.records), 1)
+
+        with connections[REPLICA_ALIAS].cursor() as cursor:
+            cursor.execute('ALTER TABLE replica_heartbeat_gone RENAME TO replica_heartbeat')
+        with self.assertLogs('user_roles.replica', 'INFO'):
+            replica_caught_up_to()
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.replicate_heartbeat(age=REPLICA_MAX_LAG + 5)
+        self.assertEqual(self.room_names(), ['Primary suite'])
+
+    def test_writes_go_to_primary_and_pin_later_reads(self):
+        self.replicate_heartbeat()
+        with replica_reads():
+            room = Rooms.objects.get(pk=self.room.pk)
+            self.assertEqual(room._state.db, REPLICA_ALIAS)
+            room.room_price = 1500
+            room.save(update_fields=['room_price'])
+            self.assertEqual(Rooms.objects.get(pk=self.room.pk).room_name, 'Primary suite')
+
+        self.assertEqual(Rooms.objects.get(pk=self.room.pk).room_price, 1500)
+        self.assertEqual(Rooms.objects.using(REPLICA_ALIAS).get(pk=self.room.pk).room_price, 1000)
+
+    def test_read_after_requires_the_replica_to_have_caught_up(self):
+        self.replicate_heartbeat(age=1)
+        with replica_reads():
+            with read_after(time.time()):
+                self.assertEqual(Rooms.objects.get().room_name, 'Primary suite')
+            with read_after(time.time() - 60):
+                self.assertEqual(Rooms.objects.get().room_name, 'Replica suite')
@@ -6,6 +6,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import CustomUsers, Notification
+from .login_guard import (
+    LoginThrottled,
+    PasswordWorkersBusy,
+    admit_password_attempt,
+    check_user_password,
+    clear_password_failures,
+    record_password_failure,
+    set_user_password,
+)
 from .serializers import CustomUserSerializer, NotificationSerializer
 from .email.email import send_otp_to_email, send_reset_password
 from django.core.cache import cache
@@ -14,6 +23,7 @@ from datetime import timedelta
 from booking.models import Bookings
 from booking.serializers import BookingSerializer
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from hotel_backend.pagination import InvalidCursor, cursor_paginate, wants_cursor_pagination
 from property.serializers import AreaSerializer
 from .google.oauth import google_auth as google_oauth_util
 from channels.layers import get_channel_layer
@@ -114,6 +124,13 @@ def create_booking_notification(user, notification_type, booking_id, message):
         return None
 
 # Create your views here.
+def password_guard_response(error):
+    if isinstance(error, LoginThrottled):
+        message, code = 'Too many attempts. Please try again later.', status.HTTP_429_TOO_MANY_REQUESTS
+    else:
+        message, code = 'The server is busy. Please try again shortly.', status.HTTP_503_SERVICE_UNAVAILABLE
+    return Response({'error': message}, status=code, headers={'Retry-After': str(error.retry_after)})
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def auth_logout(request):
@@ -143,15 +160,20 @@ def change_password(request):
         if new_password != confirm_new_password:
             return Response({'error': 'New password and confirm new password do not match'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if not user.check_password(old_password):
+        admit_password_attempt(getattr(request, 'client_ip', None), user.email)
+        if not check_user_password(user, old_password):
+            record_password_failure(user.email)
             return Response({'error': 'Old password is incorrect'}, status=status.HTTP_400_BAD_REQUEST)
         
-        user.set_password(new_password)
+        clear_password_failures(user.email)
+        set_user_password(user, new_password)
         user.save()
         
         return Response({
             'message': 'Password changed successfully'
         }, status=status.HTTP_200_OK)
+    except (LoginThrottled, PasswordWorkersBusy) as e:
+        return password_guard_response(e)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -276,7 +298,7 @@ def verify_otp(request):
         )
         user.save()
 
-        user_auth = authenticate(request, username=email, password=password)
+        user_auth = authenticate(request, username=email, password=password, user=user)
         if user_auth is not None:
             login(request, user_auth)
             refresh = RefreshToken.for_user(user_auth)
@@ -428,6 +450,7 @@ def reset_password(request):
                 "error": "New password and confirm password do not match"
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        admit_password_attempt(getattr(request, 'client_ip', None))
         user = CustomUsers.objects.filter(email=email).first()
         
         if not user:
@@ -437,11 +460,11 @@ def reset_password(request):
         
         existing_profile_image = user.profile_image
         
-        user.set_password(new_password)
+        set_user_password(user, new_password)
         user.profile_image = existing_profile_image
         user.save()
         
-        user = authenticate(request, username=email, password=new_password)
+        user = authenticate(request, username=email, password=new_password, user=user)
         if user is not None:
             login(request, user)
             refresh = RefreshToken.for_user(user)
@@ -473,6 +496,8 @@ def reset_password(request):
             return Response({
                 "error": "Password reset failed. Please try again later."
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except (LoginThrottled, PasswordWorkersBusy) as e:
+        return password_guard_response(e)
     except Exception as e:
         return Response({
             "error": "An error occurred while resetting the password. Please try again later."
@@ -608,6 +633,7 @@ def user_login(request):
         if not email or not password:
             return Response({'error': 'Email and password are required'}, status=status.HTTP_400_BAD_REQUEST)
         
+        admit_password_attempt(getattr(request, 'client_ip', None), email)
         user = CustomUsers.objects.filter(email=email).first()
         
         if not user:
@@ -616,11 +642,13 @@ def user_login(request):
         if user.is_archived:
             return Response({'error': 'User account is archived'}, status=status.HTTP_403_FORBIDDEN)
         
-        auth_user = authenticate(request, username=email, password=password)
+        auth_user = authenticate(request, username=email, password=password, user=user)
         
         if auth_user is None:
+            record_password_failure(email)
             return Response({'error': 'Your password is incorrect.'}, status=status.HTTP_401_UNAUTHORIZED)
 
+        clear_password_failures(email)
         token = RefreshToken.for_user(auth_user)
         
         user_data = {
@@ -661,6 +689,8 @@ def user_login(request):
         )
 
         return response
+    except (LoginThrottled, PasswordWorkersBusy) as e:
+        return password_guard_response(e)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -772,7 +802,7 @@ def update_user_details(request, id):
 def get_guest_bookings(request):
     try:
         user = request.user
-        bookings = Bookings.objects.filter(user=user).exclude(status='cancelled').order_by('-created_at')
+        bookings = BookingSerializer.with_related(Bookings.objects.filter(user=user).exclude(status='cancelled')).order_by('-created_at')
 
         status_filter = request.query_params.get('status', '')
         
@@ -782,14 +812,24 @@ def get_guest_bookings(request):
         page = request.query_params.get('page', 1)
         page_size = request.query_params.get('page_size', 5)
         
-        paginator = Paginator(bookings, page_size)
-        
-        try:
-            paginated_bookings = paginator.page(page)
-        except PageNotAnInteger:
-            paginated_bookings = paginator.page(1)
-        except EmptyPage:
-            paginated_bookings = paginator.page(paginator.num_pages)
+        if wants_cursor_pagination(request):
+            paginated_bookings, pagination = cursor_paginate(request, bookings, ('-created_at',), page_size)
+        else:
+            paginator = Paginator(bookings, page_size)
+            
+            try:
+                paginated_bookings = paginator.page(page)
+            except PageNotAnInteger:
+                paginated_bookings = paginator.page(1)
+            except EmptyPage:
+                paginated_bookings = paginator.page(paginator.num_pages)
+            
+            pagination = {
+                "total_pages": paginator.num_pages,
+                "current_page": int(page),
+                "total_items": paginator.count,
+                "page_size": int(page_size)
+            }
             
         booking_data = []
         for booking in paginated_bookings:
@@ -808,13 +848,10 @@ def get_guest_bookings(request):
         
         return Response({
             "data": booking_data,
-            "pagination": {
-                "total_pages": paginator.num_pages,
-                "current_page": int(page),
-                "total_items": paginator.count,
-                "page_size": int(page_size)
-            }
+            "pagination": pagination
         }, status=status.HTTP_200_OK)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 